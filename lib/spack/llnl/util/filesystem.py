@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import collections
 import collections.abc
+import concurrent.futures
 import errno
 import fnmatch
 import glob
@@ -75,6 +76,7 @@
     "set_install_permissions",
     "touch",
     "touchp",
+    "prefetch_directory_trees",
     "traverse_tree",
     "unset_executable_mode",
     "working_dir",
@@ -1410,21 +1412,10 @@ def after_visit_symlinked_dir(self, root, rel_path, depth):
         pass
 
 
-def visit_directory_tree(root, visitor, rel_path="", depth=0):
-    """Recurses the directory root depth-first through a visitor pattern using the
-    interface from :py:class:`BaseDirectoryVisitor`
-
-    Parameters:
-        root (str): path of directory to recurse into
-        visitor (BaseDirectoryVisitor): what visitor to use
-        rel_path (str): current relative path from the root
-        depth (str): current depth from the root
-    """
-    dir = os.path.join(root, rel_path)
-    dir_entries = sorted(os.scandir(dir), key=lambda d: d.name)
-
-    for f in dir_entries:
-        rel_child = os.path.join(rel_path, f.name)
+def _list_directory(dir):
+    """Return the entries of a directory as sorted ``(name, islink, isdir)`` tuples"""
+    entries = []
+    for f in sorted(os.scandir(dir), key=lambda d: d.name):
         islink = f.is_symlink()
         # On Windows, symlinks to directories are distinct from
         # symlinks to files, and it is possible to create a
@@ -1449,19 +1440,85 @@ def visit_directory_tree(root, visitor, rel_path="", depth=0):
                 isdir = os.path.isdir(link_target)
             else:
                 raise e
+        entries.append((f.name, islink, isdir))
+    return entries
+
+
+def prefetch_directory_trees(roots, max_workers=16):
+    """Concurrently list all directories below the given roots, so that a subsequent
+    :py:func:`visit_directory_tree` does not have to wait on filesystem metadata
+    latency one directory at a time.
+
+    Symlinked directories are not followed; :py:func:`visit_directory_tree` lists
+    them on demand if a visitor decides to recurse into them. Directories that
+    cannot be listed are omitted, so that visiting them raises as usual.
+
+    Parameters:
+        roots (list): directories to list recursively
+        max_workers (int): maximum number of concurrent listings
+
+    Returns:
+        dict: mapping from directory path to its entries, to be passed as the
+        ``listings`` argument of :py:func:`visit_directory_tree`
+    """
+    listings = {}
+    roots = list(dedupe(roots))
+    if not roots:
+        return listings
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_list_directory, root): root for root in roots}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                dir = pending.pop(future)
+                try:
+                    entries = future.result()
+                except OSError:
+                    continue
+                listings[dir] = entries
+                for name, is_link, is_dir in entries:
+                    if is_dir and not is_link:
+                        child = os.path.join(dir, name)
+                        pending[executor.submit(_list_directory, child)] = child
+
+    return listings
+
+
+def visit_directory_tree(root, visitor, rel_path="", depth=0, listings=None):
+    """Recurses the directory root depth-first through a visitor pattern using the
+    interface from :py:class:`BaseDirectoryVisitor`
+
+    Parameters:
+        root (str): path of directory to recurse into
+        visitor (BaseDirectoryVisitor): what visitor to use
+        rel_path (str): current relative path from the root
+        depth (str): current depth from the root
+        listings (dict): directory listings from :py:func:`prefetch_directory_trees`;
+            directories not in here are listed on demand. The order in which the
+            visitor is called does not depend on whether listings were prefetched.
+    """
+    dir = os.path.join(root, rel_path)
+    dir_entries = listings.get(dir) if listings else None
+    if dir_entries is None:
+        dir_entries = _list_directory(dir)
 
-        if not isdir and not islink:
+    for name, is_link, is_dir in dir_entries:
+        rel_child = os.path.join(rel_path, name)
+        if not is_dir and not is_link:
             # handle non-symlink files
             visitor.visit_file(root, rel_child, depth)
-        elif not isdir:
+        elif not is_dir:
             visitor.visit_symlinked_file(root, rel_child, depth)
-        elif not islink and visitor.before_visit_dir(root, rel_child, depth):
+        elif not is_link and visitor.before_visit_dir(root, rel_child, depth):
             # Handle ordinary directories
-            visit_directory_tree(root, visitor, rel_child, depth + 1)
+            visit_directory_tree(root, visitor, rel_child, depth + 1, listings)
             visitor.after_visit_dir(root, rel_child, depth)
-        elif islink and visitor.before_visit_symlinked_dir(root, rel_child, depth):
+        elif is_link and visitor.before_visit_symlinked_dir(root, rel_child, depth):
             # Handle symlinked directories
-            visit_directory_tree(root, visitor, rel_child, depth + 1)
+            visit_directory_tree(root, visitor, rel_child, depth + 1, listings)
             visitor.after_visit_symlinked_dir(root, rel_child, depth)
 
 
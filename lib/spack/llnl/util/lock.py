@@ -3,10 +3,13 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import bisect
 import errno
 import os
+import signal
 import socket
 import sys
+import threading
 import time
 from datetime import datetime
 
@@ -31,6 +34,7 @@
     "LockPermissionError",
     "LockROFileError",
     "CantCreateLockError",
+    "LockProfiler",
 ]
 
 
@@ -38,6 +42,142 @@
 #: for example.
 true_fn = lambda: True
 
+#: Timeouts shorter than this are served by polling, since an interval timer that
+#: short may never get armed
+_min_blocking_timeout = 1e-3
+
+
+class _LockWaitTimeout(Exception):
+    """Raised by the SIGALRM handler to interrupt a blocking lock request."""
+
+
+def _raise_lock_wait_timeout(signum, frame):
+    raise _LockWaitTimeout()
+
+
+class LockProfiler(object):
+    """Aggregates how often each lock file was acquired, how long processes
+    waited for it, how long it was held and by whom.
+
+    Profiling is opt-in (see ``enable_profiling()``), so that locks cost
+    nothing extra when nobody is looking.
+    """
+
+    #: Upper bounds, in seconds, of the wait time histogram buckets. The last
+    #: bucket counts all longer waits.
+    buckets = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0)
+
+    def __init__(self):
+        self.locks = {}
+
+    def _stats(self, path):
+        if path not in self.locks:
+            self.locks[path] = {
+                "acquired": {"read": 0, "write": 0},
+                "timeouts": 0,
+                "attempts": 0,
+                "wait": {"total": 0.0, "max": 0.0, "histogram": [0] * (len(self.buckets) + 1)},
+                "hold": {"total": 0.0, "max": 0.0},
+                "holders": {},
+            }
+        return self.locks[path]
+
+    def attempted(self, lock, op, acquired, wait_time, nattempts):
+        """Record an attempt to take a lock, successful or timed out."""
+        stats = self._stats(lock.path)
+        stats["attempts"] += nattempts
+        if acquired:
+            stats["acquired"][LockType.to_str(op).lower()] += 1
+        else:
+            stats["timeouts"] += 1
+
+        wait = stats["wait"]
+        wait["total"] += wait_time
+        wait["max"] = max(wait["max"], wait_time)
+        wait["histogram"][bisect.bisect_left(self.buckets, wait_time)] += 1
+
+    def released(self, lock, hold_time):
+        """Record that a lock was released after being held for some time."""
+        stats = self._stats(lock.path)
+        hold = stats["hold"]
+        hold["total"] += hold_time
+        hold["max"] = max(hold["max"], hold_time)
+
+        holder = "{0}:{1}".format(socket.gethostname(), os.getpid())
+        if lock.desc:
+            # The description is formatted as " (<desc>)"
+            holder = "{0} {1}".format(holder, lock.desc.strip())
+        held = stats["holders"].setdefault(holder, {"count": 0, "time": 0.0})
+        held["count"] += 1
+        held["time"] += hold_time
+
+    def to_dict(self):
+        """Return the profile as a JSON serializable dictionary."""
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "locks": self.locks,
+        }
+
+    @staticmethod
+    def merge(profiles):
+        """Combine profiles from ``to_dict()``, e.g. those of concurrent
+        processes, into one profile of the same form.
+        """
+        merged = LockProfiler()
+        for profile in profiles:
+            if profile["buckets"] != list(merged.buckets):
+                raise ValueError("cannot merge lock profiles with different wait buckets")
+
+            for path, stats in profile["locks"].items():
+                total = merged._stats(path)
+                for key in ("read", "write"):
+                    total["acquired"][key] += stats["acquired"][key]
+                total["timeouts"] += stats["timeouts"]
+                total["attempts"] += stats["attempts"]
+                for key in ("wait", "hold"):
+                    total[key]["total"] += stats[key]["total"]
+                    total[key]["max"] = max(total[key]["max"], stats[key]["max"])
+                for i, count in enumerate(stats["wait"]["histogram"]):
+                    total["wait"]["histogram"][i] += count
+                for holder, held in stats["holders"].items():
+                    total_held = total["holders"].setdefault(holder, {"count": 0, "time": 0.0})
+                    total_held["count"] += held["count"]
+                    total_held["time"] += held["time"]
+
+        return {"processes": len(profiles), "buckets": list(merged.buckets), "locks": merged.locks}
+
+
+#: Profiler recording all lock activity in this process, if enabled
+_profiler = None
+
+
+def enable_profiling():
+    """Start profiling locks in this process, and return the profiler."""
+    global _profiler
+    if _profiler is None:
+        _profiler = LockProfiler()
+    return _profiler
+
+
+def disable_profiling():
+    """Stop profiling locks in this process, and return the last profiler."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def _reset_profiling_in_child():
+    # A forked child inherits the profile of its parent, but records only the
+    # locks it takes itself
+    if _profiler is not None:
+        _profiler.locks = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_profiling_in_child)
+
 
 class OpenFile(object):
     """Record for keeping track of open lockfiles (with reference counting).
@@ -207,7 +347,9 @@ class Lock(object):
     overlapping byte ranges in the same file).
     """
 
-    def __init__(self, path, start=0, length=0, default_timeout=None, debug=False, desc=""):
+    def __init__(
+        self, path, start=0, length=0, default_timeout=None, debug=False, desc="", blocking=True
+    ):
         """Construct a new lock on the file at ``path``.
 
         By default, the lock applies to the whole file.  Optionally,
@@ -228,6 +370,8 @@ def __init__(self, path, start=0, length=0, default_timeout=None, debug=False, d
             debug (bool): debug mode specific to locking
             desc (str): optional debug message lock description, which is
                 helpful for distinguishing between different Spack locks.
+            blocking (bool): wait for contended locks in a blocking ``F_SETLKW``
+                request instead of polling, whenever the timeout allows it
         """
         self.path = path
         self._file = None
@@ -249,6 +393,14 @@ def __init__(self, path, start=0, length=0, default_timeout=None, debug=False, d
         # user sets a timeout for each attempt)
         self.default_timeout = default_timeout or None
 
+        # Wait in the kernel rather than polling, and the total seconds spent waiting
+        # for this lock to become available
+        self.blocking = blocking
+        self.wait_time = 0.0
+
+        # When the POSIX lock was taken, for profiling how long it is held
+        self._held_since = None
+
         # PID and host of lock holder (only used in debug mode)
         self.pid = self.old_pid = None
         self.host = self.old_host = None
@@ -294,8 +446,11 @@ def __str__(self):
     def _lock(self, op, timeout=None):
         """This takes a lock using POSIX locks (``fcntl.lockf``).
 
-        The lock is implemented as a spin lock using a nonblocking call
-        to ``lockf()``.
+        An uncontended lock is taken with a nonblocking call to ``lockf()``.
+        When the lock is contended, the process waits for it in a blocking
+        call, which an interval timer interrupts when the timeout expires.
+        Where that is not possible (e.g. timers only work in the main thread),
+        the lock is polled with nonblocking calls instead.
 
         If the lock times out, it raises a ``LockError``. If the lock is
         successfully acquired, the total wait time and the number of attempts
@@ -323,25 +478,98 @@ def _lock(self, op, timeout=None):
             )
         )
 
-        poll_intervals = iter(Lock._poll_interval_generator())
         start_time = time.time()
-        num_attempts = 0
+        num_attempts = 1
+        contended = not self._poll_lock(op)
+        acquired = not contended
+        try:
+            if contended and self._can_block(timeout):
+                num_attempts += 1
+                acquired = self._block_lock(op, timeout)
+            elif contended:
+                acquired, num_attempts = self._spin_lock(op, timeout, start_time, num_attempts)
+        finally:
+            total_wait_time = time.time() - start_time
+            if contended:
+                self.wait_time += total_wait_time
+
+        if _profiler is not None:
+            _profiler.attempted(self, op, acquired, total_wait_time, num_attempts)
+
+        if not acquired:
+            raise LockTimeoutError(op_str.lower(), self.path, total_wait_time, num_attempts)
+
+        # Upgrades and downgrades keep holding the lock
+        if self._reads == 0 and self._writes == 0:
+            self._held_since = time.time()
+        return total_wait_time, num_attempts
+
+    def _spin_lock(self, op, timeout, start_time, num_attempts):
+        """Poll the lock until it is acquired or the timeout expires. Return
+        whether the lock was acquired, and the total number of attempts.
+        """
+        poll_intervals = iter(Lock._poll_interval_generator())
         while (not timeout) or (time.time() - start_time) < timeout:
+            time.sleep(next(poll_intervals))
             num_attempts += 1
             if self._poll_lock(op):
-                total_wait_time = time.time() - start_time
-                return total_wait_time, num_attempts
-
-            time.sleep(next(poll_intervals))
+                return True, num_attempts
 
         # TBD: Is an extra attempt after timeout needed/appropriate?
         num_attempts += 1
-        if self._poll_lock(op):
-            total_wait_time = time.time() - start_time
-            return total_wait_time, num_attempts
+        return self._poll_lock(op), num_attempts
+
+    def _can_block(self, timeout):
+        """Whether a contended lock can be waited for with a blocking request."""
+        if not self.blocking:
+            return False
+
+        if not timeout:
+            return True
+
+        # The timeout is enforced with SIGALRM, which only the main thread can
+        # handle, and which must not be in use for something else.
+        return (
+            timeout >= _min_blocking_timeout
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGALRM) in (signal.SIG_DFL, signal.SIG_IGN)
+            and signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        )
+
+    def _block_lock(self, op, timeout):
+        """Wait for the lock in a blocking request. Return whether the lock was
+        acquired before the timeout expired.
+        """
+        module_op = LockType.to_module(op)
+        if timeout:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_lock_wait_timeout)
 
-        total_wait_time = time.time() - start_time
-        raise LockTimeoutError(op_str.lower(), self.path, total_wait_time, num_attempts)
+        try:
+            try:
+                if timeout:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                fcntl.lockf(self._file, module_op, self._length, self._start, os.SEEK_SET)
+            finally:
+                if timeout:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except _LockWaitTimeout:
+            # The timer may have fired right after the lock was granted: a last
+            # attempt settles whether we hold it.
+            return self._poll_lock(op)
+        except IOError as e:
+            # The kernel refuses to wait when it detects a deadlock. Another process
+            # may still release the lock in time, so keep trying until the timeout.
+            if e.errno != errno.EDEADLK:
+                raise
+            acquired, _ = self._spin_lock(op, timeout, time.time(), 0)
+            return acquired
+        finally:
+            if timeout:
+                signal.signal(signal.SIGALRM, previous_handler)
+
+        self._log_lock_debug_data(op)
+        return True
 
     def _poll_lock(self, op):
         """Attempt to acquire the lock in a non-blocking manner. Return whether
@@ -353,29 +581,31 @@ def _poll_lock(self, op):
             fcntl.lockf(
                 self._file, module_op | fcntl.LOCK_NB, self._length, self._start, os.SEEK_SET
             )
-
-            # help for debugging distributed locking
-            if self.debug:
-                # All locks read the owner PID and host
-                self._read_log_debug_data()
-                self._log_debug(
-                    "{0} locked {1} [{2}:{3}] (owner={4})".format(
-                        LockType.to_str(op), self.path, self._start, self._length, self.pid
-                    )
-                )
-
-                # Exclusive locks write their PID/host
-                if module_op == fcntl.LOCK_EX:
-                    self._write_log_debug_data()
-
-            return True
-
         except IOError as e:
             # EAGAIN and EACCES == locked by another process (so try again)
             if e.errno not in (errno.EAGAIN, errno.EACCES):
                 raise
+            return False
 
-        return False
+        self._log_lock_debug_data(op)
+        return True
+
+    def _log_lock_debug_data(self, op):
+        """Help for debugging distributed locking, once a lock is acquired."""
+        if not self.debug:
+            return
+
+        # All locks read the owner PID and host
+        self._read_log_debug_data()
+        self._log_debug(
+            "{0} locked {1} [{2}:{3}] (owner={4})".format(
+                LockType.to_str(op), self.path, self._start, self._length, self.pid
+            )
+        )
+
+        # Exclusive locks write their PID/host
+        if LockType.to_module(op) == fcntl.LOCK_EX:
+            self._write_log_debug_data()
 
     def _ensure_parent_directory(self):
         parent = os.path.dirname(self.path)
@@ -436,6 +666,10 @@ def _unlock(self):
         self._reads = 0
         self._writes = 0
 
+        if _profiler is not None and self._held_since is not None:
+            _profiler.released(self, time.time() - self._held_since)
+        self._held_since = None
+
     def acquire_read(self, timeout=None):
         """Acquires a recursive, shared lock for reading.
 
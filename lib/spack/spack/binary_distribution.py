@@ -1450,13 +1450,22 @@ def try_fetch(url_to_fetch):
     Returns:
         Path to locally staged resource or ``None`` if it could not be fetched.
     """
-    stage = Stage(url_to_fetch, keep=True)
+    # The stage is named after the url, so that an interrupted download can
+    # be resumed from the partial file it left in the stage
+    digest = hashlib.sha256(url_to_fetch.encode("utf-8")).hexdigest()[:32]
+    stage = Stage(url_to_fetch, name=spack.stage.stage_prefix + "fetch-" + digest, keep=True)
     stage.create()
 
+    # Complete files from earlier attempts may be outdated, fetch them again
+    if stage.archive_file:
+        os.remove(stage.archive_file)
+
     try:
         stage.fetch()
     except web_util.FetchError:
-        stage.destroy()
+        partial_file = stage.save_filename and stage.save_filename + ".part"
+        if not (partial_file and os.path.exists(partial_file)):
+            stage.destroy()
         return None
 
     return stage
@@ -2121,6 +2130,56 @@ def get_mirrors_for_spec(spec=None, mirrors_to_check=None, index_only=False):
     return results
 
 
+def get_mirrors_for_specs(specs, mirrors_to_check=None, index_only=False, concurrency=16):
+    """
+    Bulk version of ``get_mirrors_for_spec``. Each unique spec is looked up once
+    in the local index cache, and only the specs missing from it are searched
+    directly on the mirrors, ``concurrency`` at a time.
+
+    Args:
+        specs (list): Concrete specs to look for in binary mirrors
+        mirrors_to_check (dict): Optionally override the configured mirrors
+            with the mirrors in this dictionary.
+        index_only (bool): When ``index_only`` is set to ``True``, only the local
+            cache is checked, no requests are made.
+        concurrency (int): Number of direct fetches performed at the same time
+
+    Return:
+        A dictionary mapping the DAG hash of each spec to the list of mirrors
+            where it can be found, in the format of ``get_mirrors_for_spec``.
+    """
+    specs = list(llnl.util.lang.dedupe(specs, key=lambda s: s.dag_hash()))
+
+    if not spack.mirror.MirrorCollection(mirrors=mirrors_to_check):
+        tty.debug("No Spack mirrors are currently configured")
+        return dict((s.dag_hash(), []) for s in specs)
+
+    results = {}
+    missing = []
+    for s in specs:
+        results[s.dag_hash()] = binary_index.find_built_spec(s, mirrors_to_check=mirrors_to_check)
+        if not results[s.dag_hash()] and not index_only:
+            missing.append(s)
+
+    if missing:
+        tty.debug("Searching mirrors directly for {0} specs".format(len(missing)))
+
+        def _search(s):
+            return get_mirrors_for_spec(s, mirrors_to_check=mirrors_to_check, index_only=False)
+
+        tp = multiprocessing.pool.ThreadPool(processes=max(1, min(concurrency, len(missing))))
+        try:
+            found = tp.map(_search, missing)
+        finally:
+            tp.terminate()
+            tp.join()
+
+        for s, mirrors in zip(missing, found):
+            results[s.dag_hash()] = mirrors
+
+    return results
+
+
 def update_cache_and_get_specs():
     """
     Get all concrete specs for build caches available on configured mirrors.
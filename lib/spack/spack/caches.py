@@ -94,3 +94,15 @@ def symlink(self, mirror_ref):
 fetch_cache: Union[
     spack.fetch_strategy.FsCache, llnl.util.lang.Singleton
 ] = llnl.util.lang.Singleton(_fetch_cache)
+
+
+def _expanded_source_cache():
+    path = os.path.join(fetch_cache_location(), "_expanded")
+    max_size = spack.config.get("config:expanded_source_cache_size", 0) * 2**20
+    return spack.fetch_strategy.ExpandedSourceCache(path, max_size)
+
+
+#: Pristine trees of expanded archives, copied into new stages
+expanded_source_cache: Union[
+    spack.fetch_strategy.ExpandedSourceCache, llnl.util.lang.Singleton
+] = llnl.util.lang.Singleton(_expanded_source_cache)
@@ -39,6 +39,7 @@
 import spack.util.git
 import spack.util.gpg as gpg_util
 import spack.util.spack_yaml as syaml
+import spack.util.timer as timer
 import spack.util.url as url_util
 import spack.util.web as web_util
 from spack import traverse
@@ -331,26 +332,30 @@ def _compute_spec_deps(spec_list, check_index_only=False, mirrors_to_check=None)
     def append_dep(s, d):
         dependencies.append({"spec": s, "depends": d})
 
-    for spec in spec_list:
-        for s in spec.traverse(deptype=all):
-            if s.external:
-                tty.msg("Will not stage external pkg: {0}".format(s))
-                continue
-
-            up_to_date_mirrors = bindist.get_mirrors_for_spec(
-                spec=s, mirrors_to_check=mirrors_to_check, index_only=check_index_only
-            )
+    # Every node shared by several roots is visited once, and the presence of all
+    # of them on the mirrors is resolved in a single bulk lookup.
+    nodes = []
+    for s in traverse.traverse_nodes(spec_list, deptype=all, key=lambda s: s.dag_hash()):
+        if s.external:
+            tty.msg("Will not stage external pkg: {0}".format(s))
+            continue
+        nodes.append(s)
+
+    up_to_date_mirrors = bindist.get_mirrors_for_specs(
+        nodes, mirrors_to_check=mirrors_to_check, index_only=check_index_only
+    )
 
-            skey = _spec_deps_key(s)
-            spec_labels[skey] = {"spec": s, "needs_rebuild": not up_to_date_mirrors}
+    for s in nodes:
+        skey = _spec_deps_key(s)
+        spec_labels[skey] = {"spec": s, "needs_rebuild": not up_to_date_mirrors[s.dag_hash()]}
 
-            for d in s.dependencies(deptype=all):
-                dkey = _spec_deps_key(d)
-                if d.external:
-                    tty.msg("Will not stage external dep: {0}".format(d))
-                    continue
+        for d in s.dependencies(deptype=all):
+            dkey = _spec_deps_key(d)
+            if d.external:
+                tty.msg("Will not stage external dep: {0}".format(d))
+                continue
 
-                append_dep(skey, dkey)
+            append_dep(skey, dkey)
 
     for spec_label, spec_holder in spec_labels.items():
         specs.append(
@@ -366,10 +371,6 @@ def append_dep(s, d):
     return deps_json_obj
 
 
-def _spec_matches(spec, match_string):
-    return spec.intersects(match_string)
-
-
 def _format_job_needs(
     phase_name,
     strip_compilers,
@@ -519,6 +520,50 @@ def _unpack_script(script_section, op=_noop):
     return script
 
 
+class _SubmappingIndex:
+    """Submapping section of ``ci:pipeline-gen`` compiled for matching many specs.
+
+    The match strings are parsed once, and the entries are indexed by the package
+    names they require, so that each spec is only checked against the entries that
+    could match it. Entries with anonymous or virtual match specs are checked for
+    every spec.
+    """
+
+    def __init__(self, section):
+        self.only_first = section.get("match_behavior", "first") == "first"
+        self.entries = []
+        self.by_name = {}
+        self.any_name = []
+
+        for idx, match_attrs in enumerate(reversed(section["submapping"])):
+            attrs = cfg.InternalConfigScope._process_dict_keyname_overrides(match_attrs)
+            match_specs = [spack.spec.Spec(m) for m in match_attrs["match"]]
+            self.entries.append((match_attrs, attrs, match_specs))
+
+            names = set(s.name for s in match_specs)
+            if not all(names) or any(spack.repo.path.is_virtual(n) for n in names):
+                self.any_name.append(idx)
+            else:
+                for name in names:
+                    self.by_name.setdefault(name, []).append(idx)
+
+    def apply(self, dest, spec):
+        """Apply the entries matching ``spec`` to the job attributes ``dest``"""
+        candidates = sorted(set(self.by_name.get(spec.name, [])).union(self.any_name))
+        for idx in candidates:
+            match_attrs, attrs, match_specs = self.entries[idx]
+            if not any(spec.intersects(m) for m in match_specs):
+                continue
+            if "build-job-remove" in match_attrs:
+                spack.config.remove_yaml(dest, attrs["build-job-remove"])
+            if "build-job" in match_attrs:
+                spack.config.merge_yaml(dest, attrs["build-job"])
+            if self.only_first:
+                break
+
+        return dest
+
+
 class SpackCI:
     """Spack CI object used to generate intermediate representation
     used by the CI generator(s).
@@ -589,26 +634,6 @@ def __job_name(name, suffix=""):
 
         return jname
 
-    def __apply_submapping(self, dest, spec, section):
-        """Apply submapping setion to the IR dict"""
-        matched = False
-        only_first = section.get("match_behavior", "first") == "first"
-
-        for match_attrs in reversed(section["submapping"]):
-            attrs = cfg.InternalConfigScope._process_dict_keyname_overrides(match_attrs)
-            for match_string in match_attrs["match"]:
-                if _spec_matches(spec, match_string):
-                    matched = True
-                    if "build-job-remove" in match_attrs:
-                        spack.config.remove_yaml(dest, attrs["build-job-remove"])
-                    if "build-job" in match_attrs:
-                        spack.config.merge_yaml(dest, attrs["build-job"])
-                    break
-            if matched and only_first:
-                break
-
-        return dest
-
     # Generate IR from the configs
     def generate_ir(self):
         """Generate the IR from the Spack CI configurations."""
@@ -691,11 +716,10 @@ def _apply_section(dest, src):
 
             elif has_submapping:
                 # Apply section jobs with specs to match
+                submapping = _SubmappingIndex(section)
                 for _, job in jobs.items():
                     if job["spec"]:
-                        job["attributes"] = self.__apply_submapping(
-                            job["attributes"], job["spec"], section
-                        )
+                        job["attributes"] = submapping.apply(job["attributes"], job["spec"])
 
         for _, job in jobs.items():
             if job["spec"]:
@@ -746,10 +770,13 @@ def generate_gitlab_ci_yaml(
             criteria.  Spack protected pipelines populate different mirrors based
             on branch name, facilitated by this option.
     """
+    t = timer.Timer()
+    t.start("concretize")
     with spack.concretize.disable_compiler_existence_check():
         with env.write_transaction():
             env.concretize()
             env.write()
+    t.stop("concretize")
 
     yaml_root = ev.config_dict(env.manifest)
 
@@ -988,11 +1015,14 @@ def generate_gitlab_ci_yaml(
 
     # Speed up staging by first fetching binary indices from all mirrors
     # (including the override mirror we may have just added above).
+    t.start("index")
     try:
         bindist.binary_index.update()
     except bindist.FetchCacheError as e:
         tty.warn(e)
+    t.stop("index")
 
+    t.start("stage")
     staged_phases = {}
     try:
         for phase in phases:
@@ -1026,6 +1056,7 @@ def generate_gitlab_ci_yaml(
             spack.mirror.remove("ci_pr_mirror", cfg.default_modify_scope())
         if spack_pipeline_type == "spack_pull_request":
             spack.mirror.remove("ci_shared_pr_mirror", cfg.default_modify_scope())
+    t.stop("stage")
 
     all_job_names = []
     output_object = {}
@@ -1048,8 +1079,12 @@ def generate_gitlab_ci_yaml(
         else:
             broken_spec_urls = web_util.list_url(broken_specs_url)
 
+    t.start("match")
     spack_ci = SpackCI(ci_config, phases, staged_phases)
     spack_ci_ir = spack_ci.generate_ir()
+    t.stop("match")
+
+    t.start("jobs")
 
     for phase in phases:
         phase_name = phase["name"]
@@ -1504,8 +1539,19 @@ def main_script_replacements(cmd):
         if not rebuild_everything:
             sys.exit(1)
 
+    t.stop("jobs")
+
+    # Emit the yaml directly into the file, instead of rendering the whole
+    # pipeline in memory first.
+    t.start("write")
     with open(output_file, "w") as outf:
-        outf.write(syaml.dump(sorted_output, default_flow_style=True))
+        syaml.dump(sorted_output, stream=outf, default_flow_style=True)
+    t.stop("write")
+    t.stop()
+
+    if print_summary:
+        tty.msg("Pipeline generation times:")
+        t.write_tty()
 
 
 def _url_encode_string(input_string):
@@ -15,20 +15,14 @@
 
 import llnl.util.tty as tty
 from llnl.util.filesystem import join_path
-from llnl.util.lang import attr_setdefault, index_by
+from llnl.util.lang import attr_setdefault, index_by, memoized
 from llnl.util.tty.colify import colify
 from llnl.util.tty.color import colorize
 
 import spack.config
-import spack.environment as ev
 import spack.error
 import spack.extensions
-import spack.parser
 import spack.paths
-import spack.spec
-import spack.store
-import spack.traverse as traverse
-import spack.user_environment as uenv
 import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 import spack.util.string
@@ -149,6 +143,15 @@ def get_command(cmd_name):
     return getattr(get_module(cmd_name), pname)
 
 
+@memoized
+def _flags_arg_pattern():
+    import spack.spec
+
+    return re.compile(
+        r'^({0})=([^\'"].*)$'.format("|".join(spack.spec.FlagMap.valid_compiler_flags()))
+    )
+
+
 class _UnquotedFlags(object):
     """Use a heuristic in `.extract()` to detect whether the user is trying to set
     multiple flags like the docker ENV attribute allows (e.g. 'cflags=-Os -pipe').
@@ -158,10 +161,6 @@ class _UnquotedFlags(object):
     `.report()`.
     """
 
-    flags_arg_pattern = re.compile(
-        r'^({0})=([^\'"].*)$'.format("|".join(spack.spec.FlagMap.valid_compiler_flags()))
-    )
-
     def __init__(self, all_unquoted_flag_pairs: List[Tuple[Match[str], str]]):
         self._flag_pairs = all_unquoted_flag_pairs
 
@@ -175,7 +174,7 @@ def extract(cls, sargs: str) -> "_UnquotedFlags":
         for arg in shlex.split(sargs):
             if prev_flags_arg is not None:
                 all_unquoted_flag_pairs.append((prev_flags_arg, arg))
-            prev_flags_arg = cls.flags_arg_pattern.match(arg)
+            prev_flags_arg = _flags_arg_pattern().match(arg)
         return cls(all_unquoted_flag_pairs)
 
     def report(self) -> str:
@@ -204,6 +203,8 @@ def parse_specs(args, **kwargs):
     """Convenience function for parsing arguments from specs.  Handles common
     exceptions and dies if there are errors.
     """
+    import spack.parser
+
     concretize = kwargs.get("concretize", False)
     normalize = kwargs.get("normalize", False)
     tests = kwargs.get("tests", False)
@@ -240,6 +241,8 @@ def matching_spec_from_env(spec):
     If no matching spec is found in the environment (or if no environment is
     active), this will return the given spec but concretized.
     """
+    import spack.environment as ev
+
     env = ev.active_environment()
     if env:
         return env.matching_spec(spec) or spec.concretized()
@@ -274,6 +277,8 @@ def disambiguate_spec_from_hashes(spec, hashes, local=False, installed=True, fir
             install status argument passed to database query.
             See ``spack.database.Database._query`` for details.
     """
+    import spack.store
+
     if local:
         matching_specs = spack.store.db.query_local(spec, hashes=hashes, installed=installed)
     else:
@@ -334,6 +339,8 @@ def display_specs_as_json(specs, deps=False):
 
 def iter_groups(specs, indent, all_headers):
     """Break a list of specs into groups indexed by arch/compiler."""
+    import spack.spec
+
     # Make a dict with specs keyed by architecture and compiler.
     index = index_by(specs, ("architecture", "compiler"))
     ispace = indent * " "
@@ -396,6 +403,8 @@ def display_specs(specs, args=None, **kwargs):
         output (typing.IO): A file object to write to. Default is ``sys.stdout``
 
     """
+    import spack.store
+    import spack.traverse as traverse
 
     def get_arg(name, default=None):
         """Prefer kwargs, then args, then default."""
@@ -503,6 +512,8 @@ def format_list(specs):
 def filter_loaded_specs(specs):
     """Filter a list of specs returning only those that are
     currently loaded."""
+    import spack.user_environment as uenv
+
     hashes = os.environ.get(uenv.spack_loaded_hashes_var, "").split(":")
     return [x for x in specs if x.dag_hash() in hashes]
 
@@ -584,6 +595,8 @@ def require_active_env(cmd_name):
     Returns:
         (spack.environment.Environment): the active environment
     """
+    import spack.environment as ev
+
     env = ev.active_environment()
 
     if env:
@@ -614,6 +627,11 @@ def find_environment(args):
         (spack.environment.Environment): a found environment, or ``None``
     """
 
+    if not (args.env or args.env_dir or os.environ.get(spack.paths.spack_env_var)):
+        return None
+
+    import spack.environment as ev
+
     # treat env as a name
     env = args.env
     if env:
@@ -627,7 +645,7 @@ def find_environment(args):
 
         # if no argument, look for the environment variable
         if not env:
-            env = os.environ.get(ev.spack_env_var)
+            env = os.environ.get(spack.paths.spack_env_var)
 
             # nothing was set; there's no active environment
             if not env:
@@ -62,6 +62,14 @@ def setup_parser(subparser):
         default=False,
         help="add new versions to package",
     )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of archives to download at the same time "
+        "(default: config:max_fetches_per_host)",
+    )
     arguments.add_common_arguments(subparser, ["package"])
     subparser.add_argument(
         "versions", nargs=argparse.REMAINDER, help="versions to generate checksums for"
@@ -74,6 +82,9 @@ def checksum(parser, args):
         args.versions = [args.package.split("@")[1]]
         args.package = args.package.split("@")[0]
 
+    if args.jobs is not None and args.jobs < 1:
+        tty.die("`spack checksum -j` requires a positive number of jobs.")
+
     # Make sure the user provided a package and not a URL
     if not valid_fully_qualified_module_name(args.package):
         tty.die("`spack checksum` accepts package names, not URLs.")
@@ -117,6 +128,7 @@ def checksum(parser, args):
         batch=(args.batch or len(args.versions) > 0 or len(url_dict) == 1),
         latest=args.latest,
         fetch_options=pkg.fetch_options,
+        concurrency=args.jobs,
     )
 
     print()
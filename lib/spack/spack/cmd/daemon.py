@@ -0,0 +1,84 @@
+# Copyright 2013-2023 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import os
+
+import llnl.util.lang
+import llnl.util.tty as tty
+
+import spack.daemon
+import spack.paths
+
+description = "keep a warm Spack process to run repeated commands faster"
+section = "admin"
+level = "long"
+
+
+def setup_parser(subparser):
+    sp = subparser.add_subparsers(metavar="SUBCOMMAND", dest="daemon_command")
+
+    start = sp.add_parser("start", help="serve commands in the foreground until stopped")
+    stop = sp.add_parser("stop", help="stop a running daemon")
+    status = sp.add_parser("status", help="show whether a daemon is running")
+    for p in (start, stop, status):
+        p.add_argument(
+            "--socket",
+            default=default_socket_path(),
+            help="unix socket the daemon listens on (default: %(default)s)",
+        )
+
+
+def default_socket_path():
+    return os.environ.get(spack.daemon.socket_env_var) or os.path.join(
+        spack.paths.user_cache_path, "daemon.sock"
+    )
+
+
+def daemon_start(args):
+    if not spack.daemon.supported():
+        tty.die("spack daemon needs unix sockets and fork, which this platform lacks")
+
+    daemon = spack.daemon.Daemon(args.socket)
+    daemon.listen()
+
+    tty.msg("Loading configuration, package repositories and the install database")
+    daemon.warm()
+
+    tty.msg(
+        "Serving spack commands on %s" % args.socket,
+        "Use it by setting %s=%s" % (spack.daemon.socket_env_var, args.socket),
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    tty.msg("Stopped after serving %d commands" % daemon.served)
+
+
+def daemon_stop(args):
+    reply = spack.daemon.control(args.socket, "stop")
+    if reply is None:
+        tty.die("no spack daemon is listening on %s" % args.socket)
+    tty.msg("Stopped the spack daemon with pid %d" % reply["pid"])
+
+
+def daemon_status(args):
+    reply = spack.daemon.control(args.socket, "status")
+    if reply is None:
+        tty.msg("No spack daemon is listening on %s" % args.socket)
+        return 1
+
+    tty.msg(
+        "A spack daemon with pid %d is listening on %s" % (reply["pid"], reply["socket"]),
+        "Uptime:   %s" % llnl.util.lang.pretty_seconds(reply["uptime"]),
+        "Served:   %d commands" % reply["served"],
+        "Running:  %d commands" % reply["running"],
+    )
+    return 0
+
+
+def daemon(parser, args):
+    action = {"start": daemon_start, "stop": daemon_stop, "status": daemon_status}
+    return action[args.daemon_command](args)
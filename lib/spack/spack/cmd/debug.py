@@ -8,18 +8,23 @@
 import os
 import platform
 import re
+import sys
 from datetime import datetime
 from glob import glob
 
 import llnl.util.tty as tty
 from llnl.util.filesystem import working_dir
+from llnl.util.lang import pretty_seconds
 
 import spack.config
 import spack.paths
 import spack.platforms
 import spack.util.git
+import spack.util.lock
+import spack.util.spack_json as sjson
 from spack.main import get_version
 from spack.util.executable import which
+from spack.util.string import plural
 
 description = "debugging commands for troubleshooting Spack"
 section = "developer"
@@ -31,6 +36,16 @@ def setup_parser(subparser):
     sp.add_parser("create-db-tarball", help="create a tarball of Spack's installation metadata")
     sp.add_parser("report", help="print information useful for bug reports")
 
+    locks = sp.add_parser("locks", help="report lock contention recorded with --lock-profile")
+    locks.add_argument(
+        "directory",
+        nargs="?",
+        default=os.environ.get(spack.util.lock.lock_profile_env_var),
+        help="directory with the lock profiles (default: $%s)"
+        % spack.util.lock.lock_profile_env_var,
+    )
+    locks.add_argument("--json", action="store_true", help="print the combined profile as JSON")
+
 
 def _debug_tarball_suffix():
     now = datetime.now()
@@ -95,6 +110,66 @@ def report(args):
     print("* **Concretizer:**", spack.config.get("config:concretizer"))
 
 
+def locks(args):
+    if not args.directory:
+        tty.die(
+            "no lock profile directory given",
+            "Record lock profiles with `spack --lock-profile DIR ...` or by setting $%s"
+            % spack.util.lock.lock_profile_env_var,
+        )
+
+    profile = spack.util.lock.read_lock_profiles(args.directory)
+    if args.json:
+        sjson.dump(profile, sys.stdout)
+        print()
+        return
+
+    if not profile["locks"]:
+        tty.msg("No lock profiles in %s" % args.directory)
+        return
+
+    tty.msg(
+        "Locks taken by %s, by total wait time"
+        % plural(profile["processes"], "process", "processes")
+    )
+    by_wait = sorted(profile["locks"].items(), key=lambda item: -item[1]["wait"]["total"])
+    for path, stats in by_wait:
+        print(path)
+        print(
+            "    acquired   %d read, %d write, %d timed out (%s)"
+            % (
+                stats["acquired"]["read"],
+                stats["acquired"]["write"],
+                stats["timeouts"],
+                plural(stats["attempts"], "attempt"),
+            )
+        )
+        for key in ("wait", "hold"):
+            print(
+                "    %-10s %s total, %s max"
+                % (key, pretty_seconds(stats[key]["total"]), pretty_seconds(stats[key]["max"]))
+            )
+
+        # Waits by bucket, e.g. "< 1ms: 10", skipping empty buckets
+        bounds = ["< %s" % pretty_seconds(b) for b in profile["buckets"]]
+        bounds.append(">= %s" % pretty_seconds(profile["buckets"][-1]))
+        waits = [
+            "%s: %d" % (bound, count)
+            for bound, count in zip(bounds, stats["wait"]["histogram"])
+            if count
+        ]
+        print("    waits      %s" % ", ".join(waits))
+
+        holders = sorted(stats["holders"].items(), key=lambda item: -item[1]["time"])
+        for holder, held in holders[:5]:
+            print(
+                "    held by    %s, %s for %s"
+                % (holder, plural(held["count"], "time"), pretty_seconds(held["time"]))
+            )
+        if len(holders) > 5:
+            print("    held by    %d others" % (len(holders) - 5))
+
+
 def debug(parser, args):
-    action = {"create-db-tarball": create_db_tarball, "report": report}
+    action = {"create-db-tarball": create_db_tarball, "report": report, "locks": locks}
     action[args.debug_command](args)
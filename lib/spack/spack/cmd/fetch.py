@@ -3,13 +3,17 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import sys
+
 import llnl.util.tty as tty
 
 import spack.cmd
 import spack.cmd.common.arguments as arguments
 import spack.config
 import spack.environment as ev
+import spack.fetch_strategy
 import spack.repo
+import spack.version
 
 description = "fetch archives for packages"
 section = "build"
@@ -63,6 +67,7 @@ def fetch(parser, args):
     if args.deprecated:
         spack.config.set("config:deprecated", True, scope="command_line")
 
+    to_fetch = {}
     for spec in specs:
         if args.missing or args.dependencies:
             for s in spec.traverse(root=False):
@@ -70,5 +75,40 @@ def fetch(parser, args):
                 if args.missing and s.installed:
                     continue
 
-                s.package.do_fetch()
-        spec.package.do_fetch()
+                to_fetch.setdefault(s.dag_hash(), s)
+        to_fetch.setdefault(spec.dag_hash(), spec)
+
+    # Packages that may ask for confirmation are fetched here, the others
+    # concurrently in worker processes
+    interactive = [s for s in to_fetch.values() if _may_ask_confirmation(s.package)]
+    for s in interactive:
+        s.package.do_fetch()
+
+    concurrent = [s for s in to_fetch.values() if s not in interactive]
+    results = spack.fetch_strategy.fetch_concurrently(concurrent, _do_fetch)
+    errors = [(s, msg) for s, (_, msg) in zip(concurrent, results) if msg]
+    for s, msg in errors:
+        tty.error("Failed to fetch {0}: {1}".format(s.cformat("{name}{@version}"), msg))
+    if errors:
+        tty.die("{0} package(s) could not be fetched".format(len(errors)))
+
+
+def _do_fetch(spec):
+    spec.package.do_fetch()
+
+
+def _may_ask_confirmation(pkg):
+    """Whether fetching a package may ask the user for confirmation, which is
+    the case for versions without a checksum, or deprecated ones.
+    """
+    if not sys.stdout.isatty() or not pkg.has_code or pkg.spec.external:
+        return False
+
+    no_checksum = pkg.version not in pkg.versions and not isinstance(
+        pkg.version, spack.version.GitVersion
+    )
+    if spack.config.get("config:checksum") and no_checksum:
+        return True
+
+    deprecated = pkg.versions.get(pkg.version, {}).get("deprecated", False)
+    return deprecated and not spack.config.get("config:deprecated")
@@ -451,15 +451,7 @@ def mirror_create(args):
 
 def create_mirror_for_all_specs(path, skip_unstable_versions, selection_fn):
     mirror_specs = all_specs_with_all_versions(selection_fn=selection_fn)
-    mirror_cache, mirror_stats = spack.mirror.mirror_cache_and_stats(
-        path, skip_unstable_versions=skip_unstable_versions
-    )
-    for candidate in mirror_specs:
-        pkg_cls = spack.repo.path.get_pkg_class(candidate.name)
-        pkg_obj = pkg_cls(spack.spec.Spec(candidate))
-        mirror_stats.next_spec(pkg_obj.spec)
-        spack.mirror.create_mirror_from_package_object(pkg_obj, mirror_cache, mirror_stats)
-    process_mirror_stats(*mirror_stats.stats())
+    process_mirror_stats(*spack.mirror.create(path, mirror_specs, skip_unstable_versions))
 
 
 def create_mirror_for_all_specs_inside_environment(path, skip_unstable_versions, selection_fn):
@@ -347,14 +347,11 @@ def refresh(module_type, specs, args):
     spack.modules.common.generate_module_index(
         module_type_root, writers, overwrite=args.delete_tree
     )
-    for x in writers:
-        try:
-            x.write(overwrite=True)
-        except Exception as e:
-            tty.debug(e)
-            msg = "Could not write module file [{0}]"
-            tty.warn(msg.format(x.layout.filename))
-            tty.warn("\t--> {0} <--".format(str(e)))
+    failures = spack.modules.common.write_module_files(writers, overwrite=True)
+    for x, error in failures:
+        msg = "Could not write module file [{0}]"
+        tty.warn(msg.format(x.layout.filename))
+        tty.warn("\t--> {0} <--".format(error))
 
 
 #: Dictionary populated with the list of sub-commands.
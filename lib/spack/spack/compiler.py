@@ -4,23 +4,27 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import contextlib
+import hashlib
 import itertools
+import json
 import os
 import platform
 import re
 import shutil
 import sys
 import tempfile
-from typing import List, Optional, Sequence
+from typing import List, Optional, Sequence, Union
 
 import llnl.util.lang
 import llnl.util.tty as tty
 from llnl.util.filesystem import path_contains_subdirectory, paths_containing_libs
+from llnl.util.lock import LockError
 
 import spack.compilers
 import spack.error
 import spack.spec
 import spack.util.executable
+import spack.util.file_cache
 import spack.util.module_cmd
 import spack.version
 from spack.util.environment import filter_system_paths
@@ -365,7 +369,14 @@ def real_version(self):
         """
         if not self._real_version:
             try:
-                real_version = spack.version.Version(self.get_real_version())
+                real_version = spack.version.Version(
+                    compiler_cache.value(
+                        self,
+                        "real_version",
+                        self.get_real_version,
+                        cache_if=lambda version: version != "unknown",
+                    )
+                )
                 if real_version == spack.version.Version("unknown"):
                     return self.version
                 self._real_version = real_version
@@ -380,7 +391,13 @@ def implicit_rpaths(self):
         # Put CXX first since it has the most linking issues
         # And because it has flags that affect linking
         exe_paths = [x for x in [self.cxx, self.cc, self.fc, self.f77] if x]
-        link_dirs = self._get_compiler_link_paths(exe_paths)
+        # Errors running the compiler result in no link dirs, so don't cache those
+        link_dirs = compiler_cache.value(
+            self,
+            "implicit_link_dirs",
+            lambda: self._get_compiler_link_paths(exe_paths),
+            cache_if=bool,
+        )
 
         all_required_libs = list(self.required_libs) + Compiler._all_compiler_rpath_libraries
         return list(paths_containing_libs(link_dirs, all_required_libs))
@@ -669,6 +686,107 @@ def compiler_environment(self):
             os.environ.update(backup_env)
 
 
+class CompilerCache(object):
+    """Persistent cache of the information Spack gets by running compilers.
+
+    Getting the implicit link directories or the real version of a compiler
+    means running it, possibly after loading modules. The results are stored
+    in a file cache shared by all Spack processes, in one entry per compiler.
+    Entries are keyed on the compiler class, its modules, environment and flags
+    and on the path, size and modification time of its executables, so they are
+    invalidated automatically when the compiler changes. Compilers whose
+    executables are not absolute paths to existing files are never cached.
+    """
+
+    def __init__(self, cache: spack.util.file_cache.FileCache):
+        self.cache = cache
+
+    def _key(self, compiler):
+        """Return the cache key of a compiler, or None if it can't be cached."""
+        executables = []
+        for exe in (compiler.cc, compiler.cxx, compiler.f77, compiler.fc):
+            if not exe:
+                continue
+            if not os.path.isabs(exe):
+                return None
+            try:
+                st = os.stat(exe)
+            except OSError:
+                return None
+            executables.append((exe, st.st_size, st.st_mtime_ns))
+
+        data = {
+            "class": "{0}.{1}".format(type(compiler).__module__, type(compiler).__name__),
+            "spec": str(compiler.spec),
+            "operating_system": compiler.operating_system,
+            "executables": executables,
+            "flags": dict((k, list(v)) for k, v in sorted(compiler.flags.items())),
+            "modules": list(compiler.modules),
+            "environment": compiler.environment,
+            "version_argument": compiler.version_argument,
+            "verbose_flag": compiler.verbose_flag,
+        }
+        try:
+            content = json.dumps(data, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        return os.path.join("compilers", hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+    def _read(self, key):
+        if not self.cache.init_entry(key):
+            return {}
+        with self.cache.read_transaction(key) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+
+    def value(self, compiler, name, compute, cache_if=None):
+        """Return the value called ``name`` for a compiler.
+
+        If the value is not in the cache, it is computed by calling ``compute``,
+        and stored unless ``cache_if`` is given and returns False for it. Errors
+        accessing the cache are never fatal.
+        """
+        key = self._key(compiler)
+        if key is None:
+            return compute()
+
+        try:
+            entry = self._read(key)
+        except (spack.error.SpackError, LockError, OSError, ValueError) as e:
+            tty.debug("Cannot read compiler cache entry {0}: {1}".format(key, str(e)))
+            entry = {}
+        if name in entry:
+            return entry[name]
+
+        value = compute()
+        if cache_if is not None and not cache_if(value):
+            return value
+
+        try:
+            with self.cache.write_transaction(key) as (old, new):
+                try:
+                    entry = json.load(old) if old else {}
+                except ValueError:
+                    entry = {}
+                entry[name] = value
+                json.dump(entry, new)
+        except (spack.error.SpackError, LockError, OSError) as e:
+            tty.debug("Cannot write compiler cache entry {0}: {1}".format(key, str(e)))
+        return value
+
+
+def _compiler_cache():
+    import spack.caches
+
+    return CompilerCache(spack.caches.misc_cache)
+
+
+#: Cache of the information obtained by running compilers
+compiler_cache: Union[CompilerCache, llnl.util.lang.Singleton] = llnl.util.lang.Singleton(
+    _compiler_cache
+)
+
+
 class CompilerAccessError(spack.error.SpackError):
     def __init__(self, compiler, paths):
         msg = "Compiler '%s' has executables that are missing" % compiler.spec
@@ -32,11 +32,15 @@
 import contextlib
 import copy
 import functools
+import hashlib
+import json
 import os
 import re
 import sys
+import tempfile
+import time
 from contextlib import contextmanager
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import llnl.util.lang
 import llnl.util.tty as tty
@@ -63,6 +67,20 @@
 from spack.error import SpackError
 from spack.util.cpus import cpus_available
 
+#: Whether parsed and validated configuration files are snapshotted in the misc
+#: cache, so that unchanged files need not be parsed and validated again
+use_snapshots = True
+
+#: Bump this when the format of config snapshots changes
+_snapshot_format = 2
+
+#: True while the misc cache is looked up for snapshots. The misc cache reads
+#: its location from configuration, which must then be read without snapshots.
+_looking_up_snapshot_cache = False
+
+#: Maximum number of merged layers kept per section by a Configuration
+_max_merged_layers = 16
+
 #: Dict from section names -> schema for that section
 section_schemas = {
     "compilers": spack.schema.compilers.schema,
@@ -147,6 +165,18 @@ def get_section(self, section):
             self.sections[section] = data
         return self.sections[section]
 
+    def _reread_section(self, section):
+        """Read ``section`` from its file again if it was read from a snapshot,
+        so that its comments are kept when it is written. Return the new data,
+        or None if the section was not read again.
+        """
+        if not _from_snapshot(self.sections.get(section)):
+            return None
+        path = self.get_section_filename(section)
+        data = read_config_file(path, section_schemas[section], use_snapshot=False)
+        self.sections[section] = data
+        return data
+
     def _write_section(self, section):
         filename = self.get_section_filename(section)
         data = self.get_section(section)
@@ -251,6 +281,14 @@ def get_section(self, section):
 
         return self.sections.get(section, None)
 
+    def _reread_section(self, section):
+        # All sections share the raw data, which is written as a whole
+        if not _from_snapshot(self._raw_data):
+            return None
+        self._raw_data = read_config_file(self.path, self.schema, use_snapshot=False)
+        self.sections = syaml.syaml_dict()
+        return self.get_section(section)
+
     def _write_section(self, section):
         data_to_write = self._raw_data
 
@@ -380,6 +418,10 @@ def _config_mutator(method):
     """Decorator to mark all the methods in the Configuration class
     that mutate the underlying configuration. Used to clear the
     memoization cache.
+
+    Merged layers are not cleared here: pushing or popping a scope leaves
+    them valid, and methods changing the content of a scope invalidate the
+    layers that scope is part of.
     """
 
     @functools.wraps(method)
@@ -408,6 +450,8 @@ def __init__(self, *scopes: ConfigScope):
 
         """
         self.scopes = collections.OrderedDict()
+        # section -> (tuple of scopes, lowest first) -> merged data of those scopes
+        self._merged_layers: Dict[str, Dict[Tuple[ConfigScope, ...], Dict]] = {}
         for scope in scopes:
             self.push_scope(scope)
         self.format_updates: Dict[str, List[str]] = collections.defaultdict(list)
@@ -499,9 +543,33 @@ def clear_caches(self):
         """Clears the caches for configuration files,
 
         This will cause files to be re-read upon the next request."""
+        self._merged_layers.clear()
         for scope in self.scopes.values():
             scope.clear()
 
+    def _invalidate_merged_layers(self, scope: ConfigScope):
+        """Drop the merged layers built on top of the content of ``scope``."""
+        for layers in self._merged_layers.values():
+            for key in [key for key in layers if scope in key]:
+                del layers[key]
+
+    def _merged_base(self, section: str, scopes: List[ConfigScope]):
+        """Return a copy of the largest merged layer that is a prefix of ``scopes``,
+        along with the number of scopes it accounts for.
+        """
+        layers = self._merged_layers.get(section, {})
+        for length in range(len(scopes), 0, -1):
+            layer = layers.get(tuple(scopes[:length]))
+            if layer is not None:
+                return syaml.deepcopy(layer), length
+        return syaml.syaml_dict(), 0
+
+    def _store_merged_layer(self, section: str, scopes: List[ConfigScope], merged: Dict):
+        layers = self._merged_layers.setdefault(section, {})
+        while len(layers) >= _max_merged_layers:
+            del layers[next(iter(layers))]
+        layers[tuple(scopes)] = syaml.deepcopy(merged)
+
     @_config_mutator
     def update_config(
         self, section: str, update_data: Dict, scope: Optional[str] = None, force: bool = False
@@ -538,6 +606,12 @@ def update_config(
 
         _validate_section_name(section)  # validate section name
         scope = self._validate_scope(scope)  # get ConfigScope object
+        self._invalidate_merged_layers(scope)
+
+        # snapshots of config files have no comments, so read them from the file
+        current = scope._reread_section(section)
+        if current and section in current:
+            _copy_comments(current[section], update_data)
 
         # manually preserve comments
         need_comment_copy = section in scope.sections and scope.sections[section]
@@ -583,12 +657,15 @@ def _get_config_memoized(self, section, scope):
         _validate_section_name(section)
 
         if scope is None:
-            scopes = self.scopes.values()
+            # Overrides and environments push and pop scopes on top of the
+            # same base, so start from the merge of the longest known prefix
+            scopes = list(self.scopes.values())
+            merged_section, start = self._merged_base(section, scopes)
         else:
             scopes = [self._validate_scope(scope)]
+            merged_section, start = syaml.syaml_dict(), 0
 
-        merged_section = syaml.syaml_dict()
-        for scope in scopes:
+        for scope in scopes[start:]:
             # read potentially cached data from the scope.
 
             data = scope.get_section(section)
@@ -608,6 +685,9 @@ def _get_config_memoized(self, section, scope):
 
             merged_section = merge_yaml(merged_section, data)
 
+        if len(scopes) > 1 and start < len(scopes):
+            self._store_merged_layer(section, scopes, merged_section)
+
         # no config files -- empty config.
         if section not in merged_section:
             return syaml.syaml_dict()
@@ -971,11 +1051,13 @@ def validate(data, schema, filename=None):
     return test_data
 
 
-def read_config_file(filename, schema=None):
+def read_config_file(filename, schema=None, use_snapshot=True):
     """Read a YAML configuration file.
 
     User can provide a schema for validation. If no schema is provided,
-    we will infer the schema from the top-level key."""
+    we will infer the schema from the top-level key. Unless ``use_snapshot``
+    is False, the data may come from a snapshot of the file, which has no
+    comments."""
     # Dev: Inferring schema and allowing it to be provided directly allows us
     # to preserve flexibility in calling convention (don't need to provide
     # schema when it's not necessary) while allowing us to validate against a
@@ -992,6 +1074,12 @@ def read_config_file(filename, schema=None):
     elif not os.access(filename, os.R_OK):
         raise ConfigFileError("Config file is not readable: {0}".format(filename))
 
+    snapshot = _ConfigSnapshot(filename, schema)
+    found, data = snapshot.load() if use_snapshot else (False, None)
+    if found:
+        tty.debug("Reading config from snapshot of file {0}".format(filename))
+        return data
+
     try:
         tty.debug("Reading config from file {0}".format(filename))
         with open(filename) as f:
@@ -1002,6 +1090,7 @@ def read_config_file(filename, schema=None):
                 key = next(iter(data))
                 schema = all_schemas[key]
             validate(data, schema)
+        snapshot.dump(data)
         return data
 
     except StopIteration:
@@ -1014,6 +1103,209 @@ def read_config_file(filename, schema=None):
         raise ConfigFileError(f"Error reading configuration file {filename}: {str(e)}") from e
 
 
+#: Dict from id of a schema -> (schema, fingerprint of the schema)
+_schema_fingerprints: Dict[int, Tuple[Dict, str]] = {}
+
+
+def _schema_fingerprint(schema):
+    """Return a digest identifying the content of a schema."""
+    if schema is None:
+        return "inferred"
+    # Schemas are long-lived module globals, so memoize on their id. The schema
+    # itself is kept alive in the dictionary, hence ids are never reused.
+    entry = _schema_fingerprints.get(id(schema))
+    if entry is None:
+        content = json.dumps(schema, sort_keys=True, default=repr)
+        entry = (schema, hashlib.sha256(content.encode("utf-8")).hexdigest())
+        _schema_fingerprints[id(schema)] = entry
+    return entry[1]
+
+
+def _snapshot_cache():
+    """Return the cache where config snapshots are stored, or None if snapshots
+    cannot be used right now.
+    """
+    global _looking_up_snapshot_cache
+    if not use_snapshots or _looking_up_snapshot_cache:
+        return None
+
+    import spack.caches
+
+    _looking_up_snapshot_cache = True
+    try:
+        cache = spack.caches.misc_cache
+        # Instantiate the cache here, while config is read without snapshots
+        cache.cache_path("config")
+        return cache
+    except Exception as e:
+        tty.debug("Cannot use config snapshots: {0}".format(str(e)))
+        return None
+    finally:
+        _looking_up_snapshot_cache = False
+
+
+def _encode_mark(mark):
+    return [mark.name, mark.index, mark.line, mark.column]
+
+
+def _decode_mark(encoded):
+    mark = syaml.name_mark(encoded[0])
+    mark.index, mark.line, mark.column = encoded[1:]
+    return mark
+
+
+def _encode_snapshot(data):
+    """Encode Spack YAML data as JSON compatible data, keeping the marks of
+    the data and the flags of the keys.
+    """
+    if isinstance(data, dict):
+        result = {"map": [[_encode_snapshot(k), _encode_snapshot(v)] for k, v in data.items()]}
+    elif isinstance(data, list):
+        result = {"seq": [_encode_snapshot(x) for x in data]}
+    elif isinstance(data, str):
+        result = {"str": str(data)}
+        for flag in ("override", "append", "prepend"):
+            if getattr(data, flag, False):
+                result[flag] = True
+    elif data is None or isinstance(data, (bool, int, float)):
+        return data
+    else:
+        raise TypeError("cannot snapshot objects of type {0}".format(type(data).__name__))
+
+    for attr in ("_start_mark", "_end_mark"):
+        mark = getattr(data, attr, None)
+        if mark is not None:
+            result[attr] = _encode_mark(mark)
+    return result
+
+
+def _decode_snapshot(data):
+    """Inverse of ``_encode_snapshot()``."""
+    if not isinstance(data, dict):
+        return data
+
+    if "map" in data:
+        result = syaml.syaml_dict(
+            (_decode_snapshot(k), _decode_snapshot(v)) for k, v in data["map"]
+        )
+    elif "seq" in data:
+        result = syaml.syaml_list(_decode_snapshot(x) for x in data["seq"])
+    else:
+        result = syaml.syaml_str(data["str"])
+        for flag in ("override", "append", "prepend"):
+            if flag in data:
+                setattr(result, flag, True)
+
+    for attr in ("_start_mark", "_end_mark"):
+        if attr in data:
+            setattr(result, attr, _decode_mark(data[attr]))
+    return result
+
+
+def _from_snapshot(data):
+    """Whether ``data`` was read from a config snapshot, which has no comments."""
+    return getattr(data, "_from_snapshot", False)
+
+
+def _copy_comments(source, dest):
+    """Copy the comments of YAML data ``source`` onto the same items of ``dest``."""
+    if isinstance(source, dict) and isinstance(dest, dict):
+        pairs = [(source[k], v) for k, v in dest.items() if k in source]
+    elif isinstance(source, list) and isinstance(dest, list):
+        pairs = list(zip(source, dest))
+    else:
+        return
+
+    data_comments = syaml.extract_comments(source)
+    if data_comments is not None and syaml.extract_comments(dest) is None:
+        syaml.set_comments(dest, data_comments=data_comments)
+    for item_source, item_dest in pairs:
+        _copy_comments(item_source, item_dest)
+
+
+class _ConfigSnapshot(object):
+    """Snapshot of a configuration file that was parsed and validated.
+
+    Snapshots are stored as JSON in the misc cache, along with the line
+    information and the override markers of the Spack YAML data. Comments are
+    not kept, so scopes read their files again before writing them. A snapshot
+    is used only if the file has the same path, inode, size, modification and
+    change time it had when the snapshot was taken, and if it was taken by the
+    same version of Spack against the same schema. Failures to read or write
+    snapshots are never fatal: the file is just parsed and validated as usual.
+    """
+
+    #: Files modified less than this many seconds ago are not snapshotted, since
+    #: they could be modified again without their timestamps changing.
+    racy_interval = 2
+
+    def __init__(self, filename, schema):
+        self.path = None
+        self.key = None
+        self.mtime = None
+
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return
+
+        self.mtime = st.st_mtime
+        filename = os.path.abspath(filename)
+        fingerprint = _schema_fingerprint(schema)
+        self.key = [
+            _snapshot_format,
+            spack.spack_version,
+            filename,
+            fingerprint,
+            st.st_ino,
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_ctime_ns,
+        ]
+        cache = _snapshot_cache()
+        if cache is not None:
+            name = hashlib.sha256("{0}:{1}".format(filename, fingerprint).encode("utf-8"))
+            self.path = cache.cache_path(os.path.join("config", name.hexdigest() + ".json"))
+
+    def load(self):
+        """Return a tuple (found, data) with the data of a valid snapshot."""
+        if self.path is None:
+            return False, None
+
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            if snapshot["key"] != self.key:
+                return False, None
+            data = _decode_snapshot(snapshot["data"])
+        except Exception:
+            return False, None
+
+        if data is not None:
+            data._from_snapshot = True
+        return True, data
+
+    def dump(self, data):
+        """Snapshot the data read from the file, ignoring any error."""
+        if self.path is None or time.time() - self.mtime < self.racy_interval:
+            return
+
+        # Snapshots are replaced atomically, so that they can be read without locking
+        tmp = None
+        try:
+            content = json.dumps({"key": self.key, "data": _encode_snapshot(data)})
+            directory = os.path.dirname(self.path)
+            mkdirp(directory)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            rename(tmp, self.path)
+        except Exception as e:
+            tty.debug("Cannot snapshot config file: {0}".format(str(e)))
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+
+
 def _override(string):
     """Test if a spack YAML string is an override.
 
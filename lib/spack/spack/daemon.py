@@ -0,0 +1,482 @@
+# Copyright 2013-2023 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""A warm Spack process that serves commands over a unix socket.
+
+``spack daemon start`` imports every command, reads the configuration, the
+package repositories' indexes and the install database once, then listens on a
+unix socket. When ``SPACK_DAEMON_SOCKET`` points to that socket, the ``spack``
+executable forwards its arguments, environment, working directory and standard
+streams to the daemon instead of starting up from scratch.
+
+Each request is served in a forked child of the daemon, so commands run with
+the warm state already in memory and cannot leak changes back into it. Before
+forking, the daemon checks the modification times of configuration files and
+package recipes and reloads what changed.
+
+The client side of this module runs before the rest of Spack is imported, so
+its module level imports must stay as light as they are now.
+"""
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+import llnl.util.tty as tty
+
+import spack.error
+
+#: Environment variable pointing clients to the daemon's socket
+socket_env_var = "SPACK_DAEMON_SOCKET"
+
+#: Environment variables that determine which configuration Spack reads at startup.
+#: Requests whose values differ from the daemon's are run by the client itself.
+startup_env_vars = (
+    "HOME",
+    "SPACK_DISABLE_LOCAL_CONFIG",
+    "SPACK_SYSTEM_CONFIG_PATH",
+    "SPACK_USER_CACHE_PATH",
+    "SPACK_USER_CONFIG_PATH",
+)
+
+#: Format of the length prefix of each message
+_header = struct.Struct("!I")
+
+#: The client hands over stdin, stdout and stderr
+_num_fds = 3
+
+
+def supported():
+    """Whether this platform can run a daemon (it needs unix sockets and fork)."""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork")
+
+
+def _send(conn, payload, fds=()):
+    """Send a JSON payload, optionally passing file descriptors along with it."""
+    data = json.dumps(payload).encode("utf-8")
+    message = _header.pack(len(data)) + data
+    if not fds:
+        conn.sendall(message)
+        return
+
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+    sent = conn.sendmsg([message], ancillary)
+    conn.sendall(message[sent:])
+
+
+def _recv_exactly(conn, size, data=b""):
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError("connection closed after %d of %d bytes" % (len(data), size))
+        data += chunk
+    return data
+
+
+def _recv(conn):
+    """Receive a payload sent by ``_send()``.
+
+    Returns:
+        A tuple with the decoded payload and the list of file descriptors passed
+        with it, or ``(None, [])`` if the peer closed the connection.
+    """
+    fds = array.array("i")
+    data, ancdata, _, _ = conn.recvmsg(_header.size, socket.CMSG_SPACE(_num_fds * fds.itemsize))
+    for level, kind, cdata in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cdata[: len(cdata) - (len(cdata) % fds.itemsize)])
+    if not data:
+        return None, list(fds)
+
+    try:
+        (size,) = _header.unpack(_recv_exactly(conn, _header.size, data))
+        payload = json.loads(_recv_exactly(conn, size).decode("utf-8"))
+    except Exception:
+        _close_all(fds)
+        raise
+    return payload, list(fds)
+
+
+def _close_all(fds):
+    for fd in fds:
+        os.close(fd)
+
+
+def _connect(socket_path):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def forward(argv, socket_path, prefix):
+    """Run a Spack command in the daemon listening on ``socket_path``.
+
+    Args:
+        argv (list): command line arguments, NOT including the executable name
+        socket_path (str): path to the daemon's socket
+        prefix (str): prefix of the Spack instance the client belongs to
+
+    Returns:
+        The return code of the command, or None if no compatible daemon could run
+        it and the caller should run it itself.
+    """
+    if not supported():
+        return None
+
+    try:
+        conn = _connect(socket_path)
+    except OSError:
+        return None
+
+    with conn:
+        try:
+            mask = os.umask(0)
+            os.umask(mask)
+            request = {
+                "argv": list(argv),
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "prefix": prefix,
+                "umask": mask,
+            }
+            _send(conn, request, fds=range(_num_fds))
+            reply, _ = _recv(conn)
+        except (OSError, EOFError, ValueError):
+            return None
+
+        # The daemon declined the request, e.g. because the client's configuration differs
+        if not reply or "pid" not in reply:
+            return None
+
+        # From here on the command is running, and we only wait for its return code.
+        # Interrupts are relayed to the process running it.
+        while True:
+            try:
+                reply, _ = _recv(conn)
+                break
+            except KeyboardInterrupt:
+                _signal(reply["pid"], signal.SIGINT)
+            except (OSError, EOFError, ValueError):
+                reply = None
+                break
+
+    if not reply or "returncode" not in reply:
+        tty.error("the spack daemon exited before finishing the command")
+        return 1
+    return reply["returncode"]
+
+
+def _signal(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except OSError:
+        pass
+
+
+def control(socket_path, action):
+    """Send a control request (``"status"`` or ``"stop"``) to a running daemon.
+
+    Returns:
+        The daemon's reply, or None if no daemon is listening on ``socket_path``.
+    """
+    try:
+        conn = _connect(socket_path)
+    except OSError:
+        return None
+
+    with conn:
+        _send(conn, {"control": action})
+        reply, _ = _recv(conn)
+    return reply
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Daemon(object):
+    """Serves Spack commands from a warm process.
+
+    Args:
+        socket_path (str): path of the unix socket to listen on
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.served = 0
+        self.startup_env = dict((var, os.environ.get(var)) for var in startup_env_vars)
+
+        self._listener = None
+        self._children = set()
+        self._fingerprint = None
+        self._stopping = False
+
+    def warm(self):
+        """Load the state commands share, and remember what it was loaded from."""
+        import spack.cmd
+        import spack.config
+        import spack.main  # noqa: F401
+        import spack.repo
+        import spack.store
+
+        for name in spack.cmd.all_commands():
+            spack.cmd.get_module(name)
+
+        for section in spack.config.section_schemas:
+            spack.config.get(section)
+
+        spack.repo.path.provider_index
+        spack.repo.path.tag_index
+
+        try:
+            with spack.store.db.read_transaction():
+                pass
+        except Exception as e:
+            # Commands will report the problem themselves when they need the database
+            tty.debug("spack daemon: cannot read the install database: %s" % e)
+
+        self._fingerprint = self.fingerprint()
+
+    def reset(self):
+        """Drop the configuration, repositories and store, so they are reloaded."""
+        import llnl.util.lang
+
+        import spack.config
+        import spack.repo
+        import spack.store
+
+        spack.config.config = llnl.util.lang.Singleton(spack.config._config)
+        spack.repo.path = llnl.util.lang.Singleton(spack.repo._path)
+        spack.store.reinitialize()
+
+    def fingerprint(self):
+        """Modification times of the files the warm state was read from.
+
+        The install database checks its own index for changes on every read, so
+        it is not part of the fingerprint.
+        """
+        import spack.config
+        import spack.repo
+
+        stamps = []
+        for scope in spack.config.config.scopes.values():
+            if not scope.path:
+                continue
+            stamps.append((scope.path, _stat_key(scope.path)))
+            if os.path.isdir(scope.path):
+                for entry in sorted(os.listdir(scope.path)):
+                    if entry.endswith(".yaml"):
+                        path = os.path.join(scope.path, entry)
+                        stamps.append((path, _stat_key(path)))
+
+        for repo in spack.repo.path.repos:
+            stamps.append((repo.config_file, _stat_key(repo.config_file)))
+            stamps.append((repo.packages_path, _stat_key(repo.packages_path)))
+            with os.scandir(repo.packages_path) as entries:
+                for entry in entries:
+                    recipe = os.path.join(entry.path, spack.repo.package_file_name)
+                    stamps.append((recipe, _stat_key(recipe)))
+
+        return stamps
+
+    def revalidate(self):
+        """Reload the warm state if the files it was read from changed."""
+        if self.fingerprint() == self._fingerprint:
+            return False
+
+        tty.debug("spack daemon: configuration or packages changed, reloading")
+        self.reset()
+        self.warm()
+        return True
+
+    def listen(self):
+        """Bind the socket, replacing a stale one left behind by a dead daemon."""
+        if os.path.exists(self.socket_path):
+            if control(self.socket_path, "status") is not None:
+                raise DaemonError("a spack daemon is already listening on %s" % self.socket_path)
+            os.unlink(self.socket_path)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_mask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        except OSError as e:
+            listener.close()
+            raise DaemonError("cannot listen on %s: %s" % (self.socket_path, e))
+        finally:
+            os.umask(old_mask)
+
+        listener.listen(16)
+        listener.settimeout(1.0)
+        self._listener = listener
+
+    def serve_forever(self):
+        """Serve requests until asked to stop or interrupted."""
+        if self._listener is None:
+            self.listen()
+
+        try:
+            while not self._stopping:
+                self._reap()
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                with conn:
+                    self._dispatch(conn)
+        finally:
+            self._listener.close()
+            self._listener = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _reap(self):
+        for pid in list(self._children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self._children.discard(pid)
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime": time.time() - self.started,
+            "served": self.served,
+            "running": len(self._children),
+        }
+
+    def _dispatch(self, conn):
+        try:
+            request, fds = _recv(conn)
+        except (OSError, EOFError, ValueError):
+            return
+        if request is None:
+            _close_all(fds)
+            return
+
+        try:
+            if "control" in request:
+                if request["control"] == "stop":
+                    self._stopping = True
+                _send(conn, self.status())
+                return
+
+            reason = self.incompatible(request)
+            if reason:
+                _send(conn, {"declined": reason})
+                return
+
+            if len(fds) != _num_fds:
+                _send(conn, {"declined": "missing standard streams"})
+                return
+
+            self.revalidate()
+            pid = os.fork()
+            if pid == 0:
+                os._exit(self._run(conn, request, fds))
+
+            self._children.add(pid)
+            self.served += 1
+        except OSError:
+            pass
+        finally:
+            _close_all(fds)
+
+    def incompatible(self, request):
+        """Why a request cannot run in this daemon, or None if it can."""
+        import spack.paths
+
+        if os.path.realpath(request.get("prefix", "")) != os.path.realpath(spack.paths.prefix):
+            return "the daemon runs Spack from %s" % spack.paths.prefix
+
+        env = request.get("env", {})
+        for var, value in self.startup_env.items():
+            if env.get(var) != value:
+                return "%s differs from the daemon's" % var
+        return None
+
+    def _run(self, conn, request, fds):
+        """Run a forwarded command. This runs in the forked child."""
+        returncode = 1
+        try:
+            # A session of its own detaches the command from the daemon's terminal,
+            # so it can use the client's terminal instead
+            self._listener.close()
+            os.setsid()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            _send(conn, {"pid": os.getpid()})
+
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+            sys.stdin = open(0, "r", closefd=False)
+            sys.stdout = open(1, "w", buffering=1, closefd=False)
+            sys.stderr = open(2, "w", buffering=1, closefd=False)
+
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            os.umask(request["umask"])
+            sys.argv = ["spack"] + request["argv"]
+
+            returncode = self._main(request["argv"])
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+            try:
+                _send(conn, {"returncode": returncode})
+            except OSError:
+                pass
+        return returncode
+
+    def _main(self, argv):
+        import spack.config
+        import spack.main
+
+        # Command line scopes are only read when the configuration is created
+        parser = spack.main.make_argument_parser()
+        args, _ = parser.parse_known_args(argv)
+        if args.config_scopes:
+            self.reset()
+            spack.config.command_line_scopes = args.config_scopes
+
+        try:
+            returncode = spack.main.main(argv)
+        except SystemExit as e:
+            returncode = e.code
+
+        if returncode is None:
+            return 0
+        if not isinstance(returncode, int):
+            sys.stderr.write("%s\n" % returncode)
+            return 1
+        return returncode
+
+
+class DaemonError(spack.error.SpackError):
+    """Raised when the daemon cannot start."""
@@ -357,6 +357,10 @@ def __init__(
         # This is for other classes to use to lock prefix directories.
         self.prefix_lock_path = os.path.join(self._db_dir, "prefix_lock")
 
+        # Number of files the prefix locks are split into, which all the
+        # processes using this database must agree on
+        self._prefix_lock_shards_path = os.path.join(self._db_dir, "prefix_lock_shards")
+
         # Ensure a persistent location for dealing with parallel installation
         # failures (e.g., across near-concurrent processes).
         self._failure_dir = os.path.join(self._db_dir, "failures")
@@ -395,6 +399,7 @@ def __init__(
             else "No timeout"
         )
         tty.debug("PACKAGE LOCK TIMEOUT: {0}".format(str(timeout_format_str)))
+        self._prefix_lock_shards = None
 
         if self.is_upstream:
             self.lock = ForbiddenLock()
@@ -436,6 +441,68 @@ def read_transaction(self):
         """Get a read lock context manager for use in a `with` block."""
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
+    @property
+    def prefix_lock_shards(self):
+        """Number of files the prefix and failure locks are split into.
+
+        The value of ``config:prefix_lock_shards`` is recorded in the database
+        directory the first time it is needed, and the recorded value is used
+        from then on, so that processes configured differently still lock the
+        same files.
+        """
+        if self._prefix_lock_shards is None:
+            self._prefix_lock_shards = self._read_prefix_lock_shards()
+        return self._prefix_lock_shards
+
+    def _read_prefix_lock_shards(self):
+        configured = spack.config.get("config:prefix_lock_shards") or 1
+        if self.is_upstream:
+            return configured
+
+        path = self._prefix_lock_shards_path
+        if not os.path.exists(path):
+            # Write the value aside and link it in place, so that concurrent
+            # processes never read a partial file and the first one wins
+            tmp = "{0}.{1}.tmp".format(path, os.getpid())
+            try:
+                with open(tmp, "w") as f:
+                    f.write(str(configured))
+                os.link(tmp, path)
+            except OSError as e:
+                tty.debug("Cannot record the number of prefix lock files: {0}".format(e))
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+        try:
+            with open(path) as f:
+                recorded = int(f.read())
+        except (OSError, ValueError) as e:
+            tty.warn("Cannot read the number of prefix lock files in {0}: {1}".format(path, e))
+            return configured
+
+        if recorded != configured:
+            tty.warn(
+                "config:prefix_lock_shards is {0}, but the store in {1} uses {2} prefix lock "
+                "files: using {2}.".format(configured, self.root, recorded),
+                "Remove {0} when no installation is running to change it.".format(path),
+            )
+        return recorded
+
+    def _prefix_lock_range(self, spec, path):
+        """Return the lock file and byte offset that guard a spec's prefix.
+
+        The offset is the sys.maxsize-bit prefix of the DAG hash. With more
+        than one shard (``config:prefix_lock_shards``), the next bits of the
+        hash pick one of several lock files, named ``<path>.<shard>``, which
+        spreads the byte range locks of concurrent installs over more files.
+        """
+        start = spec.dag_hash_bit_prefix(bit_length(sys.maxsize))
+        if self.prefix_lock_shards > 1:
+            shard_bits = spec.dag_hash_bit_prefix(bit_length(sys.maxsize) + 16) & 0xFFFF
+            path = "{0}.{1}".format(path, shard_bits % self.prefix_lock_shards)
+        return path, start
+
     def _failed_spec_path(self, spec):
         """Return the path to the spec's failure file, which may not exist."""
         if not spec.concrete:
@@ -525,9 +592,10 @@ def mark_failed(self, spec):
 
         prefix = spec.prefix
         if prefix not in self._prefix_failures:
+            path, start = self._prefix_lock_range(spec, self.prefix_fail_path)
             mark = lk.Lock(
-                self.prefix_fail_path,
-                start=spec.dag_hash_bit_prefix(bit_length(sys.maxsize)),
+                path,
+                start=start,
                 length=1,
                 default_timeout=self.package_lock_timeout,
                 desc=spec.name,
@@ -566,12 +634,9 @@ def prefix_failed(self, spec):
 
     def prefix_failure_locked(self, spec):
         """Return True if a process has a failure lock on the spec."""
+        path, start = self._prefix_lock_range(spec, self.prefix_fail_path)
         check = lk.Lock(
-            self.prefix_fail_path,
-            start=spec.dag_hash_bit_prefix(bit_length(sys.maxsize)),
-            length=1,
-            default_timeout=self.package_lock_timeout,
-            desc=spec.name,
+            path, start=start, length=1, default_timeout=self.package_lock_timeout, desc=spec.name
         )
 
         return check.is_write_locked()
@@ -589,6 +654,8 @@ def prefix_lock(self, spec, timeout=None):
 
         The lock file is ``spack.store.db.prefix_lock`` -- the DB
         tells us what to call it and it lives alongside the install DB.
+        It is split into several files when ``config:prefix_lock_shards``
+        is larger than one.
 
         n is the sys.maxsize-bit prefix of the DAG hash.  This makes
         likelihood of collision is very low AND it gives us
@@ -598,12 +665,9 @@ def prefix_lock(self, spec, timeout=None):
         timeout = timeout or self.package_lock_timeout
         prefix = spec.prefix
         if prefix not in self._prefix_locks:
+            path, start = self._prefix_lock_range(spec, self.prefix_lock_path)
             self._prefix_locks[prefix] = lk.Lock(
-                self.prefix_lock_path,
-                start=spec.dag_hash_bit_prefix(bit_length(sys.maxsize)),
-                length=1,
-                default_timeout=timeout,
-                desc=spec.name,
+                path, start=start, length=1, default_timeout=timeout, desc=spec.name
             )
         elif timeout != self._prefix_locks[prefix].default_timeout:
             self._prefix_locks[prefix].default_timeout = timeout
@@ -6,6 +6,9 @@
 and running executables.
 """
 import collections
+import contextlib
+import json
+import multiprocessing
 import os
 import os.path
 import re
@@ -14,9 +17,16 @@
 
 import llnl.util.filesystem
 import llnl.util.tty
+from llnl.util.lock import LockError
 
+import spack
+import spack.error
+import spack.spec
+import spack.util.cpus
 import spack.util.environment
+import spack.util.file_cache
 import spack.util.ld_so_conf
+import spack.util.parallel
 
 from .common import (  # find_windows_compiler_bundled_packages,
     DetectedPackage,
@@ -113,6 +123,274 @@ def _group_by_prefix(paths):
     return groups.items()
 
 
+#: Seconds to wait for a package to detect specs from a single prefix
+DETECTION_TIMEOUT = 120
+
+
+def _match_patterns(pattern_to_pkgs, path_to_name):
+    """Return a dictionary mapping packages to the paths whose name matches
+    any of the package patterns.
+
+    Most of the names don't match any pattern, so they are discarded with a
+    single search of the combined patterns, before matching the others against
+    each pattern.
+    """
+    compiled = [(re.compile(pattern), pkgs) for pattern, pkgs in pattern_to_pkgs.items()]
+    try:
+        combined = re.compile("|".join("(?:{0})".format(p) for p in pattern_to_pkgs))
+    except re.error:
+        # Patterns that can't be combined (e.g. with inline flags or backreferences)
+        combined = None
+
+    names_to_paths = collections.defaultdict(list)
+    for path, name in path_to_name.items():
+        names_to_paths[name].append(path)
+
+    pkg_to_found = collections.defaultdict(set)
+    for name, paths in names_to_paths.items():
+        if combined is not None and not combined.search(name):
+            continue
+        for compiled_re, pkgs in compiled:
+            if compiled_re.search(name):
+                for pkg in pkgs:
+                    pkg_to_found[pkg].update(paths)
+    return pkg_to_found
+
+
+def _specs_to_dicts(specs):
+    """Return detected specs as dictionaries, to be stored or sent to other processes"""
+    return [
+        {
+            "spec": str(spec),
+            "prefix": spec.external_path,
+            "modules": spec.external_modules,
+            "extra_attributes": dict(spec.extra_attributes or {}),
+        }
+        for spec in specs
+    ]
+
+
+def _specs_from_dicts(items):
+    """Inverse of ``_specs_to_dicts()``"""
+    specs = []
+    for item in items:
+        spec = spack.spec.Spec(
+            item["spec"], external_path=item.get("prefix"), external_modules=item.get("modules")
+        )
+        specs.append(
+            spack.spec.Spec.from_detection(spec, extra_attributes=item["extra_attributes"])
+        )
+    return specs
+
+
+class DetectionCache(object):
+    """Cache of the specs detected from files in a prefix, persisted across runs.
+
+    Entries are keyed on the package, its ``package.py`` and the path, size and
+    modification time of the files in the prefix, so they are invalidated as
+    soon as any of them changes. Only entries used by the last detection are
+    written back, together with those of packages that were not checked.
+    """
+
+    #: Key of the file cache entry
+    key = "detection.json"
+
+    def __init__(self, file_cache: spack.util.file_cache.FileCache):
+        self.file_cache = file_cache
+        self.entries = {}
+        self.used = {}
+        self.checked = set()
+        self.loaded = False
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return [path, st.st_size, st.st_mtime_ns]
+
+    def _entry_key(self, pkg, prefix, objs):
+        try:
+            package_py = self._stat(sys.modules[pkg.__module__].__file__)
+            objs = [self._stat(obj) for obj in sorted(objs)]
+        except (KeyError, AttributeError, TypeError, OSError):
+            return None
+        key = [spack.spack_version, pkg.name, package_py, prefix, objs]
+        return json.dumps(key, sort_keys=True)
+
+    def load(self):
+        try:
+            if self.file_cache.init_entry(self.key):
+                with self.file_cache.read_transaction(self.key) as f:
+                    self.entries = json.load(f)
+        except (spack.error.SpackError, LockError, OSError, ValueError) as e:
+            llnl.util.tty.debug("Cannot read the external detection cache: {0}".format(str(e)))
+        self.loaded = True
+
+    def get(self, pkg, prefix, objs):
+        """Return the specs detected for ``pkg`` from ``objs`` in ``prefix``, or
+        None if they are not cached.
+        """
+        if not self.loaded:
+            self.load()
+        self.checked.add(pkg.name)
+        key = self._entry_key(pkg, prefix, objs)
+        if key is None or key not in self.entries:
+            return None
+
+        try:
+            specs = _specs_from_dicts(self.entries[key]["specs"])
+        except Exception as e:
+            llnl.util.tty.debug("Ignoring invalid external detection cache entry: {0}".format(e))
+            return None
+        self.used[key] = self.entries[key]
+        return specs
+
+    def put(self, pkg, prefix, objs, specs):
+        """Record the specs detected for ``pkg`` from ``objs`` in ``prefix``."""
+        key = self._entry_key(pkg, prefix, objs)
+        if key is None:
+            return
+
+        items = _specs_to_dicts(specs)
+        try:
+            json.dumps(items)
+        except (TypeError, ValueError):
+            return
+        self.used[key] = {"package": pkg.name, "specs": items}
+
+    def save(self):
+        """Write back the entries used by the last detection"""
+        try:
+            with self.file_cache.write_transaction(self.key) as (old, new):
+                try:
+                    entries = json.load(old) if old else {}
+                except ValueError:
+                    entries = {}
+                entries = dict(
+                    (key, value)
+                    for key, value in entries.items()
+                    if value.get("package") not in self.checked
+                )
+                entries.update(self.used)
+                json.dump(entries, new)
+        except (spack.error.SpackError, LockError, OSError) as e:
+            llnl.util.tty.debug("Cannot write the external detection cache: {0}".format(str(e)))
+
+
+def detection_cache():
+    """Return the cache of the specs detected from external prefixes"""
+    import spack.caches
+
+    return DetectionCache(spack.caches.misc_cache)
+
+
+def _determine_spec_details(pkg, prefix, objs_in_prefix):
+    """Return a tuple (specs, error) with the specs detected for ``pkg`` in
+    ``prefix`` as dictionaries, or the message of the error that prevented
+    detection.
+    """
+    try:
+        specs = _convert_to_iterable(pkg.determine_spec_details(prefix, objs_in_prefix))
+        return _specs_to_dicts(specs), None
+    except Exception as e:
+        return None, str(e)
+
+
+@contextlib.contextmanager
+def _detection_pool(ntasks):
+    """Pool of processes to call ``determine_spec_details``, or None if calls
+    must run in this process. Workers are terminated on exit, so that calls
+    that timed out don't keep running.
+    """
+    if not ntasks or sys.platform == "darwin" or sys.platform == "win32":
+        yield None
+        return
+
+    processes = min(ntasks, spack.util.cpus.cpus_available())
+    with spack.util.parallel.pool(processes=processes) as pool:
+        yield pool
+
+
+def _detect_specs(pkg_to_found, kind):
+    """Call ``determine_spec_details`` on each package for each prefix where
+    files of the package were found.
+
+    Calls run concurrently in a pool of processes, since they mostly wait on
+    the executables they run. Processes, unlike threads, can be killed when a
+    call exceeds ``DETECTION_TIMEOUT``, and package code can't change the state
+    of the main process. Results are yielded in a deterministic order as tuples
+    (pkg, prefix, objs_in_prefix, specs).
+    """
+    cache = detection_cache()
+    try:
+        tasks = []
+        for pkg, objs in pkg_to_found.items():
+            if not hasattr(pkg, "determine_spec_details"):
+                llnl.util.tty.warn(
+                    "{0} must define 'determine_spec_details' in order"
+                    " for Spack to detect externally-provided instances"
+                    " of the package.".format(pkg.name)
+                )
+                continue
+
+            # TODO: multiple instances of a package can live in the same
+            # prefix, and a package implementation can return multiple specs
+            # for one prefix, but without additional details (e.g. about the
+            # naming scheme which differentiates them), the spec won't be
+            # usable.
+            for prefix, objs_in_prefix in sorted(_group_by_prefix(objs)):
+                specs = cache.get(pkg, prefix, objs_in_prefix)
+                tasks.append((pkg, prefix, objs_in_prefix, specs))
+
+        with _detection_pool(sum(1 for task in tasks if task[3] is None)) as pool:
+            if pool is not None:
+                tasks = [
+                    (pkg, prefix, objs_in_prefix, specs)
+                    if specs is not None
+                    else (
+                        pkg,
+                        prefix,
+                        objs_in_prefix,
+                        pool.apply_async(_determine_spec_details, (pkg, prefix, objs_in_prefix)),
+                    )
+                    for pkg, prefix, objs_in_prefix, specs in tasks
+                ]
+
+            for pkg, prefix, objs_in_prefix, result in tasks:
+                if isinstance(result, list):
+                    specs = result
+                else:
+                    try:
+                        items, error = (
+                            _determine_spec_details(pkg, prefix, objs_in_prefix)
+                            if result is None
+                            else result.get(timeout=DETECTION_TIMEOUT)
+                        )
+                        specs = None if items is None else _specs_from_dicts(items)
+                    except multiprocessing.TimeoutError:
+                        specs, error = None, "timeout"
+                    except Exception as e:
+                        specs, error = None, str(e)
+
+                    if specs is None:
+                        msg = 'error detecting "{0}" from prefix {1} [{2}]'
+                        warnings.warn(msg.format(pkg.name, prefix, error))
+                        specs = []
+                    else:
+                        cache.put(pkg, prefix, objs_in_prefix, specs)
+
+                if not specs:
+                    llnl.util.tty.debug(
+                        "The following {0} in {1} were decidedly not "
+                        "part of the package {2}: {3}".format(
+                            kind, prefix, pkg.name, ", ".join(_convert_to_iterable(objs_in_prefix))
+                        )
+                    )
+
+                yield pkg, prefix, objs_in_prefix, specs
+    finally:
+        cache.save()
+
+
 # TODO consolidate this with by_executable
 # Packages should be able to define both .libraries and .executables in the future
 # determine_spec_details should get all relevant libraries and executables in one call
@@ -151,76 +429,46 @@ def by_library(packages_to_check, path_hints=None):
         else libraries_in_windows_paths(path_hints)
     )
 
-    pkg_to_found_libs = collections.defaultdict(set)
-    for lib_pattern, pkgs in lib_pattern_to_pkgs.items():
-        compiled_re = re.compile(lib_pattern)
-        for path, lib in path_to_lib_name.items():
-            if compiled_re.search(lib):
-                for pkg in pkgs:
-                    pkg_to_found_libs[pkg].add(path)
+    pkg_to_found_libs = _match_patterns(lib_pattern_to_pkgs, path_to_lib_name)
 
     pkg_to_entries = collections.defaultdict(list)
     resolved_specs = {}  # spec -> lib found for the spec
 
-    for pkg, libs in pkg_to_found_libs.items():
-        if not hasattr(pkg, "determine_spec_details"):
-            llnl.util.tty.warn(
-                "{0} must define 'determine_spec_details' in order"
-                " for Spack to detect externally-provided instances"
-                " of the package.".format(pkg.name)
-            )
-            continue
+    for pkg, prefix, _, specs in _detect_specs(pkg_to_found_libs, "libraries"):
+        for spec in specs:
+            pkg_prefix = library_prefix(prefix)
 
-        for prefix, libs_in_prefix in sorted(_group_by_prefix(libs)):
-            try:
-                specs = _convert_to_iterable(pkg.determine_spec_details(prefix, libs_in_prefix))
-            except Exception as e:
-                specs = []
-                msg = 'error detecting "{0}" from prefix {1} [{2}]'
-                warnings.warn(msg.format(pkg.name, prefix, str(e)))
+            if not pkg_prefix:
+                msg = "no lib/ or lib64/ dir found in {0}. Cannot "
+                "add it as a Spack package"
+                llnl.util.tty.debug(msg.format(prefix))
+                continue
+
+            if spec in resolved_specs:
+                prior_prefix = ", ".join(_convert_to_iterable(resolved_specs[spec]))
 
-            if not specs:
                 llnl.util.tty.debug(
-                    "The following libraries in {0} were decidedly not "
-                    "part of the package {1}: {2}".format(
-                        prefix, pkg.name, ", ".join(_convert_to_iterable(libs_in_prefix))
-                    )
+                    "Libraries in {0} and {1} are both associated"
+                    " with the same spec {2}".format(prefix, prior_prefix, str(spec))
                 )
+                continue
+            else:
+                resolved_specs[spec] = prefix
 
-            for spec in specs:
-                pkg_prefix = library_prefix(prefix)
-
-                if not pkg_prefix:
-                    msg = "no lib/ or lib64/ dir found in {0}. Cannot "
-                    "add it as a Spack package"
-                    llnl.util.tty.debug(msg.format(prefix))
-                    continue
-
-                if spec in resolved_specs:
-                    prior_prefix = ", ".join(_convert_to_iterable(resolved_specs[spec]))
-
-                    llnl.util.tty.debug(
-                        "Libraries in {0} and {1} are both associated"
-                        " with the same spec {2}".format(prefix, prior_prefix, str(spec))
-                    )
-                    continue
-                else:
-                    resolved_specs[spec] = prefix
-
-                try:
-                    spec.validate_detection()
-                except Exception as e:
-                    msg = (
-                        '"{0}" has been detected on the system but will '
-                        "not be added to packages.yaml [reason={1}]"
-                    )
-                    llnl.util.tty.warn(msg.format(spec, str(e)))
-                    continue
+            try:
+                spec.validate_detection()
+            except Exception as e:
+                msg = (
+                    '"{0}" has been detected on the system but will '
+                    "not be added to packages.yaml [reason={1}]"
+                )
+                llnl.util.tty.warn(msg.format(spec, str(e)))
+                continue
 
-                if spec.external_path:
-                    pkg_prefix = spec.external_path
+            if spec.external_path:
+                pkg_prefix = spec.external_path
 
-                pkg_to_entries[pkg.name].append(DetectedPackage(spec=spec, prefix=pkg_prefix))
+            pkg_to_entries[pkg.name].append(DetectedPackage(spec=spec, prefix=pkg_prefix))
 
     return pkg_to_entries
 
@@ -245,79 +493,44 @@ def by_executable(packages_to_check, path_hints=None):
         path_hints.extend(compute_windows_program_path_for_package(pkg))
 
     path_to_exe_name = executables_in_path(path_hints=path_hints)
-    pkg_to_found_exes = collections.defaultdict(set)
-    for exe_pattern, pkgs in exe_pattern_to_pkgs.items():
-        compiled_re = re.compile(exe_pattern)
-        for path, exe in path_to_exe_name.items():
-            if compiled_re.search(exe):
-                for pkg in pkgs:
-                    pkg_to_found_exes[pkg].add(path)
+    pkg_to_found_exes = _match_patterns(exe_pattern_to_pkgs, path_to_exe_name)
 
     pkg_to_entries = collections.defaultdict(list)
     resolved_specs = {}  # spec -> exe found for the spec
 
-    for pkg, exes in pkg_to_found_exes.items():
-        if not hasattr(pkg, "determine_spec_details"):
-            llnl.util.tty.warn(
-                "{0} must define 'determine_spec_details' in order"
-                " for Spack to detect externally-provided instances"
-                " of the package.".format(pkg.name)
-            )
-            continue
+    for pkg, prefix, _, specs in _detect_specs(pkg_to_found_exes, "executables"):
+        for spec in specs:
+            pkg_prefix = executable_prefix(prefix)
 
-        for prefix, exes_in_prefix in sorted(_group_by_prefix(exes)):
-            # TODO: multiple instances of a package can live in the same
-            # prefix, and a package implementation can return multiple specs
-            # for one prefix, but without additional details (e.g. about the
-            # naming scheme which differentiates them), the spec won't be
-            # usable.
-            try:
-                specs = _convert_to_iterable(pkg.determine_spec_details(prefix, exes_in_prefix))
-            except Exception as e:
-                specs = []
-                msg = 'error detecting "{0}" from prefix {1} [{2}]'
-                warnings.warn(msg.format(pkg.name, prefix, str(e)))
+            if not pkg_prefix:
+                msg = "no bin/ dir found in {0}. Cannot add it as a Spack package"
+                llnl.util.tty.debug(msg.format(prefix))
+                continue
+
+            if spec in resolved_specs:
+                prior_prefix = ", ".join(_convert_to_iterable(resolved_specs[spec]))
 
-            if not specs:
                 llnl.util.tty.debug(
-                    "The following executables in {0} were decidedly not "
-                    "part of the package {1}: {2}".format(
-                        prefix, pkg.name, ", ".join(_convert_to_iterable(exes_in_prefix))
-                    )
+                    "Executables in {0} and {1} are both associated"
+                    " with the same spec {2}".format(prefix, prior_prefix, str(spec))
                 )
+                continue
+            else:
+                resolved_specs[spec] = prefix
 
-            for spec in specs:
-                pkg_prefix = executable_prefix(prefix)
-
-                if not pkg_prefix:
-                    msg = "no bin/ dir found in {0}. Cannot add it as a Spack package"
-                    llnl.util.tty.debug(msg.format(prefix))
-                    continue
-
-                if spec in resolved_specs:
-                    prior_prefix = ", ".join(_convert_to_iterable(resolved_specs[spec]))
-
-                    llnl.util.tty.debug(
-                        "Executables in {0} and {1} are both associated"
-                        " with the same spec {2}".format(prefix, prior_prefix, str(spec))
-                    )
-                    continue
-                else:
-                    resolved_specs[spec] = prefix
-
-                try:
-                    spec.validate_detection()
-                except Exception as e:
-                    msg = (
-                        '"{0}" has been detected on the system but will '
-                        "not be added to packages.yaml [reason={1}]"
-                    )
-                    llnl.util.tty.warn(msg.format(spec, str(e)))
-                    continue
+            try:
+                spec.validate_detection()
+            except Exception as e:
+                msg = (
+                    '"{0}" has been detected on the system but will '
+                    "not be added to packages.yaml [reason={1}]"
+                )
+                llnl.util.tty.warn(msg.format(spec, str(e)))
+                continue
 
-                if spec.external_path:
-                    pkg_prefix = spec.external_path
+            if spec.external_path:
+                pkg_prefix = spec.external_path
 
-                pkg_to_entries[pkg.name].append(DetectedPackage(spec=spec, prefix=pkg_prefix))
+            pkg_to_entries[pkg.name].append(DetectedPackage(spec=spec, prefix=pkg_prefix))
 
     return pkg_to_entries
@@ -51,7 +51,12 @@
 import spack.util.spack_yaml as syaml
 import spack.util.url
 import spack.version
-from spack.filesystem_view import SimpleFilesystemView, inverse_view_func_parser, view_func_parser
+from spack.filesystem_view import (
+    SimpleFilesystemView,
+    ViewMergeMap,
+    inverse_view_func_parser,
+    view_func_parser,
+)
 from spack.installer import PackageInstaller
 from spack.spec import Spec
 from spack.spec_list import InvalidSpecConstraintError, SpecList
@@ -59,7 +64,7 @@
 from spack.variant import UnknownVariantError
 
 #: environment variable used to indicate the active environment
-spack_env_var = "SPACK_ENV"
+spack_env_var = spack.paths.spack_env_var
 
 
 #: currently activated environment
@@ -676,7 +681,9 @@ def regenerate(self, concretized_root_specs):
         # in a directory by hash, and then having a symlink to the real
         # view in the root. The real root for a view at /dirname/basename
         # will be /dirname/._basename_<hash>.
-        # This allows for atomic swaps when we update the view
+        # This allows for atomic swaps when we update the view.
+        # The old view persists what each prefix contributes to it, so only
+        # the prefixes of newly added specs have to be walked again.
 
         # cache the roots because the way we determine which is which does
         # not work while we are updating
@@ -701,7 +708,11 @@ def regenerate(self, concretized_root_specs):
         # Create a new view
         try:
             fs.mkdirp(new_root)
-            view.add_specs(*specs, with_dependencies=False)
+            view.add_specs(
+                *specs,
+                with_dependencies=False,
+                previous_merge_map=ViewMergeMap.from_view(old_root),
+            )
 
             # create symlink from tmp_symlink_name to new_root
             if os.path.exists(tmp_symlink_name):
@@ -22,12 +22,15 @@
     * archive()
         Archive a source directory, e.g. for creating a mirror.
 """
+import collections
 import copy
 import functools
+import http.client
 import os
 import os.path
 import re
 import shutil
+import sys
 import urllib.parse
 from typing import List, Optional
 
@@ -39,17 +42,23 @@
 
 import spack.config
 import spack.error
+import spack.paths
 import spack.url
 import spack.util.crypto as crypto
 import spack.util.git
+import spack.util.lock
+import spack.util.parallel
 import spack.util.pattern as pattern
 import spack.util.url as url_util
 import spack.util.web as web_util
 import spack.version
 from spack.util.compression import decompressor_for, extension_from_path
-from spack.util.executable import CommandNotFoundError, which
+from spack.util.executable import CommandNotFoundError, ProcessError, which
 from spack.util.string import comma_and, quote
 
+if sys.platform != "win32":
+    import fcntl
+
 #: List of all fetch strategies, created by FetchStrategy metaclass.
 all_strategies = []
 
@@ -61,6 +70,15 @@
 )
 
 
+def _file_stamp(path):
+    """Return a tuple identifying the current content of a file"""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (path, st.st_size, st.st_mtime_ns)
+
+
 def warn_content_type_mismatch(subject, content_type="HTML"):
     tty.warn(
         CONTENT_TYPE_MISMATCH_WARNING_TEMPLATE.format(subject=subject, content_type=content_type)
@@ -279,6 +297,10 @@ def __init__(self, url=None, checksum=None, **kwargs):
         self.expand_archive = kwargs.get("expand", True)
         self.extra_options = kwargs.get("fetch_options", {})
         self._curl = None
+        # (path, size, mtime) of the last file fetched with urllib, and its digest
+        self._streamed_digest = None
+        # (path, size, mtime) of the last archive that matched the digest
+        self._checked_stamp = None
 
         self.extension = kwargs.get("extension", None)
 
@@ -351,28 +373,156 @@ def _check_headers(self, headers):
     @_needs_stage
     def _fetch_urllib(self, url):
         save_file = self.stage.save_filename
+        partial_file = save_file + ".part"
         tty.msg("Fetching {0}".format(url))
 
-        # Run urllib but grab the mime type from the http headers
-        try:
-            url, headers, response = web_util.read_from_url(url)
-        except web_util.SpackWebError as e:
-            # clean up archive on failure.
-            if self.archive_file:
-                os.remove(self.archive_file)
-            if os.path.lexists(save_file):
-                os.remove(save_file)
-            msg = "urllib failed to fetch with error {0}".format(e)
-            raise FailedDownloadError(url, msg)
-
         if os.path.lexists(save_file):
             os.remove(save_file)
 
-        with open(save_file, "wb") as _open_file:
-            shutil.copyfileobj(response, _open_file)
+        # Download into a .part file, that is kept in the stage if the transfer
+        # is interrupted, and resumed with a range request on the next attempt
+        attempt = 0
+        while True:
+            attempt += 1
+            offset, validator = self._resume_point(partial_file)
+            try:
+                url, headers, response = web_util.read_from_url(
+                    url, offset=offset, if_range=validator
+                )
+            except web_util.SpackWebError as e:
+                if offset and web_util.is_range_not_satisfiable(e):
+                    # The remote file is not longer than the partial download
+                    tty.debug("Cannot resume download of {0}: {1}".format(url, e))
+                    self._remove_partial(partial_file)
+                    continue
+                if offset:
+                    # The server may be unreachable for now, keep what was
+                    # downloaded so far
+                    msg = "download interrupted, rerun to resume it from {0} ({1})"
+                    raise FailedDownloadError(url, msg.format(partial_file, e))
+                # clean up archive on failure.
+                self._remove_partial(partial_file)
+                if os.path.lexists(save_file):
+                    os.remove(save_file)
+                msg = "urllib failed to fetch with error {0}".format(e)
+                raise FailedDownloadError(url, msg)
+
+            if offset and not web_util.is_partial_content(response, offset):
+                # Either ranges are not supported, or the remote file changed
+                # and the server sent all of it because If-Range did not match
+                tty.debug("Cannot resume download of {0}, restarting it".format(url))
+                offset = 0
+            elif offset:
+                tty.debug("Resuming download of {0} at byte {1}".format(url, offset))
+
+            if not offset:
+                self._save_validator(partial_file, headers)
+
+            hasher = self._digest_hasher(partial_file if offset else None)
+            try:
+                complete = self._stream_to_file(response, partial_file, offset, hasher)
+            except (OSError, http.client.HTTPException) as e:
+                tty.debug("Download of {0} interrupted: {1}".format(url, e))
+                complete = False
+            finally:
+                response.close()
+
+            if complete:
+                break
+
+            if attempt > max_resume_attempts:
+                if self._resume_point(partial_file)[0]:
+                    msg = "download interrupted, rerun to resume it from {0}"
+                    raise FailedDownloadError(url, msg.format(partial_file))
+                raise FailedDownloadError(url, "download interrupted")
+
+        fs.rename(partial_file, save_file)
+        if os.path.lexists(partial_file + ".validator"):
+            os.remove(partial_file + ".validator")
+        if hasher:
+            self._streamed_digest = (_file_stamp(save_file), hasher.hexdigest())
 
         self._check_headers(str(headers))
 
+    def _resume_point(self, partial_file):
+        """Return the offset at which the download in ``partial_file`` can be
+        resumed, and the validator to send in the If-Range header.
+
+        A partial download is only resumed if the remote file can be checked to
+        be unchanged, either by the server with the validator saved along with
+        it, or afterwards with the digest of this fetcher. Otherwise, it is
+        removed and the download starts from scratch.
+        """
+        if not os.path.isfile(partial_file):
+            return 0, None
+        try:
+            with open(partial_file + ".validator") as f:
+                validator = f.read().strip() or None
+        except OSError:
+            validator = None
+        if not validator and not self.digest:
+            self._remove_partial(partial_file)
+            return 0, None
+        return os.path.getsize(partial_file), validator
+
+    @staticmethod
+    def _save_validator(partial_file, headers):
+        """Save the strong ETag or the Last-Modified date of the response that
+        starts the download in ``partial_file``, to resume it with If-Range."""
+        validator = headers.get("ETag") if headers else None
+        if not validator or validator.startswith("W/"):
+            validator = headers.get("Last-Modified") if headers else None
+        if validator:
+            with open(partial_file + ".validator", "w") as f:
+                f.write(validator)
+        elif os.path.lexists(partial_file + ".validator"):
+            os.remove(partial_file + ".validator")
+
+    @staticmethod
+    def _remove_partial(partial_file):
+        """Remove a partial download, and the validator saved with it."""
+        for path in (partial_file, partial_file + ".validator"):
+            if os.path.lexists(path):
+                os.remove(path)
+
+    def _digest_hasher(self, partial_file=None):
+        """Return a hash object for the digest of this fetcher, updated with the
+        content of ``partial_file`` if given, or None if there is no digest."""
+        if not self.digest:
+            return None
+        try:
+            hasher = crypto.hash_fun_for_digest(self.digest)()
+        except ValueError:
+            return None
+        if partial_file:
+            with open(partial_file, "rb") as f:
+                for chunk in iter(lambda: f.read(2**20), b""):
+                    hasher.update(chunk)
+        return hasher
+
+    @staticmethod
+    def _stream_to_file(response, filename, offset, hasher):
+        """Write the body of ``response`` to ``filename`` starting at ``offset``,
+        and return whether all of the expected content has been received."""
+        length = response.headers.get("Content-Length")
+        expected = offset + int(length) if length and length.isdigit() else None
+
+        # Compute the checksum while the archive is written, so that check()
+        # doesn't need to read it again
+        with open(filename, "r+b" if offset else "wb") as _open_file:
+            _open_file.truncate(offset)
+            _open_file.seek(offset)
+            while True:
+                chunk = response.read(2**20)
+                if not chunk:
+                    break
+                _open_file.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+            size = _open_file.tell()
+
+        return expected is None or size >= expected
+
     @_needs_stage
     def _fetch_curl(self, url):
         save_file = None
@@ -415,7 +565,10 @@ def _fetch_curl(self, url):
             if self.archive_file:
                 os.remove(self.archive_file)
 
-            if partial_file and os.path.lexists(partial_file):
+            # Keep the partial file of interrupted transfers to resume them, if
+            # the digest can tell whether the remote file changed in between
+            resumable = self.digest and curl.returncode in curl_interrupted_codes
+            if partial_file and os.path.lexists(partial_file) and not resumable:
                 os.remove(partial_file)
 
             try:
@@ -469,10 +622,21 @@ def expand(self):
 
         decompress = decompressor_for(self.archive_file, self.extension)
 
+        # Archives that have been checked can reuse the tree expanded by
+        # another stage, which is looked up by digest
+        expanded_cache = None
+        if self._checked_stamp and self._checked_stamp == _file_stamp(self.archive_file):
+            expanded_cache = _expanded_source_cache()
+
         # Below we assume that the command to decompress expand the
         # archive in the current working directory
         with fs.exploding_archive_catch(self.stage):
-            decompress(self.archive_file)
+            if expanded_cache and expanded_cache.restore(self.digest, os.getcwd()):
+                tty.debug("Using cached expanded archive for {0}".format(self.archive_file))
+            else:
+                decompress(self.archive_file)
+                if expanded_cache:
+                    expanded_cache.store(self.digest, os.getcwd())
 
     def archive(self, destination):
         """Just moves this archive to the destination."""
@@ -491,7 +655,15 @@ def check(self):
             raise NoDigestError("Attempt to check URLFetchStrategy with no digest.")
 
         checker = crypto.Checker(self.digest)
-        if not checker.check(self.archive_file):
+        if self._streamed_digest and self._streamed_digest[0] == _file_stamp(self.archive_file):
+            checker.sum = self._streamed_digest[1]
+            success = checker.sum == checker.hexdigest
+        else:
+            success = checker.check(self.archive_file)
+
+        if success:
+            self._checked_stamp = _file_stamp(self.archive_file)
+        else:
             # On failure, provide some information about the file size and
             # contents, so that we can quickly see what the issue is (redirect
             # was not followed, empty file, text instead of binary, ...)
@@ -550,8 +722,11 @@ def fetch(self):
         if os.path.lexists(filename):
             os.remove(filename)
 
-        # Symlink to local cached archive.
-        symlink(path, filename)
+        # Hard link the cached archive, or symlink it across file systems
+        try:
+            os.link(path, filename)
+        except OSError:
+            symlink(path, filename)
 
         # Remove link if checksum fails, or subsequent fetchers
         # will assume they don't need to download.
@@ -735,6 +910,9 @@ class GitFetchStrategy(VCSFetchStrategy):
 
     git_version_re = r"git version (\S+)"
 
+    #: Repository caches already updated by this process
+    _updated_repo_caches: set = set()
+
     def __init__(self, **kwargs):
         # Discards the keywords in kwargs that may conflict with the next call
         # to __init__
@@ -812,6 +990,83 @@ def fetch(self):
 
         self.clone(commit=self.commit, branch=self.branch, tag=self.tag)
 
+    @property
+    def repo_cache_path(self):
+        """Path of the bare repository caching the objects of this fetcher's
+        remote, shared by all its fetchers. None for local repositories."""
+        try:
+            components = [str(c).lstrip("/") for c in url_util.parse_git_url(self.url) if c]
+        except ValueError:
+            return None
+        path = os.path.join(spack.paths.user_repos_cache_path, *components)
+        return path[:-4] if path.endswith(".git") else path
+
+    def update_repo_cache(self):
+        """Create the bare repository caching the objects of this fetcher's
+        remote, or fetch its new branches and tags, and return its path."""
+        path = self.repo_cache_path
+        if path in GitFetchStrategy._updated_repo_caches:
+            return path
+
+        mkdirp(os.path.dirname(path))
+        lock = spack.util.lock.Lock(path + ".lock", desc=path)
+        with spack.util.lock.WriteTransaction(lock):
+            if not os.path.exists(path):
+                self.clone(path, bare=True)
+            with working_dir(path):
+                # Clones share the objects of this repository, which must
+                # not be garbage collected
+                self.git("config", "gc.auto", "0")
+                fetch_args = ["fetch", "--prune", "origin"]
+                if not spack.config.get("config:debug"):
+                    fetch_args.insert(1, "--quiet")
+                self.git(*fetch_args, "+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+        GitFetchStrategy._updated_repo_caches.add(path)
+        return path
+
+    def _clone_from_repo_cache(self, dest, commit=None, branch=None, tag=None):
+        """Clone the repository from the shared repository cache, without
+        copying its objects. Return False if that is not possible."""
+        try:
+            cache = self.update_repo_cache()
+            ref = commit or tag or branch or "HEAD"
+            self.git(
+                "--git-dir",
+                cache,
+                "cat-file",
+                "-e",
+                "%s^{commit}" % ref,
+                output=os.devnull,
+                error=os.devnull,
+            )
+        except (ProcessError, spack.util.lock.LockError) as e:
+            tty.debug("Cannot use the cached repository for {0}: {1}".format(self.url, e))
+            return False
+
+        tty.debug("Cloning {0} from {1}".format(self._repo_info(), cache))
+        clone_args = ["clone", "--shared"]
+        if not spack.config.get("config:debug"):
+            clone_args.append("--quiet")
+        if (branch or tag) and not commit:
+            clone_args.extend(["--branch", branch or tag])
+
+        with temp_cwd():
+            repo_name = os.path.basename(cache)
+            self.git(*clone_args, cache, repo_name)
+            if self.stage:
+                self.stage.srcdir = repo_name
+            shutil.move(repo_name, dest)
+
+        with working_dir(dest):
+            self.git("remote", "set-url", "origin", self.url)
+            if commit:
+                checkout_args = ["checkout", commit]
+                if not spack.config.get("config:debug"):
+                    checkout_args.insert(1, "--quiet")
+                self.git(*checkout_args)
+        return True
+
     def clone(self, dest=None, commit=None, branch=None, tag=None, bare=False):
         """
         Clone a repository to a path.
@@ -841,6 +1096,13 @@ def clone(self, dest=None, commit=None, branch=None, tag=None, bare=False):
                 clone_args.append("--quiet")
             clone_args.extend([self.url, dest])
             git(*clone_args)
+        elif (
+            spack.config.get("config:git_repo_cache", False)
+            and self.repo_cache_path
+            and self._clone_from_repo_cache(dest, commit=commit, branch=branch, tag=tag)
+        ):
+            # Objects are shared with the cached repository of the remote
+            pass
         elif commit:
             # Need to do a regular clone and check out everything if
             # they asked for a particular commit.
@@ -1652,6 +1914,133 @@ def from_list_url(pkg):
             tty.msg("Could not determine url from list_url.")
 
 
+#: Number of times an interrupted download is resumed before giving up
+max_resume_attempts = 3
+
+#: Curl exit codes of transfers that were interrupted: partial file, timeout, receive error
+curl_interrupted_codes = (18, 28, 56)
+
+
+def max_fetches_per_host():
+    """Maximum number of concurrent fetches from a single host"""
+    return spack.config.get("config:max_fetches_per_host", 4)
+
+
+def _fetch_hosts(spec):
+    """Return the hosts the sources, resources and patches of a spec are
+    fetched from.
+
+    Mirrors are left out: every spec may be fetched from them, so they would
+    put all specs in the same group in :func:`fetch_groups`.
+    """
+    import spack.repo
+
+    urls = []
+    try:
+        if spec.concrete:
+            pkg = spec.package
+            urls.extend(getattr(patch, "url", None) for patch in spec.patches)
+        else:
+            pkg = spack.repo.path.get_pkg_class(spec.name)(spec)
+        urls.extend(getattr(r.fetcher, "url", None) for r in pkg._get_needed_resources())
+        if spec.versions.concrete:
+            urls.append(getattr(for_package_version(pkg), "url", None))
+    except Exception:
+        pass
+    hosts = (urllib.parse.urlparse(url).netloc for url in urls if isinstance(url, str))
+    return set(host for host in hosts if host)
+
+
+def fetch_groups(specs, max_groups):
+    """Split specs in at most ``max_groups`` groups, that can be fetched concurrently.
+
+    Specs that fetch from a common host, directly or through other specs, are
+    spread over at most ``max_fetches_per_host()`` groups, so that no host gets
+    more concurrent connections than that. Otherwise groups are balanced by
+    number of specs.
+
+    Returns:
+        List of lists of indices in ``specs``
+    """
+    # Union-find of the specs sharing a host
+    parent = list(range(len(specs)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_with_host = {}
+    for i, spec in enumerate(specs):
+        for host in _fetch_hosts(spec):
+            j = first_with_host.setdefault(host, i)
+            parent[find(i)] = find(j)
+
+    # Specs without a known host are in a set of their own, and are not limited
+    by_host = collections.defaultdict(list)
+    for i in range(len(specs)):
+        by_host[find(i)].append(i)
+
+    limit = max_fetches_per_host()
+    groups = [[] for _ in range(max(1, max_groups))]
+    for indices in sorted(by_host.values(), key=len, reverse=True):
+        lanes = sorted(range(len(groups)), key=lambda j: len(groups[j]))
+        lanes = lanes[: max(1, min(limit, len(indices)))]
+        for n, i in enumerate(indices):
+            groups[lanes[n % len(lanes)]].append(i)
+
+    return [sorted(group) for group in groups if group]
+
+
+def _fetch_group_task(fetch_fn, specs):
+    results = []
+    for spec in specs:
+        try:
+            results.append((fetch_fn(spec), None))
+        except Exception as e:
+            results.append((None, str(e) or e.__class__.__name__))
+    return results
+
+
+def fetch_concurrently(specs, fetch_fn, max_processes=None):
+    """Call ``fetch_fn`` on each spec, fetching from several hosts concurrently.
+
+    The specs are split with :func:`fetch_groups`, and each group is handled by
+    a worker process, so that downloads proceed in parallel. ``fetch_fn`` must be
+    picklable and its return value too.
+
+    Args:
+        specs (list): specs to be fetched
+        fetch_fn: function taking a spec as argument
+        max_processes (int or None): maximum number of worker processes, defaults
+            to ``config:build_jobs``
+
+    Returns:
+        List of tuples (result, error message), in the same order as ``specs``. The
+        error message is None if ``fetch_fn`` succeeded.
+    """
+    if max_processes is None:
+        max_processes = spack.config.get("config:build_jobs")
+    groups = fetch_groups(specs, max(1, max_processes or 1))
+    if len(groups) <= 1:
+        return _fetch_group_task(fetch_fn, specs)
+
+    arguments = [[specs[i] for i in group] for group in groups]
+    per_group = spack.util.parallel.parallel_map(
+        functools.partial(_fetch_group_task, fetch_fn),
+        arguments,
+        max_processes=len(groups),
+        debug=tty.is_debug(),
+    )
+
+    results = [None] * len(specs)
+    for group, group_results in zip(groups, per_group):
+        for i, result in zip(group, group_results):
+            results[i] = result
+    return results
+
+
 class FsCache(object):
     def __init__(self, root):
         self.root = os.path.abspath(root)
@@ -1667,6 +2056,18 @@ def store(self, fetcher, relative_dest):
 
         dst = os.path.join(self.root, relative_dest)
         mkdirp(os.path.dirname(dst))
+
+        # Archives are content addressed, so they can share their data with
+        # the stage instead of being copied
+        if isinstance(fetcher, URLFetchStrategy) and fetcher.archive_file:
+            tmp = "{0}.{1}.tmp".format(dst, os.getpid())
+            try:
+                os.link(fetcher.archive_file, tmp)
+                os.rename(tmp, dst)
+                return
+            except OSError:
+                fs.force_remove(tmp)
+
         fetcher.archive(dst)
 
     def fetcher(self, target_path, digest, **kwargs):
@@ -1678,6 +2079,148 @@ def destroy(self):
         shutil.rmtree(self.root, ignore_errors=True)
 
 
+def _expanded_source_cache():
+    import spack.caches
+
+    return spack.caches.expanded_source_cache
+
+
+#: ioctl request to share the data blocks of a file with another one (Linux)
+_FICLONE = 0x40049409
+
+
+def _clone_file(src, dst):
+    """Copy a file with its metadata. Where the file system supports it
+    (e.g. btrfs, xfs) the copy shares its data blocks with the source."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+class ExpandedSourceCache(object):
+    """Pristine trees of expanded archives, looked up by the archive digest.
+
+    New stages get a copy of the tree instead of decompressing the archive
+    again. Trees are copied rather than hard linked, since builds may modify
+    sources in place. The least recently used trees are evicted once the
+    cache grows beyond ``max_size`` bytes.
+    """
+
+    def __init__(self, root, max_size):
+        self.root = os.path.abspath(root)
+        self.max_size = max_size
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest)
+
+    @staticmethod
+    def _copy_tree(src, dst):
+        for name in os.listdir(src):
+            src_path, dst_path = os.path.join(src, name), os.path.join(dst, name)
+            if os.path.islink(src_path):
+                symlink(os.readlink(src_path), dst_path)
+            elif os.path.isdir(src_path):
+                shutil.copytree(src_path, dst_path, symlinks=True, copy_function=_clone_file)
+            else:
+                _clone_file(src_path, dst_path)
+
+    @staticmethod
+    def _remove(path):
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            fs.force_remove(path)
+
+    def restore(self, digest, dest):
+        """Copy the tree expanded from the archive with ``digest`` into the
+        empty directory ``dest``. Return False if there is no such tree."""
+        if not self.max_size or not digest:
+            return False
+
+        path = self._path(digest)
+        if not os.path.isdir(path):
+            return False
+
+        try:
+            self._copy_tree(path, dest)
+            # Record the use of the tree for eviction
+            os.utime(path)
+        except (OSError, shutil.Error) as e:
+            # The tree may have been evicted concurrently
+            tty.debug("Cannot use expanded archive {0}: {1}".format(path, e))
+            for name in os.listdir(dest):
+                self._remove(os.path.join(dest, name))
+            return False
+        return True
+
+    def store(self, digest, src):
+        """Store a copy of the tree expanded in ``src`` from the archive with
+        ``digest``, and evict the least recently used trees if needed."""
+        if not self.max_size or not digest or os.path.isdir(self._path(digest)):
+            return
+
+        size = sum(
+            os.lstat(os.path.join(root, f)).st_size
+            for root, _, files in os.walk(src)
+            for f in files
+        )
+        if size > self.max_size:
+            return
+
+        tmp = self._path("{0}.{1}.tmp".format(digest, os.getpid()))
+        try:
+            mkdirp(tmp)
+            self._copy_tree(src, tmp)
+            with open(tmp + ".size", "w") as f:
+                f.write(str(size))
+            os.rename(tmp + ".size", self._path(digest) + ".size")
+            os.rename(tmp, self._path(digest))
+        except (OSError, shutil.Error) as e:
+            tty.debug("Cannot cache expanded archive {0}: {1}".format(src, e))
+            self._remove(tmp)
+            self._remove(tmp + ".size")
+            return
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".tmp") or not os.path.isdir(path):
+                continue
+            try:
+                with open(path + ".size") as f:
+                    size = int(f.read())
+                entries.append((os.stat(path).st_mtime, size, path))
+            except (OSError, ValueError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            tty.debug("Evicting expanded archive {0}".format(path))
+            # Rename first, so that the tree is not used while it is removed
+            tmp = "{0}.{1}.tmp".format(path, os.getpid())
+            try:
+                os.rename(path, tmp)
+            except OSError:
+                continue
+            self._remove(tmp)
+            self._remove(path + ".size")
+            total -= size
+
+    def destroy(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
 class NoCacheError(web_util.FetchError):
     """Raised when there is no cached archive for a package."""
 
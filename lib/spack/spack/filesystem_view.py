@@ -15,6 +15,7 @@
 from llnl.util import tty
 from llnl.util.filesystem import (
     mkdirp,
+    prefetch_directory_trees,
     remove_dead_links,
     remove_empty_directories,
     visit_directory_tree,
@@ -46,6 +47,7 @@
 
 
 _projections_path = ".spack/projections.yaml"
+_merge_map_path = ".spack/merge_map.json"
 
 
 def view_symlink(src, dst, **kwargs):
@@ -638,6 +640,8 @@ class SimpleFilesystemView(FilesystemView):
 
     def __init__(self, root, layout, **kwargs):
         super(SimpleFilesystemView, self).__init__(root, layout, **kwargs)
+        #: Directories and files contributed by the prefixes of the specs in this view
+        self.view_merge_map = ViewMergeMap()
 
     def _sanity_check_view_projection(self, specs):
         """A very common issue is that we end up with two specs of the same
@@ -671,17 +675,42 @@ def add_specs(self, *specs, **kwargs):
 
         self._sanity_check_view_projection(specs)
 
+        # Records of what each prefix contributes, reused from a previous view if possible.
+        previous = kwargs.get("previous_merge_map", None)
+        walked = self.view_merge_map.walked
+
         # Ignore spack meta data folder.
         def skip_list(file):
             return os.path.basename(file) == spack.store.layout.metadata_dir
 
         visitor = SourceMergeVisitor(ignore=skip_list)
 
+        # List the prefixes that have to be walked concurrently, since walking them one
+        # directory at a time is dominated by metadata latency on shared filesystems.
+        # The visitor is still fed one prefix at a time, in order.
+        listings = prefetch_directory_trees(
+            [
+                s.package.view_source()
+                for s in specs
+                if self.view_merge_map.needs_walk(s, previous)
+                or self.view_merge_map.needs_walk(s, previous, key="metadata")
+            ]
+        )
+
         # Gather all the directories to be made and files to be linked
         for spec in specs:
             src_prefix = spec.package.view_source()
+            directories, files = self.view_merge_map.contents(
+                spec, src_prefix, previous=previous, ignore=skip_list, listings=listings
+            )
             visitor.set_projection(self.get_relative_projection_for_spec(spec))
-            visit_directory_tree(src_prefix, visitor)
+            replay_prefix_contents(visitor, src_prefix, directories, files)
+
+        tty.debug(
+            "Walked {0} of {1} prefixes for view {2}".format(
+                self.view_merge_map.walked - walked, len(specs), self._root
+            )
+        )
 
         # Check for conflicts in destination dir.
         visit_directory_tree(self._root, DestinationMergeVisitor(visitor))
@@ -715,7 +744,10 @@ def skip_list(file):
             spec.package.add_files_to_view(self, merge_map, skip_if_exists=False)
 
         # Finally create the metadata dirs.
-        self.link_metadata(specs)
+        self.link_metadata(specs, previous=previous, listings=listings)
+
+        # Persist the merge map, so the next regeneration only walks new prefixes.
+        self.view_merge_map.write(os.path.join(self._root, _merge_map_path))
 
     def _source_merge_visitor_to_merge_map(self, visitor: SourceMergeVisitor):
         # For compatibility with add_files_to_view, we have to create a
@@ -738,14 +770,17 @@ def relative_metadata_dir_for_spec(self, spec):
             self.get_relative_projection_for_spec(spec), spack.store.layout.metadata_dir, spec.name
         )
 
-    def link_metadata(self, specs):
+    def link_metadata(self, specs, previous=None, listings=None):
         metadata_visitor = SourceMergeVisitor()
 
         for spec in specs:
             src_prefix = os.path.join(spec.package.view_source(), spack.store.layout.metadata_dir)
+            directories, files = self.view_merge_map.contents(
+                spec, src_prefix, previous=previous, key="metadata", listings=listings
+            )
             proj = self.relative_metadata_dir_for_spec(spec)
             metadata_visitor.set_projection(proj)
-            visit_directory_tree(src_prefix, metadata_visitor)
+            replay_prefix_contents(metadata_visitor, src_prefix, directories, files)
 
         # Check for conflicts in destination dir.
         visit_directory_tree(self._root, DestinationMergeVisitor(metadata_visitor))
@@ -789,6 +824,141 @@ def get_projection_for_spec(self, spec):
         return self._root
 
 
+class ViewMergeMap:
+    """Persistent record of the directories and files that every spec prefix
+    contributes to a view.
+
+    Installation prefixes are immutable, so the result of walking a prefix can be
+    reused when a view is regenerated: only the prefixes of specs that were added
+    to the view have to be visited again, and specs that were removed are simply
+    not replayed. Records are keyed by DAG hash, and are invalidated when the
+    prefix moved or its metadata directory changed (e.g. after a reinstall).
+    """
+
+    #: Version of the on-disk format
+    version = 1
+
+    def __init__(self, specs=None):
+        #: Maps DAG hashes to a dictionary with the prefix, a validation stamp,
+        #: and the relative directories and files per record key
+        self.specs = specs if specs is not None else {}
+        #: Number of prefixes that were walked on the filesystem
+        self.walked = 0
+
+    @staticmethod
+    def read(path):
+        """Read a merge map from a file, or return an empty one if the file is
+        missing, unreadable or has an unknown format."""
+        try:
+            with open(path, "r") as f:
+                data = s_json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            tty.debug("Not reusing view merge map at {0}: {1}".format(path, str(e)))
+            return ViewMergeMap()
+
+        if not isinstance(data, dict) or data.get("version") != ViewMergeMap.version:
+            return ViewMergeMap()
+
+        return ViewMergeMap(data.get("specs", {}))
+
+    @staticmethod
+    def from_view(root):
+        """Return the merge map stored in the view at ``root``, if any."""
+        if not root:
+            return ViewMergeMap()
+        return ViewMergeMap.read(os.path.join(root, _merge_map_path))
+
+    def write(self, path):
+        mkdirp(os.path.dirname(path))
+        with open(path, "w") as f:
+            s_json.dump({"version": self.version, "specs": self.specs}, f)
+
+    @staticmethod
+    def _stamp(spec):
+        """Cheap validation stamp of the prefix of an installed spec."""
+        metadata_dir = os.path.join(spec.package.view_source(), spack.store.layout.metadata_dir)
+        try:
+            return os.stat(metadata_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _entry(self, spec, previous, key):
+        """Return the entry for a spec, with the record ``key`` copied over from the
+        previous merge map if it is still valid."""
+        dag_hash = spec.dag_hash()
+        entry = self.specs.get(dag_hash)
+        if entry is None or entry["prefix"] != spec.package.view_source():
+            entry = {"prefix": spec.package.view_source(), "stamp": self._stamp(spec)}
+            self.specs[dag_hash] = entry
+
+        if key not in entry:
+            old = previous.specs.get(dag_hash) if previous else None
+            if (
+                entry["stamp"] is not None
+                and old is not None
+                and old.get("prefix") == entry["prefix"]
+                and old.get("stamp") == entry["stamp"]
+                and key in old
+            ):
+                entry[key] = old[key]
+
+        return entry
+
+    def needs_walk(self, spec, previous=None, key="contents"):
+        """Whether the prefix of a spec has to be walked to obtain the record ``key``"""
+        return key not in self._entry(spec, previous, key)
+
+    def contents(
+        self, spec, src_prefix, previous=None, key="contents", ignore=None, listings=None
+    ):
+        """Return the relative directories and files in ``src_prefix`` as seen by a
+        :py:class:`SourceMergeVisitor`, reusing the record in ``previous`` if it is
+        still valid, and walking the prefix otherwise.
+
+        Arguments:
+            spec (spack.spec.Spec): concrete spec the prefix belongs to
+            src_prefix (str): directory contributed by the spec to the view
+            previous (ViewMergeMap or None): merge map of a previous view
+            key (str): name of the record, to store multiple records per spec
+            ignore (callable or None): ignore function for the visitor
+            listings (dict or None): prefetched directory listings to walk the prefix
+
+        Returns:
+            tuple: list of relative directories and list of relative files
+        """
+        entry = self._entry(spec, previous, key)
+
+        if key not in entry:
+            visitor = SourceMergeVisitor(ignore=ignore)
+            visit_directory_tree(src_prefix, visitor, listings=listings)
+            entry[key] = {"directories": list(visitor.directories), "files": list(visitor.files)}
+            self.walked += 1
+
+        return entry[key]["directories"], entry[key]["files"]
+
+
+def replay_prefix_contents(visitor, root, directories, files):
+    """Feed recorded directories and files of a single prefix to a visitor, as if
+    :py:func:`llnl.util.filesystem.visit_directory_tree` had walked ``root``.
+
+    Directories are in pre-order, so when the visitor refuses to enter a directory,
+    everything below it is skipped, like in an actual traversal."""
+    skipped = []
+
+    def is_skipped(rel_path):
+        return any(rel_path.startswith(d + os.sep) for d in skipped)
+
+    for rel_path in directories:
+        if is_skipped(rel_path):
+            continue
+        if not visitor.before_visit_dir(root, rel_path, rel_path.count(os.sep)):
+            skipped.append(rel_path)
+
+    for rel_path in files:
+        if not is_skipped(rel_path):
+            visitor.visit_file(root, rel_path, rel_path.count(os.sep))
+
+
 #####################
 # utility functions #
 #####################
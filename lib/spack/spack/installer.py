@@ -769,6 +769,10 @@ def __init__(self, installs=[]):
         # Locks on specs being built, keyed on the package's unique id
         self.locks = {}
 
+        # Seconds spent waiting for the locks on specs, keyed on the package's
+        # unique id
+        self.lock_waits = defaultdict(float)
+
         # Cache fail_fast option to ensure if one build request asks to fail
         # fast then that option applies to all build requests.
         self.fail_fast = False
@@ -1074,6 +1078,8 @@ def _ensure_locked(self, lock_type, pkg):
         if lock and ltype == lock_type:
             return ltype, lock
 
+        waited = lock.wait_time if lock else 0.0
+
         desc = "{0} lock".format(lock_type)
         msg = "{0} a {1} on {2} with timeout {3}"
         err = "Failed to {0} a {1} for {2} due to {3}: {4}"
@@ -1092,6 +1098,7 @@ def _ensure_locked(self, lock_type, pkg):
                 tty.debug(msg.format("Acquiring", desc, pkg_id, pretty_seconds(timeout or 0)))
                 op = "acquire"
                 lock = spack.store.db.prefix_lock(pkg.spec, timeout)
+                waited = lock.wait_time
                 if timeout != lock.default_timeout:
                     tty.warn(
                         "Expected prefix lock timeout {0}, not {1}".format(
@@ -1126,6 +1133,7 @@ def _ensure_locked(self, lock_type, pkg):
 
         except (lk.LockDowngradeError, lk.LockTimeoutError) as exc:
             tty.debug(err.format(op, desc, pkg_id, exc.__class__.__name__, str(exc)))
+            self.lock_waits[pkg_id] += lock.wait_time - waited
             return (lock_type, None)
 
         except (Exception, KeyboardInterrupt, SystemExit) as exc:
@@ -1133,6 +1141,7 @@ def _ensure_locked(self, lock_type, pkg):
             self._cleanup_all_tasks()
             raise
 
+        self.lock_waits[pkg_id] += lock.wait_time - waited
         self.locks[pkg_id] = (lock_type, lock)
         return self.locks[pkg_id]
 
@@ -1277,6 +1286,9 @@ def _install_task(self, task):
         # to determine in BuildProcessInstaller whether installation is explicit or not
         install_args["is_root"] = task.is_root
 
+        # Report the time spent waiting for the prefix lock with the build phases
+        install_args["lock_wait"] = self.lock_waits.get(pkg_id, 0.0)
+
         try:
             self._setup_install_dir(pkg)
 
@@ -1907,6 +1919,9 @@ def __init__(self, pkg, install_args):
 
         # timer for build phases
         self.timer = timer.Timer()
+        lock_wait = install_args.get("lock_wait", 0.0)
+        if lock_wait > 0:
+            self.timer.record("lock-wait", lock_wait)
 
         # If we are using a padded path, filter the output to compress padded paths
         # The real log still has full-length paths.
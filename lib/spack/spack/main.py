@@ -24,8 +24,6 @@
 import traceback
 import warnings
 
-import archspec.cpu
-
 import llnl.util.lang
 import llnl.util.tty as tty
 import llnl.util.tty.colify
@@ -35,14 +33,7 @@
 import spack
 import spack.cmd
 import spack.config
-import spack.environment as ev
-import spack.modules
 import spack.paths
-import spack.platforms
-import spack.repo
-import spack.solver.asp
-import spack.spec
-import spack.store
 import spack.util.debug
 import spack.util.environment
 import spack.util.git
@@ -538,6 +529,24 @@ def make_argument_parser(**kwargs):
         action="store",
         help="lines of profile output or 'all' (default: 20)",
     )
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="run the command and report the modules that took longest to import",
+    )
+    parser.add_argument(
+        "--import-budget",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help="with --profile-imports, fail if importing modules took longer than this",
+    )
+    parser.add_argument(
+        "--lock-profile",
+        metavar="DIR",
+        default=os.environ.get("SPACK_LOCK_PROFILE"),
+        help="write lock contention statistics to DIR (see spack debug locks)",
+    )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="print additional output during builds"
     )
@@ -594,6 +603,9 @@ def setup_main_options(args):
     if args.timestamp:
         tty.set_timestamp(True)
 
+    if args.lock_profile:
+        spack.util.lock.profile_locks(args.lock_profile)
+
     # override lock configuration if passed on command line
     if args.locks is not None:
         if args.locks is False:
@@ -601,14 +613,15 @@ def setup_main_options(args):
         spack.config.set("config:locks", args.locks, scope="command_line")
 
     if args.mock:
+        import spack.repo as spack_repo
         import spack.util.spack_yaml as syaml
 
         key = syaml.syaml_str("repos")
         key.override = True
-        spack.config.config.scopes["command_line"].sections["repos"] = syaml.syaml_dict(
-            [(key, [spack.paths.mock_packages_path])]
+        spack.config.config.update_config(
+            key, [spack.paths.mock_packages_path], scope="command_line"
         )
-        spack.repo.path = spack.repo.create(spack.config.config)
+        spack_repo.path = spack_repo.create(spack.config.config)
 
     # If the user asked for it, don't check ssl certs.
     if args.insecure:
@@ -783,11 +796,88 @@ def _profile_wrapper(command, parser, args, unknown_args):
         stats.print_stats(nlines)
 
 
+def _profile_imports(argv, args):
+    """Run Spack with the same arguments in a subprocess, under ``python -X importtime``,
+    and report the modules that took longest to import.
+
+    Returns the exit code of the command, or 1 if it succeeded but the total time
+    spent importing modules exceeded ``--import-budget``.
+    """
+    if sys.version_info < (3, 7):
+        tty.die("--profile-imports requires Python 3.7 or later")
+
+    try:
+        nlines = int(args.lines)
+    except ValueError:
+        if args.lines != "all":
+            tty.die("Invalid number for --lines: %s" % args.lines)
+        nlines = -1
+
+    # Drop the options that would make the subprocess profile itself
+    command_args, skip_next = [], False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+        elif arg == "--import-budget":
+            skip_next = True
+        elif arg != "--profile-imports" and not arg.startswith("--import-budget="):
+            command_args.append(arg)
+
+    profiled = sp.run(
+        [sys.executable, "-X", "importtime", spack.paths.spack_script] + command_args,
+        stderr=sp.PIPE,
+        universal_newlines=True,
+    )
+
+    # Each line reads "import time: <self us> | <cumulative us> | <module>", with
+    # the module name indented by two spaces for each level of nesting.
+    imports = []
+    for line in profiled.stderr.splitlines():
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")
+            continue
+        match = re.match(r"^import time:\s*(\d+) \|\s*(\d+) \| (.*)$", line)
+        if not match:  # column headers
+            continue
+        self_us, cumulative_us, module = match.groups()
+        top_level = not module.startswith(" ")
+        imports.append((int(self_us) / 1e6, int(cumulative_us) / 1e6, module.strip(), top_level))
+
+    total = sum(cumulative for _, cumulative, _, top_level in imports if top_level)
+    slowest = sorted(imports, key=operator.itemgetter(0), reverse=True)
+    if nlines >= 0:
+        slowest = slowest[:nlines]
+
+    pretty = llnl.util.lang.pretty_seconds
+    budget = " (budget: %s)" % pretty(args.import_budget) if args.import_budget else ""
+    tty.msg("Imported %d modules in %s%s" % (len(imports), pretty(total), budget))
+    print("    %-12s %-12s %s" % ("self", "cumulative", "module"))
+    for self_time, cumulative, module, _ in slowest:
+        print("    %-12s %-12s %s" % (pretty(self_time), pretty(cumulative), module))
+
+    if profiled.returncode != 0:
+        return profiled.returncode
+
+    if args.import_budget is not None and total > args.import_budget:
+        tty.error(
+            "Importing modules took %s, more than the budget of %s"
+            % (pretty(total), pretty(args.import_budget))
+        )
+        return 1
+
+    return 0
+
+
 @llnl.util.lang.memoized
 def _compatible_sys_types():
     """Return a list of all the platform-os-target tuples compatible
     with the current host.
     """
+    import archspec.cpu
+
+    import spack.platforms
+    import spack.spec
+
     host_platform = spack.platforms.host()
     host_os = str(host_platform.operating_system("default_os"))
     host_target = archspec.cpu.host()
@@ -810,6 +900,12 @@ def print_setup_info(*info):
     This is in ``main.py`` to make it fast; the setup scripts need to
     invoke spack in login scripts, and it needs to be quick.
     """
+    import archspec.cpu
+
+    import spack.modules
+    import spack.spec
+    import spack.store
+
     shell = "csh" if "csh" in info else "sh"
 
     def shell_set(var, value):
@@ -907,6 +1003,10 @@ def _main(argv=None):
         parser.print_help()
         return 1
 
+    # Import times are measured on a fresh interpreter running the same command
+    if args.profile_imports:
+        return _profile_imports(sys.argv[1:] if argv is None else argv, args)
+
     # -h, -H, and -V are special as they do not require a command, but
     # all the other options do nothing without a command.
     if args.version:
@@ -936,6 +1036,8 @@ def _main(argv=None):
         try:
             env = spack.cmd.find_environment(args)
             if env:
+                import spack.environment as ev
+
                 ev.activate(env, args.use_env_repo)
         except spack.config.ConfigFormatError as e:
             # print the context but delay this exception so that commands like
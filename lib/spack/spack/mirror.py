@@ -12,6 +12,7 @@
 """
 import collections
 import collections.abc
+import functools
 import operator
 import os
 import os.path
@@ -523,11 +524,32 @@ def create(path, specs, skip_unstable_versions=False):
     # automatically spec-ify anything in the specs array.
     specs = [s if isinstance(s, spack.spec.Spec) else spack.spec.Spec(s) for s in specs]
 
-    mirror_cache, mirror_stats = mirror_cache_and_stats(path, skip_unstable_versions)
-    for spec in specs:
-        mirror_stats.next_spec(spec)
-        create_mirror_from_package_object(spec.package, mirror_cache, mirror_stats)
+    # Create the mirror directory before starting workers
+    mirror_cache_and_stats(path, skip_unstable_versions)
+
+    add_fn = functools.partial(_add_single_spec, path, skip_unstable_versions)
+    present, mirrored, error = [], [], []
+    for spec, (stats, msg) in zip(specs, fs.fetch_concurrently(specs, add_fn)):
+        if msg:
+            tty.warn("Error while fetching {0}".format(spec.cformat("{name}{@version}")), msg)
+            error.append(spec)
+            continue
+        present.extend(stats[0])
+        mirrored.extend(stats[1])
+        error.extend(stats[2])
 
+    return present, mirrored, error
+
+
+def _add_single_spec(path, skip_unstable_versions, spec):
+    """Add a single spec to the mirror at ``path`` and return the stats"""
+    mirror_cache, mirror_stats = mirror_cache_and_stats(path, skip_unstable_versions)
+    if spec.concrete:
+        pkg_obj = spec.package
+    else:
+        pkg_obj = spack.repo.path.get_pkg_class(spec.name)(spack.spec.Spec(spec))
+    mirror_stats.next_spec(pkg_obj.spec)
+    create_mirror_from_package_object(pkg_obj, mirror_cache, mirror_stats)
     return mirror_stats.stats()
 
 
@@ -31,10 +31,12 @@
 import contextlib
 import copy
 import datetime
+import functools
 import inspect
 import os.path
 import pathlib
 import re
+import sys
 import warnings
 from typing import Optional
 
@@ -42,7 +44,6 @@
 import llnl.util.tty as tty
 from llnl.util.lang import dedupe
 
-import spack.build_environment
 import spack.config
 import spack.environment
 import spack.error
@@ -53,8 +54,10 @@
 import spack.schema.environment
 import spack.store
 import spack.tengine as tengine
+import spack.user_environment
 import spack.util.environment
 import spack.util.file_permissions as fp
+import spack.util.parallel
 import spack.util.path
 import spack.util.spack_yaml as syaml
 
@@ -707,12 +710,8 @@ def environment_modifications(self):
             spec.prefix, prefix_inspections, exclude=spack.util.environment.is_system_path
         )
 
-        # Let the extendee/dependency modify their extensions/dependencies
-        # before asking for package-specific modifications
-        env.extend(spack.build_environment.modifications_from_dependencies(spec, context="run"))
-        # Package specific modifications
-        spack.build_environment.set_module_variables_for_package(spec.package)
-        spec.package.setup_run_environment(env)
+        # Modifications from the package and its extendee/dependencies
+        env.extend(spack.user_environment.run_environment_modifications(spec))
 
         # Modifications required from modules.yaml
         env.extend(self.conf.env)
@@ -844,43 +843,24 @@ def _get_template(self):
         # ... and return the first match
         return choices.pop(0)
 
-    def write(self, overwrite=False):
-        """Writes the module file.
+    def render(self, template_env=None):
+        """Returns the text of the module file.
 
         Args:
-            overwrite (bool): if True it is fine to overwrite an already
-                existing file. If False the operation is skipped an we print
-                a warning to the user.
+            template_env: template environment used to load the template. Sharing
+                it among writers avoids compiling the same template over and over.
         """
-        # Return immediately if the module is excluded
-        if self.conf.excluded:
-            msg = "\tNOT WRITING: {0} [EXCLUDED]"
-            tty.debug(msg.format(self.spec.cshort_spec))
-            return
-
-        # Print a warning in case I am accidentally overwriting
-        # a module file that is already there (name clash)
-        if not overwrite and os.path.exists(self.layout.filename):
-            message = "Module file {0.filename} exists and will not be overwritten"
-            tty.warn(message.format(self.layout))
-            return
-
-        # If we are here it means it's ok to write the module file
-        msg = "\tWRITE: {0} [{1}]"
-        tty.debug(msg.format(self.spec.cshort_spec, self.layout.filename))
-
-        # If the directory where the module should reside does not exist
-        # create it
-        module_dir = os.path.dirname(self.layout.filename)
-        if not os.path.exists(module_dir):
-            llnl.util.filesystem.mkdirp(module_dir)
+        text, _ = self._render(template_env)
+        return text
 
+    def _render(self, template_env=None):
+        """Returns the text of the module file and the context used to render it."""
         # Get the template for the module
         template_name = self._get_template()
         import jinja2
 
         try:
-            env = tengine.make_environment()
+            env = template_env or tengine.make_environment()
             template = env.get_template(template_name)
         except jinja2.TemplateNotFound:
             # If the template was not found raise an exception with a little
@@ -908,7 +888,61 @@ def write(self, overwrite=False):
         context.update(conf_update)
 
         # Render the template
-        text = template.render(context)
+        return template.render(context), context
+
+    def write(self, overwrite=False):
+        """Writes the module file.
+
+        Args:
+            overwrite (bool): if True it is fine to overwrite an already
+                existing file. If False the operation is skipped an we print
+                a warning to the user.
+        """
+        if self._write_module_file(overwrite=overwrite) is not None:
+            # Symlink defaults if needed
+            self.update_module_defaults()
+
+    def _write_module_file(self, overwrite=False, template_env=None):
+        """Writes the module file, without updating defaults.
+
+        Returns:
+            None if the module file was skipped, True if it was written and False
+            if it already existed with the same content.
+        """
+        # Return immediately if the module is excluded
+        if self.conf.excluded:
+            msg = "\tNOT WRITING: {0} [EXCLUDED]"
+            tty.debug(msg.format(self.spec.cshort_spec))
+            return None
+
+        # Print a warning in case I am accidentally overwriting
+        # a module file that is already there (name clash)
+        if not overwrite and os.path.exists(self.layout.filename):
+            message = "Module file {0.filename} exists and will not be overwritten"
+            tty.warn(message.format(self.layout))
+            return None
+
+        text, context = self._render(template_env=template_env)
+
+        # Don't touch module files whose content did not change, apart from
+        # the timestamp in their header
+        timestamp = str(context.get("timestamp", ""))
+        new_content = text.replace(timestamp, _timestamp_mask) if timestamp else text
+        if _masked_content_of_file(self.layout.filename) == new_content:
+            msg = "\tUNCHANGED: {0} [{1}]"
+            tty.debug(msg.format(self.spec.cshort_spec, self.layout.filename))
+            return False
+
+        # If we are here it means it's ok to write the module file
+        msg = "\tWRITE: {0} [{1}]"
+        tty.debug(msg.format(self.spec.cshort_spec, self.layout.filename))
+
+        # If the directory where the module should reside does not exist
+        # create it
+        module_dir = os.path.dirname(self.layout.filename)
+        if not os.path.exists(module_dir):
+            llnl.util.filesystem.mkdirp(module_dir)
+
         # Write it to file
         with open(self.layout.filename, "w") as f:
             f.write(text)
@@ -917,8 +951,7 @@ def write(self, overwrite=False):
         if os.path.exists(self.layout.filename):
             fp.set_permissions_by_spec(self.layout.filename, self.spec)
 
-        # Symlink defaults if needed
-        self.update_module_defaults()
+        return True
 
     def update_module_defaults(self):
         if any(self.spec.satisfies(default) for default in self.conf.defaults):
@@ -957,6 +990,100 @@ def remove_module_defaults(self):
             pass
 
 
+#: Replaces timestamps when comparing old and new content of module files
+_timestamp_mask = "<timestamp>"
+_timestamp_re = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?")
+
+
+def _masked_content_of_file(filename):
+    try:
+        with open(filename, "r") as f:
+            return _timestamp_re.sub(_timestamp_mask, f.read())
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+
+
+def _write_module_files(writers, overwrite):
+    """Writes module files sharing a single template environment, so that every
+    template is compiled once. Writers can be passed as callables creating them.
+
+    Returns:
+        List of (status, error message) tuples
+    """
+    template_env = tengine.make_environment()
+    results = []
+    for writer in writers:
+        try:
+            if callable(writer):
+                writer = writer()
+            results.append((writer._write_module_file(overwrite, template_env), None))
+        except Exception as e:
+            tty.debug(e)
+            results.append((None, str(e)))
+    return results
+
+
+def _write_module_files_task(args):
+    """Task for a worker process, writing module files for a chunk of specs."""
+    writer_cls, items, overwrite = args
+    writers = [functools.partial(writer_cls, *item) for item in items]
+    return _write_module_files(writers, overwrite)
+
+
+def write_module_files(writers, overwrite=False, max_processes=None):
+    """Writes the module files of many writers at once.
+
+    Contexts are computed and templates are rendered in a pool of processes,
+    where each worker compiles every template once. Module files whose content
+    is unchanged are not rewritten. Default symlinks are updated afterwards,
+    following the order of ``writers``.
+
+    Args:
+        writers: module file writers, all of the same type
+        overwrite (bool): whether it is fine to overwrite existing module files
+        max_processes (int or None): maximum number of worker processes, defaults
+            to ``config:build_jobs``
+
+    Returns:
+        List of ``(writer, error message)`` tuples for the module files that
+        could not be written
+    """
+    writers = list(writers)
+    if max_processes is None:
+        max_processes = spack.config.get("config:build_jobs")
+    n = max(1, min(len(writers), max_processes or 1))
+
+    if n == 1 or sys.platform in ("darwin", "win32"):
+        results = _write_module_files(writers, overwrite)
+    else:
+        # Round-robin chunks, one per worker, to share the template environment
+        chunks = [writers[i::n] for i in range(n)]
+        arguments = [
+            (type(c[0]), [(w.spec, w.conf.name, w.conf.explicit) for w in c], overwrite)
+            for c in chunks
+        ]
+        per_chunk = spack.util.parallel.parallel_map(
+            _write_module_files_task, arguments, max_processes=n, debug=tty.is_debug()
+        )
+        results = [None] * len(writers)
+        for i, chunk_results in enumerate(per_chunk):
+            results[i::n] = chunk_results
+
+    failures = []
+    n_unchanged = 0
+    for writer, (status, error) in zip(writers, results):
+        if error is not None:
+            failures.append((writer, error))
+            continue
+        if status is not None:
+            writer.update_module_defaults()
+        if status is False:
+            n_unchanged += 1
+
+    tty.debug("{0} of {1} module files were unchanged".format(n_unchanged, len(writers)))
+    return failures
+
+
 @contextlib.contextmanager
 def disable_modules():
     """Disable the generation of modulefiles within the context manager."""
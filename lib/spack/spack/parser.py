@@ -57,10 +57,11 @@
 expansion when it is the first character in an id typed on the command line.
 """
 import enum
+import itertools
 import pathlib
 import re
 import sys
-from typing import Iterator, List, Match, Optional
+from typing import Dict, Iterator, List, Match, Optional
 
 from llnl.util.tty import color
 
@@ -189,6 +190,28 @@ def __eq__(self, other):
 #: Regex to analyze an invalid text
 ANALYSIS_REGEX = re.compile("|".join(ERROR_HANDLING_REGEXES))
 
+#: Tokens that only match text containing one of ``=``, ``/``, ``\``, ``^``,
+#: ``.json`` or ``.yaml``
+SPECIAL_TOKENS = (
+    TokenType.DEPENDENCY,
+    TokenType.VERSION_HASH_PAIR,
+    TokenType.PROPAGATED_KEY_VALUE_PAIR,
+    TokenType.KEY_VALUE_PAIR,
+    TokenType.FILENAME,
+    TokenType.DAG_HASH,
+)
+#: Regex to scan text without special tokens, like ``name@version +variant %compiler``.
+#: It gives the same tokens as ``ALL_TOKENS``, without trying to match each name
+#: as a key-value pair or a filename first.
+SIMPLE_TOKENS = re.compile(
+    "|".join(rf"(?P<{token}>{token.regex})" for token in TokenType if token not in SPECIAL_TOKENS)
+)
+#: Regex telling whether a text may contain special tokens
+MAY_HAVE_SPECIAL_TOKENS = re.compile(r"[=/\\^]|\.json|\.yaml")
+
+#: Token kinds by name of the regex group matching them
+_TOKEN_KINDS = {str(token): token for token in TokenType}
+
 
 def tokenize(text: str) -> Iterator[Token]:
     """Return a token generator from the text passed as input.
@@ -197,11 +220,12 @@ def tokenize(text: str) -> Iterator[Token]:
         SpecTokenizationError: if we can't tokenize anymore, but didn't reach the
             end of the input text.
     """
-    scanner = ALL_TOKENS.scanner(text)  # type: ignore[attr-defined]
+    regex = ALL_TOKENS if MAY_HAVE_SPECIAL_TOKENS.search(text) else SIMPLE_TOKENS
+    scanner = regex.scanner(text)  # type: ignore[attr-defined]
     match: Optional[Match] = None
     for match in iter(scanner.match, None):
         yield Token(
-            TokenType.__members__[match.lastgroup],  # type: ignore[attr-defined]
+            _TOKEN_KINDS[match.lastgroup],  # type: ignore[attr-defined]
             match.group(),  # type: ignore[attr-defined]
             match.start(),  # type: ignore[attr-defined]
             match.end(),  # type: ignore[attr-defined]
@@ -468,9 +492,15 @@ def parse_one_or_raise(
 
     Args:
         text (str): text to be parsed
-        initial_spec: buffer where to parse the spec. If None a new one will be created.
+        initial_spec: empty spec where to parse the spec. If None a new one will be created.
     """
     stripped_text = text.strip()
+    cached = _parsed_specs.get(stripped_text)
+    if cached is not None:
+        result = initial_spec if initial_spec is not None else spack.spec.Spec()
+        _copy_parsed_spec(cached, result)
+        return result
+
     parser = SpecParser(stripped_text)
     result = parser.next_spec(initial_spec)
     last_token = parser.ctx.current_token
@@ -488,9 +518,71 @@ def parse_one_or_raise(
         message += f"\n{text}"
         raise ValueError(message)
 
+    if _can_cache(stripped_text, result):
+        if len(_parsed_specs) >= _max_parsed_specs:
+            # Another thread may evict the same entry, or empty the cache
+            _parsed_specs.pop(next(iter(_parsed_specs), None), None)
+        _parsed_specs[stripped_text] = spack.spec.Spec()
+        _copy_parsed_spec(result, _parsed_specs[stripped_text])
+
     return result
 
 
+#: Specs parsed by ``parse_one_or_raise``, by spec string. Environments, package
+#: directives and configuration parse the same strings over and over, and copying
+#: a parsed spec is about twice as fast as parsing it again.
+_parsed_specs: Dict[str, spack.spec.Spec] = {}
+
+#: Maximum number of parsed specs to keep
+_max_parsed_specs = 8192
+
+#: Names of operating systems and targets that depend on the host platform
+HOST_DEPENDENT_NAMES = re.compile(r"\b(default_os|default_target|frontend|fe|backend|be)\b")
+
+
+def _can_cache(text: str, spec: spack.spec.Spec) -> bool:
+    """Whether the spec parsed from text is the same whenever the text is parsed."""
+    # Spec files can change, and git versions are bound to a package repository.
+    if ".json" in text or ".yaml" in text or HOST_DEPENDENT_NAMES.search(text):
+        return False
+
+    nodes = [spec] + [edge.spec for edge in _parsed_dependencies(spec)]
+    return not any(
+        isinstance(v, spack.version.GitVersion) for node in nodes for v in node.versions
+    )
+
+
+def _parsed_dependencies(spec: spack.spec.Spec) -> Iterator[spack.spec.DependencySpec]:
+    # Parsed dependencies have no dependency types, so skip the filtering
+    # done by Spec.edges_to_dependencies()
+    return itertools.chain.from_iterable(spec._dependencies.values())
+
+
+def _copy_parsed_node(source: spack.spec.Spec, target: spack.spec.Spec):
+    target.name = source.name
+    target.namespace = source.namespace
+    target.abstract_hash = source.abstract_hash
+    target.versions = source.versions.copy()
+    target.architecture = source.architecture.copy() if source.architecture else None
+    target.compiler = source.compiler.copy() if source.compiler else None
+    target.compiler_flags = source.compiler_flags.copy()
+    target.compiler_flags.spec = target
+    target.variants = source.variants.copy()
+    target.variants.spec = target
+
+
+def _copy_parsed_spec(source: spack.spec.Spec, target: spack.spec.Spec):
+    """Copy the attributes set by the parser from one spec to an empty one. This is
+    cheaper than ``Spec._dup``, since parsed dependencies have no dependencies of
+    their own.
+    """
+    _copy_parsed_node(source, target)
+    for edge in _parsed_dependencies(source):
+        dependency = spack.spec.Spec()
+        _copy_parsed_node(edge.spec, dependency)
+        target._add_dependency(dependency, deptypes=())
+
+
 class SpecSyntaxError(Exception):
     """Base class for Spec syntax errors"""
 
@@ -135,3 +135,8 @@ def _get_system_config_path():
 
 #: System configuration location
 system_config_path = _get_system_config_path()
+
+#: Environment variable with the name or directory of the active environment.
+#: It is defined here so that commands can check it without importing
+#: ``spack.environment``, which is expensive.
+spack_env_var = "SPACK_ENV"
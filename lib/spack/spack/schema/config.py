@@ -67,9 +67,13 @@
             "template_dirs": {"type": "array", "items": {"type": "string"}},
             "license_dir": {"type": "string"},
             "source_cache": {"type": "string"},
+            "expanded_source_cache_size": {"type": "integer", "minimum": 0},
+            "git_repo_cache": {"type": "boolean"},
             "misc_cache": {"type": "string"},
             "environments_root": {"type": "string"},
             "connect_timeout": {"type": "integer", "minimum": 0},
+            "url_pool_size": {"type": "integer", "minimum": 0},
+            "max_fetches_per_host": {"type": "integer", "minimum": 1},
             "verify_ssl": {"type": "boolean"},
             "suppress_gpg_warnings": {"type": "boolean"},
             "install_missing_compilers": {"type": "boolean"},
@@ -86,6 +90,7 @@
             "package_lock_timeout": {
                 "anyOf": [{"type": "integer", "minimum": 1}, {"type": "null"}]
             },
+            "prefix_lock_shards": {"type": "integer", "minimum": 1},
             "allow_sgid": {"type": "boolean"},
             "binary_index_root": {"type": "string"},
             "url_fetch_method": {"type": "string", "enum": ["urllib", "curl"]},
@@ -1309,7 +1309,7 @@ def __init__(
 
         # init an empty spec that matches anything.
         self.name = None
-        self.versions = vn.VersionList(":")
+        self.versions = vn.any_version.copy()
         self.variants = vt.VariantMap(self)
         self.architecture = None
         self.compiler = None
@@ -12,6 +12,7 @@
 import os
 import shutil
 import stat
+import subprocess
 import sys
 import tempfile
 from typing import Dict
@@ -37,9 +38,11 @@
 import spack.paths
 import spack.spec
 import spack.util.lock
+import spack.util.parallel
 import spack.util.path as sup
 import spack.util.pattern as pattern
 import spack.util.url as url_util
+import spack.util.web as web_util
 from spack.util.crypto import bit_length, prefix_bits
 from spack.util.web import FetchError
 
@@ -549,7 +552,10 @@ def steal_source(self, dest):
         if not self.created:
             self.create()
         if not self.expanded and not self.archive_file:
-            self.fetch()
+            # The copy outlives the stage, so it must not share its objects
+            # with the git repository cache
+            with spack.config.override("config:git_repo_cache", False):
+                self.fetch()
         if not self.expanded:
             self.expand_archive()
 
@@ -867,6 +873,94 @@ def purge():
                     os.remove(stage_path)
 
 
+def _stream_checksum(url, fetch_options=None):
+    """Returns the sha256 of the content of a URL.
+
+    The checksum is computed while the content is downloaded, which is never
+    written to disk.
+    """
+    tty.debug("Checksumming {0}".format(url))
+    hasher = hashlib.sha256()
+    fetch_options = fetch_options or {}
+
+    if spack.config.get("config:url_fetch_method") == "curl":
+        curl = web_util._curl()
+        # The body goes to stdout, so headers and the status bar are omitted
+        curl_args = [
+            arg
+            for arg in web_util.base_curl_fetch_args(url, fetch_options.get("timeout", 0))
+            if arg not in ("-D", "-", "-#")
+        ]
+        if "-sS" not in curl_args:
+            curl_args.append("-sS")
+        cookie = fetch_options.get("cookie")
+        if cookie:
+            curl_args.extend(["-j", "-b", cookie])
+        proc = subprocess.Popen(curl.exe + curl_args, stdout=subprocess.PIPE)
+        with proc.stdout:
+            for chunk in iter(lambda: proc.stdout.read(2**20), b""):
+                hasher.update(chunk)
+        try:
+            web_util.check_curl_code(proc.wait())
+        except FetchError as e:
+            raise FailedDownloadError(url, str(e))
+    else:
+        try:
+            _, headers, response = web_util.read_from_url(url)
+        except web_util.SpackWebError as e:
+            raise FailedDownloadError(url, str(e))
+        size = 0
+        with response:
+            for chunk in iter(lambda: response.read(2**20), b""):
+                hasher.update(chunk)
+                size += len(chunk)
+        length = headers.get("Content-Length")
+        if length and length.isdigit() and size < int(length):
+            raise FailedDownloadError(url, "download interrupted")
+        if "text/html" in headers.get("Content-Type", ""):
+            fs.warn_content_type_mismatch(url)
+
+    return hasher.hexdigest()
+
+
+def _fetch_and_checksum(url, fetch_options=None, keep_stage=False, first_stage_function=None):
+    """Fetches an archive into a stage, so that it can be inspected by
+    ``first_stage_function`` or kept, and returns its sha256."""
+    if fetch_options:
+        url_or_fs = fs.URLFetchStrategy(url, fetch_options=fetch_options)
+    else:
+        url_or_fs = url
+    with Stage(url_or_fs, keep=keep_stage) as stage:
+        # Fetch the archive
+        stage.fetch()
+        if first_stage_function:
+            first_stage_function(stage, url)
+
+        # Checksum the archive
+        return spack.util.crypto.checksum(hashlib.sha256, stage.archive_file)
+
+
+def _checksum_task(args):
+    """Checksums an archive in a worker process.
+
+    The archive is only staged if ``keep_stage`` is true. Returns a tuple
+    (version, url, sha256, error), where sha256 is None if the archive could
+    not be checksummed, and error is None if it failed to download, or the
+    message of any other error.
+    """
+    version, url, fetch_options, keep_stage = args
+    try:
+        if keep_stage:
+            sha256 = _fetch_and_checksum(url, fetch_options, keep_stage)
+        else:
+            sha256 = _stream_checksum(url, fetch_options)
+        return version, url, sha256, None
+    except FailedDownloadError:
+        return version, url, None, None
+    except Exception as e:
+        return version, url, None, str(e)
+
+
 def get_checksums_for_versions(url_dict, name, **kwargs):
     """Fetches and checksums archives from URLs.
 
@@ -875,6 +969,12 @@ def get_checksums_for_versions(url_dict, name, **kwargs):
     inspect the first downloaded archive, e.g., to determine the build
     system.
 
+    Archives are checksummed concurrently while they are downloaded, in
+    separate processes that can be terminated if the command is interrupted.
+    They are not written to disk unless a stage is needed, i.e. for the first
+    archive if ``first_stage_function`` is given, or for all of them if
+    ``keep_stage`` is true.
+
     Args:
         url_dict (dict): A dictionary of the form: version -> URL
         name (str): The name of the package
@@ -886,6 +986,8 @@ def get_checksums_for_versions(url_dict, name, **kwargs):
         latest (bool): whether to take the latest version (true) or all (false)
         fetch_options (dict): Options used for the fetcher (such as timeout
             or cookies)
+        concurrency (int): maximum number of archives downloaded at the same
+            time (default: ``config:max_fetches_per_host``)
 
     Returns:
         (str): A multi-line string containing versions and corresponding hashes
@@ -896,6 +998,7 @@ def get_checksums_for_versions(url_dict, name, **kwargs):
     first_stage_function = kwargs.get("first_stage_function", None)
     keep_stage = kwargs.get("keep_stage", False)
     latest = kwargs.get("latest", False)
+    concurrency = kwargs.get("concurrency", None) or fs.max_fetches_per_host()
 
     sorted_versions = sorted(url_dict.keys(), reverse=True)
     if latest:
@@ -928,36 +1031,46 @@ def get_checksums_for_versions(url_dict, name, **kwargs):
     urls = [url_dict[v] for v in versions]
 
     tty.debug("Downloading...")
-    version_hashes = []
-    i = 0
+    version_hashes = {}
     errors = []
-    for url, version in zip(urls, versions):
-        # Wheels should not be expanded during staging
-        expand_arg = ""
-        if url.endswith(".whl") or ".whl#" in url:
-            expand_arg = ", expand=False"
+
+    def report(version, url, sha256):
+        version_hashes[version] = sha256
+        tty.msg(
+            "[{0}/{1}] {2:{3}}  {4}".format(
+                len(version_hashes), len(versions), str(version), max_len, sha256
+            )
+        )
+
+    def collect(version, url, sha256, error):
+        if sha256:
+            report(version, url, sha256)
+        elif error is None:
+            errors.append("Failed to fetch {0}".format(url))
+        else:
+            tty.msg("Something failed on {0}, skipping.  ({1})".format(url, error))
+
+    # Archives are fetched one at a time until first_stage_function can run
+    pending = list(zip(versions, urls))
+    while pending and first_stage_function and not version_hashes:
+        version, url = pending.pop(0)
         try:
-            if fetch_options:
-                url_or_fs = fs.URLFetchStrategy(url, fetch_options=fetch_options)
-            else:
-                url_or_fs = url
-            with Stage(url_or_fs, keep=keep_stage) as stage:
-                # Fetch the archive
-                stage.fetch()
-                if i == 0 and first_stage_function:
-                    # Only run first_stage_function the first time,
-                    # no need to run it every time
-                    first_stage_function(stage, url)
-
-                # Checksum the archive and add it to the list
-                version_hashes.append(
-                    (version, spack.util.crypto.checksum(hashlib.sha256, stage.archive_file))
-                )
-                i += 1
+            sha256 = _fetch_and_checksum(url, fetch_options, keep_stage, first_stage_function)
+            collect(version, url, sha256, None)
         except FailedDownloadError:
-            errors.append("Failed to fetch {0}".format(url))
+            collect(version, url, None, None)
         except Exception as e:
-            tty.msg("Something failed on {0}, skipping.  ({1})".format(url, e))
+            collect(version, url, None, str(e))
+
+    # The others are fetched concurrently
+    tasks = [(version, url, fetch_options, keep_stage) for version, url in pending]
+    if len(tasks) > 1 and sys.platform not in ("darwin", "win32"):
+        with spack.util.parallel.pool(processes=min(concurrency, len(tasks))) as pool:
+            for result in pool.imap_unordered(_checksum_task, tasks):
+                collect(*result)
+    else:
+        for task in tasks:
+            collect(*_checksum_task(task))
 
     for msg in errors:
         tty.debug(msg)
@@ -966,16 +1079,26 @@ def get_checksums_for_versions(url_dict, name, **kwargs):
         tty.die("Could not fetch any versions for {0}".format(name))
 
     # Generate the version directives to put in a package.py
-    version_lines = "\n".join(
-        ['    version("{0}", sha256="{1}"{2})'.format(v, h, expand_arg) for v, h in version_hashes]
-    )
+    version_lines = []
+    for version, url in zip(versions, urls):
+        if version not in version_hashes:
+            continue
+        # Wheels should not be expanded during staging
+        expand_arg = ""
+        if url.endswith(".whl") or ".whl#" in url:
+            expand_arg = ", expand=False"
+        version_lines.append(
+            '    version("{0}", sha256="{1}"{2})'.format(
+                version, version_hashes[version], expand_arg
+            )
+        )
 
     num_hash = len(version_hashes)
     tty.debug(
         "Checksummed {0} version{1} of {2}:".format(num_hash, "" if num_hash == 1 else "s", name)
     )
 
-    return version_lines
+    return "\n".join(version_lines)
 
 
 class StageError(spack.error.SpackError):
@@ -3,11 +3,16 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import itertools
+import os
+import tempfile
 import textwrap
 from typing import List
 
+import llnl.util.filesystem
 import llnl.util.lang
+import llnl.util.tty as tty
 
+import spack
 import spack.config
 import spack.extensions
 from spack.util.path import canonicalize_path
@@ -67,13 +72,23 @@ def to_dict(self):
 
 
 def make_environment(dirs=None):
-    """Returns an configured environment for template rendering."""
+    """Returns an configured environment for template rendering.
+
+    Environments are cached for the lifetime of the process, per set of template
+    directories, so that each template is parsed and compiled at most once. Compiled
+    templates are also cached on disk, in the misc cache.
+    """
     if dirs is None:
         # Default directories where to search for templates
         builtins = spack.config.get("config:template_dirs", ["$spack/share/spack/templates"])
         extensions = spack.extensions.get_template_dirs()
         dirs = [canonicalize_path(d) for d in itertools.chain(builtins, extensions)]
 
+    return _make_environment(tuple(dirs), _bytecode_cache_dir())
+
+
+@llnl.util.lang.memoized
+def _make_environment(dirs, bytecode_cache_dir):
     # avoid importing this at the top level as it's used infrequently and
     # slows down startup a bit.
     import jinja2
@@ -81,12 +96,73 @@ def make_environment(dirs=None):
     # Loader for the templates
     loader = jinja2.FileSystemLoader(dirs)
     # Environment of the template engine
-    env = jinja2.Environment(loader=loader, trim_blocks=True, lstrip_blocks=True)
+    env = jinja2.Environment(
+        loader=loader,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=_make_bytecode_cache(bytecode_cache_dir),
+    )
     # Custom filters
     _set_filters(env)
     return env
 
 
+def _bytecode_cache_dir():
+    """Directory for compiled templates of the current Spack version, or None if
+    the misc cache is not configured."""
+    import spack.caches
+
+    misc_cache = spack.caches.misc_cache_location()
+    if not misc_cache:
+        return None
+    return os.path.join(misc_cache, "templates", spack.spack_version)
+
+
+def _make_bytecode_cache(directory):
+    """Returns a cache of compiled templates in ``directory``, or None if the
+    directory cannot be created.
+
+    Cache entries are keyed by template name and file name, and validated against
+    a checksum of the template source. They are written atomically, and unreadable
+    entries are ignored, so that concurrent Spack processes can share the cache.
+    """
+    if directory is None:
+        return None
+
+    try:
+        llnl.util.filesystem.mkdirp(directory)
+    except OSError as e:
+        tty.debug("Not caching compiled templates in {0}: {1}".format(directory, str(e)))
+        return None
+
+    import jinja2
+
+    class _SharedFileSystemBytecodeCache(jinja2.FileSystemBytecodeCache):
+        def load_bytecode(self, bucket):
+            try:
+                super().load_bytecode(bucket)
+            except Exception:
+                bucket.reset()
+
+        def dump_bytecode(self, bucket):
+            filename = self._get_cache_filename(bucket)
+            try:
+                fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp")
+            except OSError as e:
+                tty.debug("Could not cache compiled template {0}: {1}".format(filename, str(e)))
+                return
+
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    bucket.write_bytecode(f)
+                os.replace(tmp, filename)
+            except OSError as e:
+                tty.debug("Could not cache compiled template {0}: {1}".format(filename, str(e)))
+                llnl.util.filesystem.force_remove(tmp)
+
+    return _SharedFileSystemBytecodeCache(directory)
+
+
 # Extra filters for template engine environment
 
 
@@ -380,6 +380,35 @@ def test_built_spec_cache(mirror_dir):
         assert any([r["spec"] == s for r in results])
 
 
+def test_get_mirrors_for_specs(mutable_config, mock_packages, mock_binary_index, monkeypatch):
+    """Specs found in the index are not searched on the mirrors, and each missing
+    spec is searched only once."""
+    mirror_url = "https://my.fake.mirror"
+    spack.config.set("mirrors", {"test": mirror_url})
+
+    indexed, missing, remote = (Spec(x).concretized() for x in ("libelf", "libdwarf", "zlib"))
+    bindist.binary_index.update_spec(indexed, [{"mirror_url": mirror_url, "spec": indexed}])
+
+    searched = []
+
+    def fake_get_mirrors_for_spec(spec=None, mirrors_to_check=None, index_only=False):
+        searched.append(spec.name)
+        return [{"mirror_url": mirror_url, "spec": spec}] if spec is remote else []
+
+    monkeypatch.setattr(bindist, "get_mirrors_for_spec", fake_get_mirrors_for_spec)
+
+    results = bindist.get_mirrors_for_specs([indexed, missing, remote, missing])
+    assert sorted(searched) == ["libdwarf", "zlib"]
+    assert results[indexed.dag_hash()][0]["spec"] is indexed
+    assert not results[missing.dag_hash()]
+    assert results[remote.dag_hash()][0]["spec"] is remote
+
+    searched.clear()
+    results = bindist.get_mirrors_for_specs([indexed, missing], index_only=True)
+    assert not searched
+    assert results[indexed.dag_hash()] and not results[missing.dag_hash()]
+
+
 def fake_dag_hash(spec):
     # Generate an arbitrary hash that is intended to be different than
     # whatever a Spec reported before (to test actions that trigger when
@@ -9,7 +9,10 @@
 
 from llnl.util.filesystem import mkdirp, touch
 
+import spack.caches
 import spack.config
+import spack.fetch_strategy as fs
+import spack.util.crypto as crypto
 import spack.util.url as url_util
 from spack.fetch_strategy import CacheURLFetchStrategy, NoCacheError
 from spack.stage import Stage
@@ -41,3 +44,52 @@ def test_fetch(tmpdir, _fetch_method):
             source_path = stage.source_path
             mkdirp(source_path)
             fetcher.fetch()
+
+
+def test_fetch_hard_links_cached_archive(tmpdir):
+    cache = tmpdir.ensure("cache", "cache.tar.gz")
+    fetcher = CacheURLFetchStrategy(url=url_util.path_to_file_url(str(cache)))
+    with Stage(fetcher, path=str(tmpdir.join("stage"))) as stage:
+        fetcher.fetch()
+        assert not os.path.islink(stage.archive_file)
+        assert os.path.samefile(stage.archive_file, str(cache))
+
+
+def test_expanded_archive_is_reused_by_new_stages(tmpdir, mock_archive, monkeypatch):
+    cache = fs.ExpandedSourceCache(str(tmpdir.join("expanded")), 2**30)
+    monkeypatch.setattr(spack.caches, "expanded_source_cache", cache)
+    with open(mock_archive.archive_file, "rb") as f:
+        digest = crypto.hash_fun_for_algo("sha256")(f.read()).hexdigest()
+
+    def stage_archive(name):
+        fetcher = fs.URLFetchStrategy(url=mock_archive.url, sha256=digest)
+        with Stage(fetcher, path=str(tmpdir.join(name))) as stage:
+            stage.fetch()
+            stage.check()
+            stage.expand_archive()
+            return sorted(os.listdir(stage.source_path))
+
+    expected = stage_archive("first")
+    assert os.path.isdir(str(tmpdir.join("expanded", digest)))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the archive should not be expanded again")
+
+    monkeypatch.setattr(fs, "decompressor_for", lambda *args: fail)
+    assert stage_archive("second") == expected
+
+
+def test_expanded_source_cache_evicts_least_recently_used(tmpdir):
+    cache = fs.ExpandedSourceCache(str(tmpdir.join("expanded")), 25)
+    for digest in ("a", "b", "c"):
+        src = tmpdir.ensure(digest, dir=True)
+        src.join("file").write("x" * 10)
+        cache.store(digest, str(src))
+        os.utime(str(tmpdir.join("expanded", digest)), (0, ord(digest)))
+
+    assert sorted(os.listdir(str(tmpdir.join("expanded")))) == ["b", "b.size", "c", "c.size"]
+
+    dest = tmpdir.ensure("dest", dir=True)
+    assert cache.restore("b", str(dest))
+    assert dest.join("file").read() == "x" * 10
+    assert not cache.restore("a", str(tmpdir.ensure("other", dir=True)))
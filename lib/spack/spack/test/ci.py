@@ -605,3 +605,35 @@ def test_ci_skipped_report(tmpdir, mock_packages, config):
             elif reason in line:
                 have[1] += 1
         assert all(count == 1 for count in have)
+
+
+@pytest.mark.parametrize("match_behavior", ["first", "merge"])
+def test_submapping_index(match_behavior, mock_packages, config):
+    """Compiled submappings apply the same entries as matching every spec against
+    every entry, in the same order."""
+    section = {
+        "match_behavior": match_behavior,
+        "submapping": [
+            {"match": ["mpi"], "build-job": {"tags": ["virtual"]}},
+            {"match": ["mpich", "callpath"], "build-job": {"tags": ["named"]}},
+            {"match": ["%gcc"], "build-job": {"tags": ["anonymous"]}},
+        ],
+    }
+    submapping = ci._SubmappingIndex(section)
+
+    def expected_tags(spec):
+        tags = []
+        for entry in reversed(section["submapping"]):
+            if any(spec.intersects(m) for m in entry["match"]):
+                tags = entry["build-job"]["tags"] + tags
+                if match_behavior == "first":
+                    break
+        return tags
+
+    for abstract in ("mpich%gcc", "zmpi%clang", "callpath%clang", "libelf%gcc", "a%clang"):
+        spec = spack.spec.Spec(abstract).concretized()
+        assert submapping.apply({}, spec).get("tags", []) == expected_tags(spec)
+
+    mpich = spack.spec.Spec("mpich%gcc").concretized()
+    if match_behavior == "merge":
+        assert submapping.apply({}, mpich)["tags"] == ["virtual", "named", "anonymous"]
@@ -11,6 +11,7 @@
 import llnl.util.tty as tty
 
 import spack.cmd.checksum
+import spack.config
 import spack.repo
 from spack.main import SpackCommand
 
@@ -34,6 +35,15 @@ def test_checksum_args(arguments, expected):
     assert check == expected
 
 
+def test_checksum_jobs_do_not_set_build_jobs():
+    build_jobs = spack.config.get("config:build_jobs")
+    parser = argparse.ArgumentParser()
+    spack.cmd.checksum.setup_parser(parser)
+    args = parser.parse_args(["-j", "16", "patch"])
+    assert args.jobs == 16
+    assert spack.config.get("config:build_jobs") == build_jobs
+
+
 @pytest.mark.skipif(sys.platform == "win32", reason="Not supported on Windows (yet)")
 @pytest.mark.parametrize(
     "arguments,expected",
@@ -3,6 +3,9 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import atexit
+import json
+import multiprocessing
 import os
 import os.path
 import platform
@@ -10,8 +13,11 @@
 
 import pytest
 
+import llnl.util.lock as lk
+
 import spack.config
 import spack.platforms
+import spack.util.lock
 from spack.main import SpackCommand, get_version
 from spack.util.executable import which
 
@@ -62,3 +68,53 @@ def test_report():
     assert platform.python_version() in out
     assert str(architecture) in out
     assert spack.config.get("config:concretizer") in out
+
+
+def test_locks(tmpdir, monkeypatch):
+    profiler = lk.LockProfiler()
+    lock = lk.Lock(str(tmpdir.join("lockfile")), desc="test")
+    monkeypatch.setattr(lk, "_profiler", profiler)
+    lock.acquire_write()
+    lock.release_write()
+
+    profiles = tmpdir.join("profiles")
+    spack.util.lock._write_lock_profile(profiler, str(profiles))
+    assert len(profiles.listdir()) == 1
+
+    out = debug("locks", str(profiles))
+    assert "Locks taken by 1 process" in out
+    assert str(tmpdir.join("lockfile")) in out
+    assert "0 read, 1 write, 0 timed out (1 attempt)" in out
+    assert "(test), 1 time for" in out
+
+    profile = json.loads(debug("locks", "--json", str(profiles)))
+    assert profile["processes"] == 1
+    assert list(profile["locks"]) == [str(tmpdir.join("lockfile"))]
+
+    monkeypatch.delenv("SPACK_LOCK_PROFILE", raising=False)
+    debug("locks", fail_on_error=False)
+    assert debug.returncode == 1
+
+
+@pytest.mark.skipif(sys.platform == "darwin", reason="build processes are not forked")
+def test_lock_profiles_of_build_processes(tmpdir, monkeypatch):
+    """Processes started by multiprocessing, which exit without running atexit
+    handlers, write a profile of the locks they took themselves."""
+    monkeypatch.setattr(lk, "_profiler", None)
+    monkeypatch.setattr(atexit, "register", lambda *args: None)
+    profiles = tmpdir.join("profiles")
+    spack.util.lock.profile_locks(str(profiles))
+
+    def take_lock(name):
+        lock = lk.Lock(str(tmpdir.join(name)))
+        lock.acquire_write()
+        lock.release_write()
+
+    take_lock("parent")
+    process = multiprocessing.Process(target=take_lock, args=("child",))
+    process.start()
+    process.join()
+
+    (path,) = profiles.listdir()
+    assert path.basename.endswith("-{0}.json".format(process.pid))
+    assert list(json.loads(path.read())["locks"]) == [str(tmpdir.join("child"))]
@@ -5,6 +5,7 @@
 import os
 import os.path
 import sys
+import time
 
 import pytest
 
@@ -13,6 +14,7 @@
 import spack
 import spack.detection
 import spack.detection.path
+import spack.util.file_cache
 from spack.main import SpackCommand
 from spack.spec import Spec
 
@@ -85,6 +87,50 @@ def test_find_external_two_instances_same_package(
     )
 
 
+def test_find_external_uses_detection_cache(
+    mock_executable, executables_found, _platform_executables, monkeypatch, tmpdir
+):
+    file_cache = spack.util.file_cache.FileCache(str(tmpdir.join("cache")))
+    monkeypatch.setattr(
+        spack.detection.path,
+        "detection_cache",
+        lambda: spack.detection.path.DetectionCache(file_cache),
+    )
+    pkgs_to_check = [spack.repo.path.get_pkg_class("cmake")]
+    cmake_path = mock_executable("cmake", output="echo cmake version 1.foo")
+    executables_found({cmake_path: define_plat_exe("cmake")})
+
+    def detected_specs():
+        pkg_to_entries = spack.detection.by_executable(pkgs_to_check)
+        return [e.spec for e in pkg_to_entries["cmake"]]
+
+    assert detected_specs() == [Spec("cmake@1.foo")]
+
+    # A second scan uses the cache instead of running cmake
+    with monkeypatch.context() as m:
+        m.setattr(spack.repo.path.get_pkg_class("cmake"), "determine_version", None)
+        assert detected_specs() == [Spec("cmake@1.foo")]
+
+    # Modifying the executable invalidates the cache
+    mock_executable("cmake", output="echo cmake version 3.17.2")
+    assert detected_specs() == [Spec("cmake@3.17.2")]
+
+
+@pytest.mark.skipif(sys.platform in ("darwin", "win32"), reason="detection runs in process")
+def test_find_external_timeout(mock_executable, executables_found, monkeypatch):
+    """Calls exceeding the detection timeout are abandoned, and their workers killed."""
+    monkeypatch.setattr(spack.detection.path, "DETECTION_TIMEOUT", 0.5)
+    pkgs_to_check = [spack.repo.path.get_pkg_class("cmake")]
+    cmake_path = mock_executable("cmake", output="sleep 30; echo cmake version 1.foo")
+    executables_found({cmake_path: "cmake"})
+
+    start = time.time()
+    with pytest.warns(UserWarning, match="timeout"):
+        pkg_to_entries = spack.detection.by_executable(pkgs_to_check)
+    assert not pkg_to_entries
+    assert time.time() - start < 10
+
+
 def test_find_external_update_config(mutable_config):
     entries = [
         spack.detection.DetectedPackage(Spec.from_detection("cmake@1.foo"), "/x/y1/"),
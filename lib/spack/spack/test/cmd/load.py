@@ -8,8 +8,12 @@
 
 import pytest
 
+import spack.build_environment
+import spack.caches
+import spack.config
 import spack.spec
 import spack.user_environment as uenv
+import spack.util.file_cache
 from spack.main import SpackCommand
 
 load = SpackCommand("load")
@@ -111,6 +115,55 @@ def test_load_includes_run_env(install_mockery, mock_fetch, mock_archive, mock_p
     assert "setenv FOOBAR mpileaks" in csh_out
 
 
+def test_load_caches_run_env(
+    install_mockery, mock_fetch, mock_archive, mock_packages, tmpdir, monkeypatch
+):
+    """Tests that the run environment of an installed package is computed once,
+    and computed again when one of the package recipes involved changes"""
+    install("mpileaks")
+
+    cache = spack.util.file_cache.FileCache(str(tmpdir.join("misc_cache")))
+    monkeypatch.setattr(spack.caches, "misc_cache", cache)
+    monkeypatch.setattr(uenv, "_run_environments", {})
+
+    computed = []
+    compute = spack.build_environment.modifications_from_dependencies
+
+    def counting_compute(spec, *args, **kwargs):
+        computed.append(spec.name)
+        return compute(spec, *args, **kwargs)
+
+    monkeypatch.setattr(
+        spack.build_environment, "modifications_from_dependencies", counting_compute
+    )
+
+    sh_out = load("--sh", "--only", "package", "mpileaks")
+    assert "export FOOBAR=mpileaks" in sh_out
+    assert computed == ["mpileaks"]
+
+    # The second time the environment comes from memory, then from the misc cache
+    assert load("--sh", "--only", "package", "mpileaks") == sh_out
+    monkeypatch.setattr(uenv, "_run_environments", {})
+    assert load("--sh", "--only", "package", "mpileaks") == sh_out
+    assert computed == ["mpileaks"]
+
+    monkeypatch.setattr(uenv, "_recipe_stamp", lambda fullname: [0, 0])
+    assert load("--sh", "--only", "package", "mpileaks") == sh_out
+    assert computed == ["mpileaks", "mpileaks"]
+
+    # Configuration read by package recipes also invalidates the cache
+    with spack.config.override("packages:mpileaks", {"buildable": True}):
+        assert load("--sh", "--only", "package", "mpileaks") == sh_out
+    assert computed == ["mpileaks", "mpileaks", "mpileaks"]
+
+    # Entries that cannot be decoded are computed again
+    for entry in uenv._run_environments.values():
+        for stamp in entry:
+            entry[stamp] = [{"kind": "SetEnv"}]
+    assert load("--sh", "--only", "package", "mpileaks") == sh_out
+    assert computed == ["mpileaks"] * 4
+
+
 def test_load_first(install_mockery, mock_fetch, mock_archive, mock_packages):
     """Test with and without the --first option"""
     install("libelf@0.8.12")
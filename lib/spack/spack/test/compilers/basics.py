@@ -11,11 +11,15 @@
 import pytest
 
 import llnl.util.filesystem as fs
+import llnl.util.lock
 
 import spack.compiler
 import spack.compilers as compilers
 import spack.spec
 import spack.util.environment
+import spack.util.file_cache
+import spack.util.module_cmd
+import spack.version
 from spack.compiler import Compiler
 from spack.util.executable import ProcessError
 
@@ -741,6 +745,82 @@ def module(*args):
     assert version == test_version
 
 
+@pytest.mark.skipif(sys.platform == "win32", reason="Not supported on Windows (yet)")
+def test_compiler_cache(working_env, monkeypatch, tmpdir):
+    gcc = str(tmpdir.join("gcc"))
+    with open(gcc, "w") as f:
+        f.write(
+            """#!/bin/bash
+echo "4.4.4"
+"""
+        )
+    fs.set_executable(gcc)
+
+    compiler_info = {
+        "spec": "gcc@foo",
+        "paths": {"cc": gcc, "cxx": None, "f77": None, "fc": None},
+        "flags": {},
+        "operating_system": "fake",
+        "target": "fake",
+        "modules": [],
+        "environment": {},
+        "extra_rpaths": [],
+    }
+    file_cache = spack.util.file_cache.FileCache(str(tmpdir.join("cache")))
+    monkeypatch.setattr(spack.compiler, "compiler_cache", spack.compiler.CompilerCache(file_cache))
+
+    calls = []
+
+    def _get_real_version(self):
+        calls.append(self)
+        return "4.4.4"
+
+    monkeypatch.setattr(spack.compiler.Compiler, "get_real_version", _get_real_version)
+
+    def real_version():
+        compiler = spack.compilers.compiler_from_dict(compiler_info)
+        return compiler.real_version
+
+    # The compiler is run only once, even by distinct compiler objects
+    assert real_version() == spack.version.Version("4.4.4")
+    assert real_version() == spack.version.Version("4.4.4")
+    assert len(calls) == 1
+
+    # Changing the executable invalidates the cache
+    with open(gcc, "a") as f:
+        f.write("# modified\n")
+    assert real_version() == spack.version.Version("4.4.4")
+    assert len(calls) == 2
+
+    # So do modules
+    compiler_info["modules"] = ["turn_on"]
+    monkeypatch.setattr(spack.util.module_cmd, "module", lambda *args: "")
+    assert real_version() == spack.version.Version("4.4.4")
+    assert len(calls) == 3
+
+    # Unknown versions are not cached
+    def _get_unknown_version(self):
+        calls.append(self)
+        return "unknown"
+
+    monkeypatch.setattr(spack.compiler.Compiler, "get_real_version", _get_unknown_version)
+    compiler_info["modules"] = []
+    with open(gcc, "a") as f:
+        f.write("# modified again\n")
+    assert real_version() == spack.version.Version("foo")
+    assert real_version() == spack.version.Version("foo")
+    assert len(calls) == 5
+
+    # Errors locking the cache are not fatal
+    def _lock_error(*args, **kwargs):
+        raise llnl.util.lock.LockError("cannot lock")
+
+    monkeypatch.setattr(file_cache, "read_transaction", _lock_error)
+    monkeypatch.setattr(file_cache, "write_transaction", _lock_error)
+    monkeypatch.setattr(spack.compiler.Compiler, "get_real_version", _get_real_version)
+    assert real_version() == spack.version.Version("4.4.4")
+
+
 def test_compiler_get_real_version_fails(working_env, monkeypatch, tmpdir):
     # Test variables
     test_version = "2.2.2"
@@ -6,6 +6,7 @@
 import collections
 import getpass
 import io
+import json
 import os
 import sys
 import tempfile
@@ -1416,3 +1417,80 @@ def test_config_file_read_invalid_yaml(tmpdir, mutable_empty_config):
 
     with pytest.raises(spack.config.ConfigFileError, match="parsing YAML"):
         spack.config.read_config_file(filename)
+
+
+def test_config_file_snapshot(tmpdir, monkeypatch, mock_misc_cache):
+    """Test that parsed and validated files are snapshotted, and that snapshots
+    are discarded when the file changes."""
+    filename = str(tmpdir.join("config.yaml"))
+    with open(filename, "w") as f:
+        f.write("config::\n  build_jobs: 4\n  build_stage:: [/tmp]\n")
+    os.utime(filename, (0, 0))
+
+    schema = spack.schema.config.schema
+    expected = spack.config.read_config_file(filename, schema)
+    snapshot = spack.config._ConfigSnapshot(filename, schema)
+    assert snapshot.path.startswith(mock_misc_cache.root)
+    with open(snapshot.path) as f:
+        assert json.load(f)["key"] == snapshot.key
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a snapshot should have been used")
+
+    with monkeypatch.context() as m:
+        m.setattr(syaml, "load_config", fail)
+        data = spack.config.read_config_file(filename, schema)
+    assert data == expected
+    assert spack.config._from_snapshot(data)
+    key = next(iter(data))
+    assert spack.config._override(key)
+    assert [k for k in data[key] if spack.config._override(k)] == ["build_stage"]
+    assert data[key]["build_stage"]._start_mark.name == filename
+    assert data[key]["build_stage"]._start_mark.line == 2
+
+    with open(filename, "w") as f:
+        f.write("config::\n  build_jobs: 8\n")
+    os.utime(filename, (0, 0))
+    assert spack.config.read_config_file(filename, schema)["config"]["build_jobs"] == 8
+
+
+def test_config_snapshot_keeps_comments_on_write(tmpdir, mutable_empty_config):
+    """Test that writing a scope read from a snapshot keeps the comments of its file."""
+    scope = spack.config.ConfigScope("snapshot", str(tmpdir))
+    mutable_empty_config.push_scope(scope)
+    with open(scope.get_section_filename("config"), "w") as f:
+        f.write("config:\n  # number of jobs\n  build_jobs: 4\n  verify_ssl: true\n")
+    os.utime(scope.get_section_filename("config"), (0, 0))
+
+    # Take the snapshot, and read the scope from it
+    spack.config.read_config_file(scope.get_section_filename("config"), spack.schema.config.schema)
+    assert spack.config._from_snapshot(scope.get_section("config"))
+
+    mutable_empty_config.set("config:verify_ssl", False, scope="snapshot")
+    with open(scope.get_section_filename("config")) as f:
+        content = f.read()
+    assert "# number of jobs" in content
+    assert "verify_ssl: false" in content
+
+
+def test_overrides_reuse_merged_layers(mock_low_high_config, write_config_file, monkeypatch):
+    write_config_file("config", config_low, "low")
+    write_config_file("config", config_merge_list, "high")
+    cfg = spack.config.config
+    before = cfg.get_config("config")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("scopes below the override should not be merged again")
+
+    low, high = cfg.scopes["low"], cfg.scopes["high"]
+    with monkeypatch.context() as m:
+        m.setattr(low, "get_section", fail)
+        m.setattr(high, "get_section", fail)
+        with spack.config.override("config:build_jobs", 3):
+            assert cfg.get("config:build_jobs") == 3
+            assert cfg.get("config:build_stage") == before["build_stage"]
+        assert cfg.get_config("config") == before
+
+    # Writing to a scope invalidates the layers that include it
+    cfg.set("config:build_stage", ["pathx"], scope="low")
+    assert cfg.get("config:build_stage") == ["patha", "pathb", "pathx"]
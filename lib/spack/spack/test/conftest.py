@@ -31,9 +31,11 @@
 
 import spack.binary_distribution
 import spack.caches
+import spack.compiler
 import spack.compilers
 import spack.config
 import spack.database
+import spack.detection.path
 import spack.directory_layout
 import spack.environment as ev
 import spack.package_base
@@ -45,7 +47,9 @@
 import spack.store
 import spack.subprocess_context
 import spack.test.cray_manifest
+import spack.user_environment
 import spack.util.executable
+import spack.util.file_cache
 import spack.util.git
 import spack.util.gpg
 import spack.util.spack_yaml as syaml
@@ -486,6 +490,30 @@ def mock_fetch_cache(monkeypatch):
     monkeypatch.setattr(spack.caches, "fetch_cache", MockCache())
 
 
+@pytest.fixture(scope="session", autouse=True)
+def mock_misc_cache(tmpdir_factory):
+    """Substitutes spack.caches.misc_cache with a cache in a temporary directory,
+    so that tests don't write to the misc cache of the user.
+    """
+    original = spack.caches.misc_cache
+    path = tmpdir_factory.mktemp("misc_cache")
+    spack.caches.misc_cache = spack.util.file_cache.FileCache(str(path))
+    yield spack.caches.misc_cache
+    spack.caches.misc_cache = original
+
+
+@pytest.fixture(autouse=True)
+def clean_environment_caches(mock_misc_cache, monkeypatch):
+    """Starts each test with no cached run environment or sourced file
+    modifications, since they are computed from packages, configuration and
+    files that differ between tests.
+    """
+    monkeypatch.setattr(spack.user_environment, "_run_environments", {})
+    yield
+    for entries in ("run_environments", "sourced_files"):
+        shutil.rmtree(os.path.join(mock_misc_cache.root, entries), ignore_errors=True)
+
+
 @pytest.fixture()
 def mock_binary_index(monkeypatch, tmpdir_factory):
     """Changes the directory for the binary index and creates binary index for
@@ -949,6 +977,38 @@ def disable_compiler_execution(monkeypatch, request):
         )
 
 
+class MockCompilerCache(object):
+    def value(self, compiler, name, compute, cache_if=None):
+        return compute()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def mock_compiler_cache(monkeypatch):
+    """Substitutes spack.compiler.compiler_cache with a mock object that never
+    caches, so that the output of compilers doesn't leak across tests.
+    """
+    monkeypatch.setattr(spack.compiler, "compiler_cache", MockCompilerCache())
+
+
+class MockDetectionCache(object):
+    def get(self, pkg, prefix, objs):
+        return None
+
+    def put(self, pkg, prefix, objs, specs):
+        pass
+
+    def save(self):
+        pass
+
+
+@pytest.fixture(scope="function", autouse=True)
+def mock_detection_cache(monkeypatch):
+    """Substitutes the cache of detected externals with a mock object that never
+    caches, so that detected specs don't leak across tests.
+    """
+    monkeypatch.setattr(spack.detection.path, "detection_cache", MockDetectionCache)
+
+
 @pytest.fixture(scope="function")
 def install_mockery(temporary_store, config, mock_packages):
     """Hooks a fake install directory, DB, and stage directory into Spack."""
@@ -0,0 +1,106 @@
+# Copyright 2013-2023 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import os
+import shutil
+import socket
+import sys
+import tempfile
+
+import pytest
+
+import spack
+import spack.daemon
+import spack.paths
+from spack.main import SpackCommand
+
+daemon_cmd = SpackCommand("daemon")
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32" or not spack.daemon.supported(), reason="needs unix sockets and fork"
+)
+
+
+@pytest.fixture()
+def socket_path():
+    # Unix socket paths are limited to about a hundred characters, so avoid tmpdir
+    directory = tempfile.mkdtemp(prefix="spack-daemon-")
+    yield os.path.join(directory, "daemon.sock")
+    shutil.rmtree(directory)
+
+
+@pytest.fixture()
+def running_daemon(socket_path, mock_packages, config):
+    """A daemon serving requests from a fork of the test process."""
+    daemon = spack.daemon.Daemon(socket_path)
+    daemon.listen()
+    daemon._fingerprint = daemon.fingerprint()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            daemon.serve_forever()
+        finally:
+            os._exit(0)
+    daemon._listener.close()
+
+    yield daemon
+
+    spack.daemon.control(socket_path, "stop")
+    os.waitpid(pid, 0)
+
+
+def test_messages_carry_file_descriptors():
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    read_end, write_end = os.pipe()
+    with left, right:
+        spack.daemon._send(left, {"argv": ["find"]}, fds=[write_end])
+        payload, fds = spack.daemon._recv(right)
+        assert payload == {"argv": ["find"]}
+        assert len(fds) == 1
+
+        os.write(fds[0], b"hello")
+        assert os.read(read_end, 5) == b"hello"
+
+        left.close()
+        assert spack.daemon._recv(right) == (None, [])
+
+    for fd in fds + [read_end, write_end]:
+        os.close(fd)
+
+
+def test_clients_run_commands_themselves_without_daemon(socket_path):
+    assert spack.daemon.forward(["--version"], socket_path, spack.paths.prefix) is None
+    assert spack.daemon.control(socket_path, "status") is None
+
+    daemon_cmd("status", "--socket", socket_path, fail_on_error=False)
+    assert daemon_cmd.returncode == 1
+
+
+def test_daemon_runs_forwarded_commands(running_daemon, capfd):
+    socket_path = running_daemon.socket_path
+    assert spack.daemon.forward(["--version"], socket_path, spack.paths.prefix) == 0
+    assert spack.daemon.forward(["no-such-command"], socket_path, spack.paths.prefix) == 1
+
+    out, err = capfd.readouterr()
+    assert spack.spack_version in out
+    assert "no-such-command is not a recognized Spack command" in err
+
+    status = spack.daemon.control(socket_path, "status")
+    assert status["served"] == 2
+
+
+def test_daemon_declines_incompatible_clients(running_daemon, monkeypatch):
+    socket_path = running_daemon.socket_path
+    assert spack.daemon.forward(["--version"], socket_path, "/some/other/spack") is None
+
+    monkeypatch.setenv("SPACK_USER_CONFIG_PATH", "/some/other/config")
+    assert spack.daemon.forward(["--version"], socket_path, spack.paths.prefix) is None
+
+    assert spack.daemon.control(socket_path, "status")["served"] == 0
+
+
+def test_daemon_refuses_a_busy_socket(running_daemon):
+    with pytest.raises(spack.daemon.DaemonError, match="already listening"):
+        spack.daemon.Daemon(running_daemon.socket_path).listen()
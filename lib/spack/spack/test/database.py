@@ -32,6 +32,7 @@
 import spack.store
 import spack.version as vn
 from spack.schema.database_index import schema
+from spack.util.crypto import bit_length
 from spack.util.executable import Executable
 
 pytestmark = pytest.mark.db
@@ -893,6 +894,52 @@ def _is(db, spec):
     assert spack.store.db.prefix_failed(s)
 
 
+@pytest.mark.parametrize("shards", [1, 4])
+def test_prefix_locks_are_sharded(
+    default_mock_concretization, mutable_config, monkeypatch, tmpdir, shards
+):
+    """Prefix and failure locks are spread over config:prefix_lock_shards files."""
+    mutable_config.set("config:prefix_lock_shards", shards)
+    db = spack.database.Database(str(tmpdir))
+    monkeypatch.setattr(db, "_prefix_locks", {})
+    monkeypatch.setattr(db, "_prefix_failures", {})
+
+    paths = set()
+    for name in ("a", "b", "c", "libelf", "libdwarf", "mpileaks", "callpath", "zmpi"):
+        s = default_mock_concretization(name)
+        lock = db.prefix_lock(s)
+        assert lock.path.startswith(db.prefix_lock_path)
+        assert lock._start == s.dag_hash_bit_prefix(bit_length(sys.maxsize))
+        paths.add(lock.path)
+
+        # the failure lock of a spec uses the same shard as its prefix lock
+        mark = db.mark_failed(s)
+        assert mark.path == lock.path.replace(db.prefix_lock_path, db.prefix_fail_path)
+        assert db.prefix_failed(s)
+        db.clear_failure(s, force=True)
+
+    if shards == 1:
+        assert paths == {db.prefix_lock_path}
+    else:
+        expected = {"{0}.{1}".format(db.prefix_lock_path, i) for i in range(shards)}
+        assert len(paths) > 1 and paths <= expected
+
+
+def test_prefix_lock_shards_are_recorded(mutable_config, tmpdir, capfd):
+    """Processes with a different config:prefix_lock_shards use the number of
+    lock files recorded by the first one."""
+    mutable_config.set("config:prefix_lock_shards", 4)
+    assert spack.database.Database(str(tmpdir)).prefix_lock_shards == 4
+    assert "prefix_lock_shards" not in capfd.readouterr()[1]
+
+    mutable_config.set("config:prefix_lock_shards", 2)
+    db = spack.database.Database(str(tmpdir))
+    assert db.prefix_lock_shards == 4
+    assert "uses 4 prefix lock files" in capfd.readouterr()[1]
+    with open(db._prefix_lock_shards_path) as f:
+        assert f.read() == "4"
+
+
 def test_prefix_read_lock_error(default_mock_concretization, mutable_database, monkeypatch):
     """Cover the prefix read lock exception."""
 
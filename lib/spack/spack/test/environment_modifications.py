@@ -3,12 +3,16 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import inspect
 import os
+import shutil
 import sys
 
 import pytest
 
+import spack.caches
 import spack.util.environment as environment
+import spack.util.file_cache
 from spack.paths import spack_root
 from spack.util.environment import (
     AppendPath,
@@ -489,3 +493,75 @@ def test_exclude_lmod_variables():
     # Check that variables related to lmod are not in there
     modifications = env.group_by_name()
     assert not any(x.startswith("LMOD_") for x in modifications)
+
+
+def test_traces_point_to_the_caller(monkeypatch):
+    """Tests that traces record where a modification was requested, without inspecting
+    the whole stack, and read the source line only when asked for it.
+    """
+
+    def fail(*args, **kwargs):
+        raise AssertionError("tracing must not inspect the whole stack")
+
+    monkeypatch.setattr(inspect, "stack", fail)
+    env = EnvironmentModifications(traced=True)
+    lineno = sys._getframe().f_lineno + 1
+    env.set("FOO", "foo")
+    env.prepend_path("PATH", "/foo/bin")
+
+    set_trace, prepend_trace = (item.trace for item in env)
+    assert set_trace.filename == __file__
+    assert set_trace.lineno == lineno
+    assert prepend_trace.lineno == lineno + 1
+    assert set_trace._context is None
+    assert set_trace.context.startswith('env.set("FOO", "foo")')
+    assert str(prepend_trace) == f'env.prepend_path("PATH", "/foo/bin") at {__file__}:{lineno + 1}'
+
+    assert EnvironmentModifications(traced=False)._trace() is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Not supported on Windows (yet)")
+def test_sourcing_files_is_cached(tmpdir, monkeypatch, working_env):
+    """Tests that the modifications of a sourced file are reused until the file, its
+    arguments or the environment it is sourced from change.
+    """
+    cache = spack.util.file_cache.FileCache(str(tmpdir.join("misc_cache")))
+    monkeypatch.setattr(spack.caches, "misc_cache", cache)
+
+    script = tmpdir.join("sourceme.sh")
+    shutil.copy(os.path.join(datadir, "sourceme_parameters.sh"), str(script))
+
+    sourced = []
+    after_sourcing = environment.environment_after_sourcing_files
+
+    def counting_after_sourcing(*files, **kwargs):
+        sourced.append(files)
+        return after_sourcing(*files, **kwargs)
+
+    monkeypatch.setattr(environment, "environment_after_sourcing_files", counting_after_sourcing)
+
+    def modifications(*args):
+        env = EnvironmentModifications.from_sourcing_file(str(script), *args)
+        return env.to_dicts()
+
+    first = modifications("intel64")
+    assert len(sourced) == 2
+    assert {"kind": "SetEnv", "name": "FOO", "value": "intel64"}.items() <= first[0].items()
+
+    assert modifications("intel64") == first
+    assert len(sourced) == 2
+
+    # Different arguments, environment or file contents are sourced again
+    assert modifications("ia32") != first
+    assert len(sourced) == 4
+
+    os.environ["SPACK_TEST_SOURCING_CACHE"] = "1"
+    assert modifications("intel64") == first
+    assert len(sourced) == 6
+
+    os.utime(str(script), (0, 0))
+    assert modifications("intel64") == first
+    assert len(sourced) == 8
+
+    EnvironmentModifications.from_sourcing_file(str(script), "intel64", cache=False)
+    assert len(sourced) == 10
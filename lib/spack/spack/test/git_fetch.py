@@ -212,6 +212,47 @@ def test_debug_fetch(
             assert os.path.isdir(s.package.stage.source_path)
 
 
+@pytest.mark.parametrize("type_of_test", ["default", "branch", "tag", "commit"])
+def test_fetch_from_repo_cache(
+    type_of_test, mock_git_repository, override_git_repos_cache_path, tmpdir, monkeypatch
+):
+    """Fetches share the objects of a bare repository caching the remote"""
+    t = mock_git_repository.checks[type_of_test]
+    h = mock_git_repository.hash
+    monkeypatch.setattr(GitFetchStrategy, "_updated_repo_caches", set())
+
+    for name in ("first", "second"):
+        fetcher = GitFetchStrategy(**t.args)
+        with spack.config.override("config:git_repo_cache", True):
+            with Stage(fetcher, path=str(tmpdir.join(name))) as stage:
+                fetcher.fetch()
+                with working_dir(stage.source_path):
+                    assert h("HEAD") == h(t.revision)
+                    assert os.path.isfile(t.file)
+                    assert os.path.isfile(os.path.join(".git", "objects", "info", "alternates"))
+                    remote = fetcher.git("remote", "get-url", "origin", output=str)
+                    assert remote.strip() == mock_git_repository.url
+
+    assert GitFetchStrategy._updated_repo_caches == {fetcher.repo_cache_path}
+    assert os.path.isfile(os.path.join(fetcher.repo_cache_path, "HEAD"))
+
+
+def test_steal_source_does_not_share_repo_cache(
+    mock_git_repository, override_git_repos_cache_path, tmpdir, monkeypatch
+):
+    """Sources copied out of the stage, e.g. by spack develop, are standalone
+    clones even with config:git_repo_cache"""
+    monkeypatch.setattr(GitFetchStrategy, "_updated_repo_caches", set())
+    fetcher = GitFetchStrategy(**mock_git_repository.checks["default"].args)
+    dest = str(tmpdir.join("dev"))
+
+    with spack.config.override("config:git_repo_cache", True):
+        Stage(fetcher, path=str(tmpdir.join("stage"))).steal_source(dest)
+
+    assert os.path.isdir(os.path.join(dest, ".git"))
+    assert not os.path.exists(os.path.join(dest, ".git", "objects", "info", "alternates"))
+
+
 def test_git_extra_fetch(git, tmpdir):
     """Ensure a fetch after 'expanding' is effectively a no-op."""
     testpath = str(tmpdir)
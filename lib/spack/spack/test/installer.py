@@ -450,6 +450,29 @@ def _pl(db, spec, timeout):
     assert "Expected prefix lock timeout" in out
 
 
+def test_ensure_locked_records_wait(install_mockery, monkeypatch, tmpdir):
+    acquire_read = ulk.Lock.acquire_read
+
+    def _acquire_read(lock, timeout=None):
+        lock.wait_time += 2.5
+        return acquire_read(lock, timeout)
+
+    const_arg = installer_args(["a"], {})
+    installer = create_installer(const_arg)
+    pkg = installer.build_requests[0].pkg
+    pkg_id = inst.package_id(pkg)
+
+    monkeypatch.setattr(ulk.Lock, "acquire_read", _acquire_read)
+    with tmpdir.as_cwd():
+        installer._ensure_locked("read", pkg)
+    assert installer.lock_waits[pkg_id] == 2.5
+
+    # the wait is reported with the build phases
+    build_installer = inst.BuildProcessInstaller(pkg, {"lock_wait": 2.5})
+    assert build_installer.timer.phases == ["lock-wait"]
+    assert build_installer.timer.duration("lock-wait") == pytest.approx(2.5)
+
+
 def test_package_id_err(install_mockery):
     s = spack.spec.Spec("trivial-install-test-package")
     pkg_cls = spack.repo.path.get_pkg_class(s.name)
@@ -848,6 +848,31 @@ def test_visit_directory_tree_follow_none(noncyclical_dir_structure):
     assert not visitor.symlinked_dirs_after
 
 
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires symlinks")
+@pytest.mark.parametrize("follow_symlink_dirs", [True, False])
+def test_visit_directory_tree_prefetched(noncyclical_dir_structure, follow_symlink_dirs):
+    """Visiting with prefetched listings should call the visitor in the same order"""
+    root = str(noncyclical_dir_structure)
+    expected = RegisterVisitor(root, follow_symlink_dirs=follow_symlink_dirs)
+    fs.visit_directory_tree(root, expected)
+
+    listings = fs.prefetch_directory_trees([root, root], max_workers=4)
+    j = os.path.join
+    # Symlinked directories are not followed when prefetching
+    assert set(listings) == {root, j(root, "a"), j(root, "a", "d"), j(root, "c")}
+
+    visitor = RegisterVisitor(root, follow_symlink_dirs=follow_symlink_dirs)
+    fs.visit_directory_tree(root, visitor, listings=listings)
+    assert visitor.__dict__ == expected.__dict__
+
+
+def test_prefetch_directory_trees_skips_missing_dirs(tmpdir):
+    missing = str(tmpdir.join("missing"))
+    assert fs.prefetch_directory_trees([missing]) == {}
+    with pytest.raises(OSError):
+        fs.visit_directory_tree(missing, fs.BaseDirectoryVisitor(), listings={})
+
+
 @pytest.mark.regression("29687")
 @pytest.mark.parametrize("initial_mode", [stat.S_IRUSR | stat.S_IXUSR, stat.S_IWGRP])
 @pytest.mark.skipif(sys.platform == "win32", reason="Windows might change permissions")
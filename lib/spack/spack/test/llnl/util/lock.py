@@ -48,10 +48,12 @@
 import glob
 import os
 import shutil
+import signal
 import socket
 import stat
 import sys
 import tempfile
+import time
 import traceback
 from contextlib import contextmanager
 from multiprocessing import Process, Queue
@@ -587,6 +589,103 @@ def test_write_lock_timeout_with_multiple_readers_3_2_ranges(lock_path):
     )
 
 
+class ReleaseWrite(object):
+    def __init__(self, lock_path, start=0, length=0):
+        self.lock_path = lock_path
+        self.start = start
+        self.length = length
+
+    @property
+    def __name__(self):
+        return self.__class__.__name__
+
+    def __call__(self, barrier):
+        lock = lk.Lock(self.lock_path, self.start, self.length)
+        lock.acquire_write()
+        barrier.wait()
+        time.sleep(2 * lock_fail_timeout)  # let the other process wait for the lock
+        lock.release_write()
+        barrier.wait()
+
+
+class BlockingWrite(object):
+    def __init__(self, lock_path, start=0, length=0):
+        self.lock_path = lock_path
+        self.start = start
+        self.length = length
+
+    @property
+    def __name__(self):
+        return self.__class__.__name__
+
+    def __call__(self, barrier):
+        lock = lk.Lock(self.lock_path, self.start, self.length)
+        barrier.wait()  # wait for lock acquire in first process
+        assert lock._can_block(barrier_timeout)
+
+        wait_time, nattempts = lock._lock(lk.LockType.WRITE, barrier_timeout)
+        assert nattempts == 2  # one nonblocking and one blocking request
+        assert wait_time >= lock_fail_timeout
+        assert lock.wait_time == wait_time
+
+        # the interval timer is cleaned up after the wait
+        assert signal.getsignal(signal.SIGALRM) == signal.SIG_DFL
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        barrier.wait()
+
+
+class BlockingTimeoutWrite(object):
+    def __init__(self, lock_path, start=0, length=0):
+        self.lock_path = lock_path
+        self.start = start
+        self.length = length
+
+    @property
+    def __name__(self):
+        return self.__class__.__name__
+
+    def __call__(self, barrier):
+        lock = lk.Lock(self.lock_path, self.start, self.length)
+        barrier.wait()  # wait for lock acquire in first process
+        with pytest.raises(lk.LockTimeoutError):
+            lock.acquire_write(lock_fail_timeout)
+        assert lock.wait_time >= lock_fail_timeout
+
+        # the interval timer is cleaned up after the timeout
+        assert signal.getsignal(signal.SIGALRM) == signal.SIG_DFL
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        barrier.wait()
+
+
+def test_write_lock_blocks_until_released(lock_path):
+    multiproc_test(ReleaseWrite(lock_path), BlockingWrite(lock_path))
+
+
+def test_write_lock_blocks_until_released_ranges(lock_path):
+    multiproc_test(ReleaseWrite(lock_path, 0, 1), BlockingWrite(lock_path, 0, 1))
+
+
+def test_blocking_write_lock_timeout(lock_path):
+    multiproc_test(AcquireWrite(lock_path), BlockingTimeoutWrite(lock_path))
+
+
+def test_lock_polls_when_it_cannot_block(lock_path, monkeypatch):
+    lock = lk.Lock(lock_path)
+    assert lock._can_block(None)
+    assert lock._can_block(1)
+
+    # timeouts too short for an interval timer
+    assert not lock._can_block(1e-9)
+
+    # SIGALRM is taken by someone else
+    monkeypatch.setattr(signal, "getsignal", lambda signum: lambda *args: None)
+    assert not lock._can_block(1)
+    assert lock._can_block(None)
+
+    lock = lk.Lock(lock_path, blocking=False)
+    assert not lock._can_block(None)
+
+
 @pytest.mark.skipif(getuid() == 0, reason="user is root")
 def test_read_lock_on_read_only_lockfile(lock_dir, lock_path):
     """read-only directory, read-only lockfile."""
@@ -1377,3 +1476,99 @@ def test_upgrade_read_fails(tmpdir):
         with pytest.raises(lk.LockUpgradeError, match=msg):
             lock.upgrade_read_to_write()
         lock.release_write()
+
+
+def test_lock_profiler(tmpdir, monkeypatch):
+    profiler = lk.LockProfiler()
+    monkeypatch.setattr(lk, "_profiler", profiler)
+
+    with tmpdir.as_cwd():
+        lock = lk.Lock("lockfile", desc="test")
+        lock.acquire_read()
+        lock.acquire_read()  # nested locks are not acquired again
+        lock.release_read()
+        lock.release_read()
+
+        lock.acquire_write()
+        lock.downgrade_write_to_read()
+        lock.release_read()
+
+    stats = profiler.locks[lock.path]
+    assert stats["acquired"] == {"read": 2, "write": 1}
+    assert stats["timeouts"] == 0
+    assert stats["attempts"] == 3
+    assert sum(stats["wait"]["histogram"]) == 3
+
+    # a downgrade keeps holding the lock
+    holder = "{0}:{1} (test)".format(socket.gethostname(), os.getpid())
+    assert list(stats["holders"]) == [holder]
+    assert stats["holders"][holder]["count"] == 2
+    assert stats["hold"]["total"] == pytest.approx(stats["holders"][holder]["time"])
+
+
+def test_lock_profiler_records_timeouts(tmpdir, monkeypatch):
+    profiler = lk.enable_profiling()
+    try:
+        with tmpdir.as_cwd():
+            lock = lk.Lock("lockfile", blocking=False)
+            monkeypatch.setattr(lock, "_poll_lock", lambda op: False)
+            with pytest.raises(lk.LockTimeoutError):
+                lock.acquire_write(lock_fail_timeout)
+    finally:
+        assert lk.disable_profiling() is profiler
+
+    stats = profiler.locks[lock.path]
+    assert stats["acquired"] == {"read": 0, "write": 0}
+    assert stats["timeouts"] == 1
+    assert stats["attempts"] > 1
+    assert stats["wait"]["max"] >= lock_fail_timeout
+    assert not stats["holders"]
+
+
+def test_lock_profiler_holder_without_description(tmpdir):
+    profiler = lk.enable_profiling()
+    try:
+        with tmpdir.as_cwd():
+            lock = lk.Lock("lockfile")
+            lock.acquire_read()
+            lock.release_read()
+    finally:
+        assert lk.disable_profiling() is profiler
+
+    holder = "{0}:{1}".format(socket.gethostname(), os.getpid())
+    assert list(profiler.locks[lock.path]["holders"]) == [holder]
+
+
+def test_merge_lock_profiles():
+    def profile(wait, hold, holder):
+        return {
+            "host": "host",
+            "pid": 1,
+            "buckets": list(lk.LockProfiler.buckets),
+            "locks": {
+                "lockfile": {
+                    "acquired": {"read": 1, "write": 1},
+                    "timeouts": 1,
+                    "attempts": 5,
+                    "wait": {"total": wait, "max": wait, "histogram": [1, 0, 0, 1, 0, 0, 0]},
+                    "hold": {"total": hold, "max": hold},
+                    "holders": {holder: {"count": 2, "time": hold}},
+                }
+            },
+        }
+
+    merged = lk.LockProfiler.merge([profile(0.5, 1.0, "a"), profile(1.5, 2.0, "a")])
+    assert merged["processes"] == 2
+
+    stats = merged["locks"]["lockfile"]
+    assert stats["acquired"] == {"read": 2, "write": 2}
+    assert stats["timeouts"] == 2
+    assert stats["attempts"] == 10
+    assert stats["wait"] == {"total": 2.0, "max": 1.5, "histogram": [2, 0, 0, 2, 0, 0, 0]}
+    assert stats["hold"] == {"total": 3.0, "max": 2.0}
+    assert stats["holders"] == {"a": {"count": 4, "time": 3.0}}
+
+    mismatched = profile(0.5, 1.0, "a")
+    mismatched["buckets"] = [1.0]
+    with pytest.raises(ValueError, match="different wait buckets"):
+        lk.LockProfiler.merge([mismatched])
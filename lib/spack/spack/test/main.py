@@ -98,3 +98,25 @@ def test_get_version_bad_git(tmpdir, working_env, monkeypatch):
 
     monkeypatch.setattr(spack.util.git, "git", lambda: exe.which(bad_git))
     assert spack.spack_version == get_version()
+
+
+@pytest.mark.parametrize("command", [["-V"], ["arch"]])
+def test_profile_imports(command, capfd, monkeypatch):
+    """Import times are profiled on a fresh interpreter, where printing the version
+    or running a command outside of an environment must not load the environment
+    or concretizer machinery."""
+    monkeypatch.delenv("SPACK_ENV", raising=False)
+    assert main(["--profile-imports", "--lines", "all"] + command) == 0
+    out, _ = capfd.readouterr()
+    if command == ["-V"]:
+        assert spack.spack_version in out
+
+    modules = set(line.split()[-1] for line in out.splitlines() if line.startswith("    "))
+    assert "spack.main" in modules
+    assert not {"spack.environment", "spack.solver.asp", "spack.modules"} & modules
+
+
+def test_import_budget(capfd):
+    assert main(["--profile-imports", "--import-budget", "1e-6", "-V"]) == 1
+    _, err = capfd.readouterr()
+    assert "more than the budget" in err
@@ -82,6 +82,24 @@ def test_modules_default_symlink(
     assert not os.path.lexists(link_path)
 
 
+def test_unchanged_module_files_are_not_rewritten(mock_module_filename, mock_packages, config):
+    spec = spack.spec.Spec("mpileaks").concretized()
+    generator = spack.modules.tcl.TclModulefileWriter(spec, "default")
+
+    assert not spack.modules.common.write_module_files([generator], overwrite=True)
+    assert os.path.exists(mock_module_filename)
+
+    os.utime(mock_module_filename, (0, 0))
+    assert generator._write_module_file(overwrite=True) is False
+    assert os.stat(mock_module_filename).st_mtime == 0
+
+    with open(mock_module_filename, "w") as f:
+        f.write("stale content")
+    assert generator._write_module_file(overwrite=True) is True
+    with open(mock_module_filename) as f:
+        assert "mpileaks" in f.read()
+
+
 class MockDb(object):
     def __init__(self, db_ids, spec_hash_to_db):
         self.upstream_dbs = db_ids
@@ -9,6 +9,7 @@
 
 import pytest
 
+import spack.parser
 import spack.platforms.test
 import spack.spec
 import spack.variant
@@ -1131,3 +1132,68 @@ def test_git_ref_spec_equivalences(mock_packages, lhs_str, rhs_str, expected):
 def test_platform_is_none_if_not_present(spec_str):
     s = SpecParser(spec_str).next_spec()
     assert s.architecture.platform is None, s
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "zlib",
+        "builtin.zlib",
+        "openmpi@4.1: +cuda ~java %gcc@12",
+        "hdf5@1.10.2:1.10,1.12.1 -mpi --hl ++shared ~~fortran",
+        "mvapich2 %intel@:19.0.5.281 ~ debug",
+        "py-numpy@1.20:1.24 +blas ^openblas threads=openmp",
+        "libelf %gcc@4.4.7 os=redhat6 target=x86_64",
+    ],
+)
+def test_tokenize_text_without_special_tokens(text):
+    """Tokenizing text without special tokens gives the same tokens as the full regex."""
+    scanner = spack.parser.ALL_TOKENS.scanner(text)
+    expected = [(m.lastgroup, m.group()) for m in iter(scanner.match, None)]
+    tokens = [(str(t.kind), t.value) for t in spack.parser.tokenize(text)]
+    assert tokens == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "mpileaks@2.3 +debug %gcc@12 cflags=-O2 ^callpath@1.0 ^mpich@3.0: ~shared",
+        "builtin.hdf5@1.10: api=v18 target=x86_64 ^zlib/abcdef",
+    ],
+)
+def test_parsed_specs_are_cached(text, monkeypatch):
+    monkeypatch.setattr(spack.parser, "_parsed_specs", {})
+    first = spack.spec.Spec(text)
+    assert list(spack.parser._parsed_specs) == [text]
+
+    # a cached spec is not parsed again, and its copies are independent
+    with monkeypatch.context() as m:
+        m.setattr(spack.parser, "SpecParser", None)
+        second = spack.spec.Spec(f"  {text} ")
+    assert str(second) == str(first)
+    assert [node.abstract_hash for node in second.traverse()] == [
+        node.abstract_hash for node in first.traverse()
+    ]
+    for node in second.traverse():
+        assert all(node is not other for other in first.traverse())
+        assert node.variants.spec is node and node.compiler_flags.spec is node
+
+    second.constrain("+opt")
+    assert "+opt" not in str(spack.spec.Spec(text))
+
+
+@pytest.mark.parametrize(
+    "text", ["mpileaks@git.develop=1.0", "libelf os=fe", "libelf target=default_target"]
+)
+def test_parsed_specs_not_cached(text, monkeypatch):
+    monkeypatch.setattr(spack.parser, "_parsed_specs", {})
+    spack.spec.Spec(text)
+    assert not spack.parser._parsed_specs
+
+
+def test_parsed_spec_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(spack.parser, "_parsed_specs", {})
+    monkeypatch.setattr(spack.parser, "_max_parsed_specs", 2)
+    for name in ("a", "b", "c"):
+        spack.spec.Spec(name)
+    assert list(spack.parser._parsed_specs) == ["b", "c"]
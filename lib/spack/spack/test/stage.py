@@ -7,6 +7,7 @@
 import collections
 import errno
 import getpass
+import hashlib
 import os
 import shutil
 import stat
@@ -16,6 +17,7 @@
 
 from llnl.util.filesystem import getuid, mkdirp, partition_path, touch, working_dir
 
+import spack.config
 import spack.paths
 import spack.stage
 import spack.util.executable
@@ -24,6 +26,7 @@
 from spack.stage import DIYStage, ResourceStage, Stage, StageComposite
 from spack.util.path import canonicalize_path
 from spack.util.web import FetchError
+from spack.version import Version
 
 # The following values are used for common fetch and stage mocking fixtures:
 _archive_base = "test-files"
@@ -890,3 +893,43 @@ def test_cannot_access(capsys):
 
     captured = capsys.readouterr()
     assert "Insufficient permissions" in str(captured)
+
+
+@pytest.mark.disable_clean_stage_check
+@pytest.mark.parametrize("first_stage", [False, True])
+@pytest.mark.parametrize("fetch_method", ["urllib", "curl"])
+def test_get_checksums_for_versions(tmpdir, mock_stage, monkeypatch, first_stage, fetch_method):
+    """Archives are checksummed concurrently while they are downloaded, and
+    only staged when they are needed by first_stage_function."""
+    url_dict, expected = {}, {}
+    for v in ("1.0", "1.1", "2.0", "2.1"):
+        archive = tmpdir.join("foo-{0}.tar.gz".format(v))
+        archive.write("content of {0}".format(v))
+        url_dict[Version(v)] = url_util.path_to_file_url(str(archive))
+        expected[v] = hashlib.sha256(archive.read_binary()).hexdigest()
+    url_dict[Version("3.0")] = url_util.path_to_file_url(str(tmpdir.join("missing.tar.gz")))
+
+    staged = []
+    original_fetch = Stage.fetch
+
+    def fetch(self, *args, **kwargs):
+        staged.append(self.default_fetcher.url)
+        return original_fetch(self, *args, **kwargs)
+
+    monkeypatch.setattr(Stage, "fetch", fetch)
+    first_stage_function = (lambda stage, url: staged.append("first")) if first_stage else None
+
+    with spack.config.override("config:url_fetch_method", fetch_method):
+        version_lines = spack.stage.get_checksums_for_versions(
+            url_dict, "foo", batch=True, concurrency=2, first_stage_function=first_stage_function
+        )
+
+    assert version_lines.splitlines() == [
+        '    version("{0}", sha256="{1}")'.format(v, expected[v])
+        for v in ("2.1", "2.0", "1.1", "1.0")
+    ]
+    if first_stage:
+        # The first archive is staged here until one can be fetched
+        assert staged == [url_dict[Version("3.0")], url_dict[Version("2.1")], "first"]
+    else:
+        assert not staged
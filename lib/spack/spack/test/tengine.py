@@ -6,6 +6,7 @@
 
 import pytest
 
+import spack
 import spack.config
 import spack.tengine as tengine
 from spack.util.path import canonicalize_path
@@ -87,3 +88,23 @@ def test_template_retrieval(self):
         template = env.get_template("b.txt")
         text = template.render({"word": "world"})
         assert "Howdy world!" == text
+
+    def test_environment_is_cached(self, mutable_config, tmpdir):
+        """Environments are reused per set of template dirs, and compiled templates
+        are cached on disk in the misc cache."""
+        spack.config.set("config:misc_cache", str(tmpdir.join("misc_cache")))
+        template_dirs = spack.config.get("config:template_dirs")
+        template_dirs = [canonicalize_path(x) for x in template_dirs]
+
+        env = tengine.make_environment(template_dirs)
+        assert env is tengine.make_environment(template_dirs)
+        assert env is not tengine.make_environment(template_dirs[1:])
+
+        assert "Hello world!" == env.get_template("a.txt").render({"word": "world"})
+        cache_dir = tmpdir.join("misc_cache", "templates", spack.spack_version)
+        assert len(cache_dir.listdir()) == 1
+
+        # A corrupt cache entry is ignored, and the template compiled again
+        cache_dir.listdir()[0].write("garbage")
+        env = tengine.make_environment(template_dirs[1:])
+        assert "Hello world!" == env.get_template("a.txt").render({"word": "world"})
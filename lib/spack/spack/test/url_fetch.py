@@ -6,6 +6,7 @@
 import collections
 import os
 import sys
+import urllib.error
 
 import pytest
 
@@ -424,3 +425,240 @@ def _raise_web_error(*args, **kwargs):
     with spack.config.override("config:url_fetch_method", "urllib"):
         with pytest.raises(web_util.FetchError, match="fetch failed to verify"):
             web_util.fetch_url_text("https://github.com/")
+
+
+def test_urllib_fetch_checksums_while_streaming(tmpdir, mock_archive, monkeypatch):
+    with open(mock_archive.archive_file, "rb") as f:
+        digest = crypto.hash_fun_for_algo("sha256")(f.read()).hexdigest()
+
+    fetcher = fs.URLFetchStrategy(url=mock_archive.url, sha256=digest)
+    with Stage(fetcher, path=str(tmpdir)):
+        with spack.config.override("config:url_fetch_method", "urllib"):
+            fetcher.fetch()
+
+        # The archive is not read again to be checked
+        def fail(*args, **kwargs):
+            raise AssertionError("the checksum should have been computed while fetching")
+
+        monkeypatch.setattr(crypto, "checksum", fail)
+        fetcher.check()
+
+        # Unless it changed since it was fetched
+        monkeypatch.undo()
+        with open(fetcher.archive_file, "ab") as f:
+            f.write(b"trailing garbage")
+        with pytest.raises(fs.ChecksumError):
+            fetcher.check()
+
+
+@pytest.mark.parametrize("supports_range", [True, False])
+def test_urllib_fetch_resumes_interrupted_download(tmpdir, monkeypatch, supports_range):
+    content = os.urandom(3 * 2**20 + 17)
+    digest = crypto.hash_fun_for_algo("sha256")(content).hexdigest()
+    offsets = []
+
+    class Response(object):
+        def __init__(self, offset):
+            self.status = 206 if offset else 200
+            self.headers = {"Content-Length": str(len(content) - offset)}
+            if offset:
+                self.headers["Content-Range"] = "bytes {0}-{1}/{2}".format(
+                    offset, len(content) - 1, len(content)
+                )
+            # The connection drops halfway through the first transfer
+            end = len(content) // 2 if not offsets[:-1] else len(content)
+            self.chunks = [content[offset:end]]
+
+        def read(self, size):
+            return self.chunks.pop() if self.chunks else b""
+
+        def close(self):
+            pass
+
+    def _read_from_url(url, accept_content_type=None, offset=0, if_range=None):
+        offsets.append(offset)
+        return url, {}, Response(offset if supports_range else 0)
+
+    monkeypatch.setattr(web_util, "read_from_url", _read_from_url)
+
+    fetcher = fs.URLFetchStrategy(url="https://example.com/foo.tar.gz", sha256=digest)
+    with Stage(fetcher, path=str(tmpdir)):
+        fetcher._fetch_urllib(fetcher.url)
+        assert offsets == [0, len(content) // 2]
+        assert not os.path.exists(fetcher.stage.save_filename + ".part")
+        with open(fetcher.archive_file, "rb") as f:
+            assert f.read() == content
+
+        monkeypatch.setattr(crypto, "checksum", None)
+        fetcher.check()
+
+
+def test_urllib_fetch_keeps_partial_download(tmpdir, monkeypatch):
+    class Response(object):
+        status = 200
+        headers = {"Content-Length": "10", "ETag": '"v1"'}
+
+        def __init__(self):
+            self.chunks = [b"12345"]
+
+        def read(self, size):
+            return self.chunks.pop() if self.chunks else b""
+
+        def close(self):
+            pass
+
+    def _read_from_url(*args, **kwargs):
+        return None, Response.headers, Response()
+
+    monkeypatch.setattr(web_util, "read_from_url", _read_from_url)
+
+    fetcher = fs.URLFetchStrategy(url="https://example.com/foo.tar.gz")
+    with Stage(fetcher, path=str(tmpdir)):
+        with pytest.raises(fs.FailedDownloadError, match="rerun to resume"):
+            fetcher._fetch_urllib(fetcher.url)
+        assert os.path.exists(fetcher.stage.save_filename + ".part")
+        assert not fetcher.archive_file
+
+
+def test_urllib_fetch_resumes_only_unchanged_download(tmpdir, monkeypatch):
+    old, new = b"old content", b"new content!"
+    requests = []
+
+    class Response(object):
+        def __init__(self):
+            # The remote file changed since the partial download was started
+            self.status = 200
+            self.headers = {"Content-Length": str(len(new)), "ETag": '"v2"'}
+            self.chunks = [new]
+
+        def read(self, size):
+            return self.chunks.pop() if self.chunks else b""
+
+        def close(self):
+            pass
+
+    def _read_from_url(url, accept_content_type=None, offset=0, if_range=None):
+        requests.append((offset, if_range))
+        response = Response()
+        return url, response.headers, response
+
+    monkeypatch.setattr(web_util, "read_from_url", _read_from_url)
+
+    fetcher = fs.URLFetchStrategy(url="https://example.com/foo.tar.gz")
+    with Stage(fetcher, path=str(tmpdir)):
+        partial_file = fetcher.stage.save_filename + ".part"
+        with open(partial_file, "wb") as f:
+            f.write(old[:4])
+        with open(partial_file + ".validator", "w") as f:
+            f.write('"v1"')
+
+        fetcher._fetch_urllib(fetcher.url)
+        assert requests == [(4, '"v1"')]
+        assert not os.path.exists(partial_file + ".validator")
+        with open(fetcher.archive_file, "rb") as f:
+            assert f.read() == new
+
+
+def test_urllib_fetch_restarts_unverifiable_download(tmpdir, monkeypatch):
+    """Without a validator or a digest, a partial download is not resumed,
+    and it is removed when the fetch fails."""
+    offsets = []
+
+    def _raise_web_error(url, accept_content_type=None, offset=0, if_range=None):
+        offsets.append(offset)
+        raise web_util.SpackWebError("bad url")
+
+    monkeypatch.setattr(web_util, "read_from_url", _raise_web_error)
+
+    fetcher = fs.URLFetchStrategy(url="https://example.com/foo.tar.gz")
+    with Stage(fetcher, path=str(tmpdir)):
+        partial_file = fetcher.stage.save_filename + ".part"
+        with open(partial_file, "wb") as f:
+            f.write(b"stale")
+
+        with pytest.raises(fs.FailedDownloadError, match="urllib failed"):
+            fetcher._fetch_urllib(fetcher.url)
+        assert offsets == [0]
+        assert not os.path.exists(partial_file)
+
+
+@pytest.mark.parametrize(
+    "cause,kept",
+    [
+        (urllib.error.URLError("[Errno 111] Connection refused"), True),
+        (urllib.error.HTTPError("url", 416, "Range Not Satisfiable", {}, None), False),
+    ],
+)
+def test_urllib_fetch_keeps_partial_download_on_resume_errors(tmpdir, monkeypatch, cause, kept):
+    """A partial download is only discarded when the server cannot resume it,
+    not when it is unreachable."""
+    offsets = []
+
+    def _raise_web_error(url, accept_content_type=None, offset=0, if_range=None):
+        offsets.append(offset)
+        raise web_util.SpackWebError("Download failed: {0}".format(cause)) from cause
+
+    monkeypatch.setattr(web_util, "read_from_url", _raise_web_error)
+
+    fetcher = fs.URLFetchStrategy(url="https://example.com/foo.tar.gz")
+    with Stage(fetcher, path=str(tmpdir)):
+        partial_file = fetcher.stage.save_filename + ".part"
+        with open(partial_file, "wb") as f:
+            f.write(b"part")
+        with open(partial_file + ".validator", "w") as f:
+            f.write('"v1"')
+
+        with pytest.raises(fs.FailedDownloadError, match="rerun" if kept else "urllib failed"):
+            fetcher._fetch_urllib(fetcher.url)
+        assert offsets == ([4] if kept else [4, 0])
+        assert os.path.exists(partial_file) is kept
+        assert os.path.exists(partial_file + ".validator") is kept
+
+
+def test_fetch_groups_limit_fetches_per_host(monkeypatch, mutable_config):
+    hosts = [{"a.org"}] * 10 + [{"b.org"}] * 2 + [set()] * 3
+    spack.config.set("config:max_fetches_per_host", 2)
+    monkeypatch.setattr(fs, "_fetch_hosts", lambda i: hosts[i])
+
+    groups = fs.fetch_groups(list(range(len(hosts))), max_groups=6)
+
+    assert len(groups) == 6
+    assert sorted(i for group in groups for i in group) == list(range(len(hosts)))
+    for host in ("a.org", "b.org"):
+        assert sum(1 for group in groups if any(host in hosts[i] for i in group)) == 2
+
+
+def test_fetch_groups_limit_hosts_shared_by_specs(monkeypatch, mutable_config):
+    """Specs fetching from several hosts, e.g. for their sources and a resource,
+    are limited on all of them."""
+    hosts = [{"common.org", "a.org"}] * 4 + [{"common.org", "b.org"}] * 4 + [{"c.org"}] * 4
+    spack.config.set("config:max_fetches_per_host", 2)
+    monkeypatch.setattr(fs, "_fetch_hosts", lambda i: hosts[i])
+
+    groups = fs.fetch_groups(list(range(len(hosts))), max_groups=8)
+
+    assert sorted(i for group in groups for i in group) == list(range(len(hosts)))
+    for host in ("common.org", "a.org", "b.org", "c.org"):
+        assert sum(1 for group in groups if any(host in hosts[i] for i in group)) <= 2
+
+
+def test_fetch_hosts_include_resources_and_patches(mock_packages, mutable_config):
+    spack.config.set("mirrors", {"test": "https://mirror.example.com/spack"})
+    hosts = fs._fetch_hosts(Spec("when-directives-true@1.0"))
+    assert hosts == {"www.example.com"}
+
+    spec = Spec("patch-several-dependencies").concretized()
+    assert "example.com" in fs._fetch_hosts(spec["fake"])
+
+
+def test_fetch_groups_ignore_mirrors_shared_by_all_specs(mock_packages, mutable_config):
+    """A mirror configured for all specs does not serialize their fetches."""
+    spack.config.set("mirrors", {"test": "https://mirror.example.com/spack"})
+    spack.config.set("config:max_fetches_per_host", 1)
+    specs = [
+        Spec(s) for s in ("old-external@=1.2.0", "cmake-client@=1.0", "hdf5@=2.3", "mpileaks@=2.3")
+    ]
+
+    groups = fs.fetch_groups(specs, max_groups=4)
+
+    assert groups == [[0, 1], [2, 3]]
@@ -102,3 +102,55 @@ def test_get_bad_extension():
 @pytest.mark.parametrize("path", ext_archive.values())
 def test_allowed_archive(path):
     assert scomp.allowed_archive(path)
+
+
+tarball_list = [key for key in ext_archive.keys() if key.startswith("t") and "Z" not in key]
+
+
+def _check_expanded_tarball():
+    files = os.listdir(os.getcwd())
+    assert len(files) == 1
+    with open(files[0], "r") as f:
+        assert "TEST" in f.read()
+
+
+@pytest.mark.parametrize("archive_file", tarball_list, indirect=True)
+def test_stream_untar(tmpdir, archive_file):
+    opener = scomp._py_opener(scomp._tar_compression(archive_file))
+    if opener is None:
+        pytest.skip("tarball is not compressed")
+    with working_dir(str(tmpdir)):
+        scomp._stream_untar(archive_file, opener)
+        _check_expanded_tarball()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a shell script as decompressor")
+@pytest.mark.parametrize("archive_file", ["tar.gz"], indirect=True)
+@pytest.mark.parametrize(
+    "available,expected", [(["pigz", "gzip"], "parallel"), ([], "stream"), (["gzip"], "tar")]
+)
+def test_system_untar_decompressor(tmpdir, monkeypatch, archive_file, available, expected):
+    used = []
+    pigz = tmpdir.join("pigz")
+    pigz.write('#!/bin/sh\necho parallel > "{0}"\nexec gzip "$@"\n'.format(tmpdir.join("log")))
+    pigz.chmod(0o755)
+
+    def _find_program(*names):
+        return next((str(pigz) for name in names if name in available), None)
+
+    monkeypatch.setattr(scomp, "_find_program", _find_program)
+    original_stream_untar = scomp._stream_untar
+
+    def _stream_untar(*args):
+        used.append("stream")
+        return original_stream_untar(*args)
+
+    monkeypatch.setattr(scomp, "_stream_untar", _stream_untar)
+
+    with working_dir(str(tmpdir.mkdir("expanded"))):
+        scomp._system_untar(archive_file)
+        _check_expanded_tarball()
+
+    if tmpdir.join("log").exists():
+        used.append("parallel")
+    assert used == ([expected] if expected != "tar" else [])
@@ -131,6 +131,16 @@ def test_timer_write():
     }
 
 
+def test_timer_record():
+    # 0
+    t = timer.Timer(now=Tick().tick)
+
+    # 1
+    t.record("waited", 5.0)
+    assert t.phases == ["waited"]
+    assert t.duration("waited") == 5.0
+
+
 def test_null_timer():
     # Just ensure that the interface of the noop-timer doesn't break at some point
     buffer = StringIO()
@@ -140,6 +150,7 @@ def test_null_timer():
     t.stop("first")
     with t.measure("second"):
         pass
+    t.record("third", 1.0)
     t.stop()
     assert t.duration("first") == 0.0
     assert t.duration() == 0.0
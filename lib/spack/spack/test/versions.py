@@ -7,15 +7,20 @@
 We try to maintain compatibility with RPM's version semantics
 where it makes sense.
 """
+import itertools
 import os
+import pickle
 import sys
 
 import pytest
 
 from llnl.util.filesystem import working_dir
 
+import spack.config
+import spack.fetch_strategy
 import spack.package_base
 import spack.spec
+import spack.version
 from spack.version import (
     GitVersion,
     StandardVersion,
@@ -618,6 +623,25 @@ def test_versions_from_git(git, mock_git_version_info, monkeypatch, mock_package
         assert str(comparator) == expected
 
 
+def test_versions_from_git_without_repo_cache(
+    mock_git_version_info, monkeypatch, mock_packages, override_git_repos_cache_path
+):
+    """Commit lookups keep their own clone unless config:git_repo_cache is set"""
+    repo_path, _, commits = mock_git_version_info
+    monkeypatch.setattr(
+        spack.package_base.PackageBase, "git", "file://%s" % repo_path, raising=False
+    )
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the shared repository cache should not be used")
+
+    monkeypatch.setattr(spack.fetch_strategy.GitFetchStrategy, "update_repo_cache", _fail)
+
+    with spack.config.override("config:git_repo_cache", False):
+        spec = spack.spec.Spec("git-test-commit@%s" % commits[0])
+        assert spec.version.ref_version
+
+
 @pytest.mark.skipif(sys.platform == "win32", reason="Not supported on Windows (yet)")
 @pytest.mark.parametrize(
     "commit_idx,expected_satisfies,expected_not_satisfies",
@@ -889,6 +913,72 @@ def test_version_list_normalization():
     assert ver("1.0:2.0,=1.0,ref=1.0") == ver(["1.0:2.0"])
 
 
+def test_sort_keys_agree_with_comparisons():
+    items = [
+        ver(x)
+        for x in (
+            "=1.2",
+            "=1.2.0",
+            "=1.2a",
+            "=1.2.develop",
+            "=1.10",
+            "=develop",
+            "git.ref=1.2",
+            "git.other=1.2",
+            "1.2",
+            "1.2:1.3",
+            ":1.2",
+            "1.2:",
+        )
+    ]
+    for a, b in itertools.product(items, repeat=2):
+        assert (a.key < b.key) == (a < b)
+        assert (a.key == b.key) == (a == b)
+
+
+def test_operations_on_long_version_lists():
+    # Lists with more than two elements bisect on the sort keys of their elements
+    lhs = ver("=1.0,1.2:1.4,=1.5.1,2:2.2,=3.0,4.1:")
+    rhs = ver("1.0:1.3,=1.4.2,=1.5.1,2.1:3.0,=5.0")
+    expected = ver("=1.0,1.2:1.3,=1.4.2,=1.5.1,2.1:2.2,=3.0,=5.0")
+    assert lhs.intersection(rhs) == expected
+    assert rhs.intersection(lhs) == expected
+
+    assert ver("=1.2.5,=2.1,4.2:4.3").satisfies(lhs)
+    assert not ver("=1.2.5,=2.5,4.2:4.3").satisfies(lhs)
+
+    assert lhs.intersects(ver("=1.1,=2.5,=6"))
+    assert not lhs.intersects(ver("=1.1,=2.5,=3.5"))
+    assert lhs.intersects(Version("2.2.7"))
+    assert not lhs.intersects(Version("2.3"))
+
+
+def test_versions_and_ranges_are_interned():
+    assert Version("1.2.3") is Version("1.2.3")
+    assert ver("=1.2.3") is Version("1.2.3")
+    assert ver("1.2:1.4") is ver("1.2:1.4")
+    assert ver("1.2") is ver("1.2")
+
+    # Git versions attach lookups and version lists are changed in place
+    assert Version("git.ref=1.2") is not Version("git.ref=1.2")
+    assert ver("1.2,1.4") is not ver("1.2,1.4")
+
+    # Interned versions survive pickling with a hash valid in the current process
+    assert pickle.loads(pickle.dumps(ver("1.2a:1.4b"))) == ver("1.2a:1.4b")
+    assert hash(pickle.loads(pickle.dumps(Version("1.2a")))) == hash(Version("1.2a"))
+
+
+def test_interned_versions_are_bounded(monkeypatch):
+    monkeypatch.setattr(spack.version, "_interned_versions", {})
+    monkeypatch.setattr(spack.version, "_max_interned_versions", 2)
+
+    first = Version("1.2.3")
+    Version("1.2.4")
+    Version("1.2.5")
+    assert list(spack.version._interned_versions) == ["1.2.4", "1.2.5"]
+    assert Version("1.2.3") == first and Version("1.2.3") is not first
+
+
 @pytest.mark.parametrize("version", ["=1.2", "git.ref=1.2", "1.2"])
 def test_version_comparison_with_list_fails(version):
     vlist = VersionList(["=1.3"])
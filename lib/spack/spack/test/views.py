@@ -9,7 +9,7 @@
 import pytest
 
 from spack.directory_layout import DirectoryLayout
-from spack.filesystem_view import SimpleFilesystemView, YamlFilesystemView
+from spack.filesystem_view import SimpleFilesystemView, ViewMergeMap, YamlFilesystemView
 from spack.spec import Spec
 
 
@@ -66,3 +66,37 @@ def pkg_a_add_files_to_view(view, merge_map, skip_if_exists=True):
     view.add_specs(a, b)
     assert os.path.lexists(os.path.join(view_dir, "file"))
     assert os.path.lexists(os.path.join(view_dir, "subdir", "file"))
+
+
+def test_view_reuses_merge_map_of_previous_view(mock_packages, tmpdir):
+    """Regenerating a view from the merge map of a previous view should only walk
+    the prefixes of specs that were not in the previous view."""
+    specs = []
+    for name in ("a", "b", "c"):
+        s = Spec(name)
+        s.prefix = os.path.join(tmpdir, name)
+        s._mark_concrete()
+        os.makedirs(os.path.join(s.prefix, ".spack"))
+        os.makedirs(os.path.join(s.prefix, "bin"))
+        with open(os.path.join(s.prefix, "bin", name), "w") as f:
+            f.write(name)
+        specs.append(s)
+    a, b, c = specs
+
+    old_dir = os.path.join(str(tmpdir), "old")
+    os.mkdir(old_dir)
+    old_view = SimpleFilesystemView(old_dir, DirectoryLayout(old_dir))
+    old_view.add_specs(a, b)
+    assert os.path.exists(os.path.join(old_dir, ".spack", "merge_map.json"))
+
+    new_dir = os.path.join(str(tmpdir), "new")
+    os.mkdir(new_dir)
+    new_view = SimpleFilesystemView(new_dir, DirectoryLayout(new_dir))
+    new_view.add_specs(b, c, previous_merge_map=ViewMergeMap.from_view(old_dir))
+
+    # Only the contents and metadata dir of c had to be walked
+    assert new_view.view_merge_map.walked == 2
+    assert set(new_view.view_merge_map.specs) == {b.dag_hash(), c.dag_hash()}
+    assert not os.path.lexists(os.path.join(new_dir, "bin", "a"))
+    assert os.path.lexists(os.path.join(new_dir, "bin", "b"))
+    assert os.path.lexists(os.path.join(new_dir, "bin", "c"))
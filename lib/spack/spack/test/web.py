@@ -3,8 +3,11 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import collections
+import http.server
+import io
 import os
 import sys
+import threading
 
 import pytest
 
@@ -348,3 +351,125 @@ def get_s3_session(url, method="fetch"):
 def test_s3_url_parsing():
     assert spack.util.s3._parse_s3_endpoint_url("example.com") == "https://example.com"
     assert spack.util.s3._parse_s3_endpoint_url("http://example.com") == "http://example.com"
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+
+    def do_GET(self):
+        self.client_ports.add(self.client_address[1])
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.client_ports.add(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def keep_alive_server():
+    KeepAliveHandler.client_ports = set()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{0}".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("pool_size,expected_connections", [(8, 1), (0, 20)])
+def test_urlopen_reuses_connections(
+    keep_alive_server, mutable_config, monkeypatch, pool_size, expected_connections
+):
+    spack.config.set("config:url_pool_size", pool_size)
+    monkeypatch.setattr(spack.util.web, "urlopen", spack.util.web._urlopen())
+
+    for i in range(10):
+        _, _, response = spack.util.web.read_from_url(keep_alive_server + "/file-%d" % i)
+        assert response.read() == b"/file-%d" % i
+        response.close()
+        assert spack.util.web.url_exists(keep_alive_server + "/file-%d" % i)
+
+    assert len(KeepAliveHandler.client_ports) == expected_connections
+
+
+def test_urlopen_does_not_reuse_connections_across_schemes(
+    keep_alive_server, mutable_config, monkeypatch
+):
+    """A plain HTTP connection must not be reused for an HTTPS request to the same port"""
+    monkeypatch.setattr(spack.util.web, "urlopen", spack.util.web._urlopen())
+    _, _, response = spack.util.web.read_from_url(keep_alive_server + "/file")
+    assert response.read() == b"/file"
+    response.close()
+
+    https_url = keep_alive_server.replace("http://", "https://", 1) + "/file"
+    with pytest.raises(spack.util.web.SpackWebError):
+        spack.util.web.read_from_url(https_url)
+
+
+class FakeSocket:
+    def __init__(self, data):
+        self.data = data
+
+    def makefile(self, mode):
+        return io.BytesIO(self.data)
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123456789",
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\na\r\n0123456789\r\n0\r\n\r\n",
+    ],
+)
+@pytest.mark.parametrize("size,reused", [(None, True), (4, False)])
+def test_connection_pool_reuses_only_fully_read_connections(data, size, reused):
+    """A response closed before its end leaves bytes on the connection, which
+    would be read as the response to the next request"""
+    response = spack.util.web._PooledHTTPResponse(FakeSocket(data))
+    response.begin()
+    assert response.read(size).startswith(b"0123")
+    response.close()
+
+    pool = spack.util.web.ConnectionPool(8)
+    connection = FakeConnection()
+    pool.put(("http", "example.com"), connection, response)
+    assert (pool.get(("http", "example.com")) is connection) is reused
+    assert connection.closed is not reused
+
+
+def test_connection_pool_is_empty_after_fork(monkeypatch):
+    class Response:
+        will_close = False
+        length = None
+        chunked = False
+
+        def isclosed(self):
+            return True
+
+    pool = spack.util.web.ConnectionPool(8)
+    connection = object()
+    pool.put(("http", "example.com"), connection, Response())
+    assert pool.get(("https", "example.com")) is None
+    assert pool.get(("http", "example.com")) is connection
+
+    pool.put(("http", "example.com"), connection, Response())
+    pid = os.getpid()
+    monkeypatch.setattr(os, "getpid", lambda: pid + 1)
+    assert pool.get(("http", "example.com")) is None
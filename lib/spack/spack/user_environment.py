@@ -2,17 +2,36 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import hashlib
 import os
 import sys
 
+import llnl.util.lang
+import llnl.util.tty as tty
+from llnl.util.lock import LockError
+
+import spack
 import spack.build_environment
+import spack.caches
 import spack.config
+import spack.repo
 import spack.util.environment as environment
+import spack.util.file_cache
 import spack.util.prefix as prefix
+import spack.util.spack_json as sjson
 
 #: Environment variable name Spack uses to track individually loaded packages
 spack_loaded_hashes_var = "SPACK_LOADED_HASHES"
 
+#: Number of cached variants (different view projections or options) kept per spec
+_max_cached_variants = 4
+
+#: Configuration sections that invalidate the cached run environments when they change
+_run_environment_config_sections = ("config", "packages")
+
+#: In-memory copy of the run environments read from, or written to, the misc cache
+_run_environments = {}
+
 
 def prefix_inspections(platform):
     """Get list of prefix inspections for platform
@@ -85,12 +104,34 @@ def environment_modifications_for_spec(spec, view=None, set_package_py_globals=T
         spec.prefix, prefix_inspections(spec.platform), exclude=environment.is_system_path
     )
 
+    env.extend(run_environment_modifications(spec, set_package_py_globals))
+    return env
+
+
+def run_environment_modifications(spec, set_package_py_globals=True):
+    """Environment modifications to run ``spec`` that come from its package and from the
+    packages of its dependencies, in the order they are applied.
+
+    Computing them runs package code for every node in the DAG, so the result for an
+    installed spec is cached in the misc cache. The cache entry is keyed by the DAG hash
+    and the prefix of the spec, and it is discarded when any of the package recipes
+    involved changes.
+
+    Args:
+        spec (spack.spec.Spec): concrete spec, possibly with a prefix projected in a view
+        set_package_py_globals (bool): whether or not to set the global variables in the
+            package.py files
+    """
+    stamp = _run_environment_stamp(spec, set_package_py_globals)
+    if stamp is not None:
+        env = _read_run_environment(spec, stamp)
+        if env is not None:
+            return env
+
     # Let the extendee/dependency modify their extensions/dependents
     # before asking for package-specific modifications
-    env.extend(
-        spack.build_environment.modifications_from_dependencies(
-            spec, context="run", set_package_py_globals=set_package_py_globals
-        )
+    env = spack.build_environment.modifications_from_dependencies(
+        spec, context="run", set_package_py_globals=set_package_py_globals
     )
 
     if set_package_py_globals:
@@ -98,4 +139,77 @@ def environment_modifications_for_spec(spec, view=None, set_package_py_globals=T
 
     spec.package.setup_run_environment(env)
 
+    if stamp is not None:
+        _write_run_environment(spec, stamp, env)
     return env
+
+
+@llnl.util.lang.memoized
+def _recipe_stamp(fullname):
+    """Modification time and size of the package.py file for a package."""
+    try:
+        st = os.stat(spack.repo.path.filename_for_package_name(fullname))
+    except (OSError, spack.repo.RepoError):
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _run_environment_stamp(spec, set_package_py_globals):
+    """Digest of everything the run environment of ``spec`` depends on besides its
+    DAG hash, or None if the run environment of ``spec`` must not be cached.
+    """
+    # Traces cannot be cached, and external prefixes may change under our feet
+    if environment.TRACING_ENABLED or spec.external or not spec.installed:
+        return None
+
+    recipes = [(s.fullname, _recipe_stamp(s.fullname)) for s in spec.traverse()]
+    # Package recipes may read these sections in setup_run_environment
+    config = [spack.config.get(section) for section in _run_environment_config_sections]
+    content = [spack.spack_version, str(spec.prefix), set_package_py_globals, recipes, config]
+    return hashlib.sha256(sjson.dump(content).encode("utf-8")).hexdigest()
+
+
+def _run_environment_cache_key(spec):
+    return os.path.join("run_environments", spec.dag_hash() + ".json")
+
+
+def _read_run_environment(spec, stamp):
+    key = _run_environment_cache_key(spec)
+    if key not in _run_environments:
+        cache = spack.caches.misc_cache
+        try:
+            if not cache.init_entry(key):
+                return None
+            with cache.read_transaction(key) as f:
+                _run_environments[key] = sjson.load(f)
+        except (spack.util.file_cache.CacheError, LockError, OSError, ValueError) as e:
+            tty.debug("cannot read the cached run environment of {0}: {1}".format(spec, e))
+            return None
+
+    modifications = _run_environments[key].get(stamp)
+    if modifications is None:
+        return None
+    try:
+        return environment.EnvironmentModifications.from_dicts(modifications)
+    except (KeyError, TypeError, ValueError) as e:
+        # E.g. an entry written by an incompatible version of Spack
+        tty.debug("cannot read the cached run environment of {0}: {1}".format(spec, e))
+        _run_environments.pop(key, None)
+        return None
+
+
+def _write_run_environment(spec, stamp, env):
+    key = _run_environment_cache_key(spec)
+    cache = spack.caches.misc_cache
+    try:
+        entry = _run_environments.setdefault(key, {})
+        entry[stamp] = env.to_dicts()
+        while len(entry) > _max_cached_variants:
+            del entry[next(iter(entry))]
+
+        cache.init_entry(key)
+        with cache.write_transaction(key) as (_, new):
+            sjson.dump(entry, new)
+    except (spack.util.file_cache.CacheError, LockError, OSError, TypeError) as e:
+        _run_environments.pop(key, None)
+        tty.debug("cannot cache the run environment of {0}: {1}".format(spec, e))
@@ -9,8 +9,10 @@
 import re
 import shutil
 import sys
+import threading
 from itertools import product
 
+import llnl.util.lang
 from llnl.util import tty
 
 import spack.util.path as spath
@@ -69,10 +71,50 @@ def allowed_archive(path):
     return False if not path else any(path.endswith(t) for t in ALLOWED_ARCHIVE_TYPES)
 
 
+#: Programs decompressing with several threads, that tar can use as filters
+_PARALLEL_DECOMPRESSORS = {"gz": ["pigz"], "bz2": ["lbzip2", "pbzip2"], "xz": ["pixz"]}
+
+#: Programs tar uses to decompress tarballs
+_SYSTEM_DECOMPRESSORS = {"gz": "gzip", "bz2": "bzip2", "xz": "xz", "Z": "gzip"}
+
+
+@llnl.util.lang.memoized
+def _find_program(*names):
+    for name in names:
+        exe = which(name)
+        if exe:
+            return exe.path
+    return None
+
+
+def _py_opener(compression):
+    """Returns a function opening files with the given compression for reading
+    with Python's own decompressors, or None if they are not available."""
+    if compression == "gz" and is_gzip_supported():
+        return gzip.open
+    if compression == "bz2" and is_bz2_supported():
+        return bz2.open
+    if compression == "xz" and is_lzma_supported():
+        return lzma.open
+    return None
+
+
+def _tar_compression(archive_file):
+    """Returns the compression of a tarball, e.g. gz, or None"""
+    extension = extension_from_path(archive_file) or extension_from_file(archive_file)
+    if not extension:
+        return None
+    return compression_ext_from_compressed_archive(extension)
+
+
 def _system_untar(archive_file):
     """Returns path to unarchived tar file.
     Untars archive via system tar.
 
+    Compressed tarballs are decompressed by a parallel decompressor if one
+    is available, or by Python if tar's own filter is missing. Either way the
+    archive is expanded in a single pass.
+
     Args:
         archive_file (str): absolute path to the archive to be extracted.
         Can be one of .tar(.[gz|bz2|xz|Z]) or .(tgz|tbz|tbz2|txz).
@@ -80,11 +122,56 @@ def _system_untar(archive_file):
     outfile = os.path.basename(strip_extension(archive_file, "tar"))
 
     tar = which("tar", required=True)
-    tar.add_default_arg("-oxf")
-    tar(archive_file)
+    compression = _tar_compression(archive_file) if sys.platform != "win32" else None
+    if compression:
+        parallel = _find_program(*_PARALLEL_DECOMPRESSORS.get(compression, []))
+        opener = _py_opener(compression)
+        if parallel:
+            tar("--use-compress-program={0}".format(parallel), "-oxf", archive_file)
+            return outfile
+        elif opener and not _find_program(_SYSTEM_DECOMPRESSORS[compression]):
+            _stream_untar(archive_file, opener)
+            return outfile
+
+    tar("-oxf", archive_file)
     return outfile
 
 
+def _stream_untar(archive_file, opener):
+    """Extracts a compressed tarball in a single pass: a thread decompresses
+    it with ``opener`` and pipes the result to system tar.
+
+    Args:
+        archive_file (str): absolute path to the archive to be extracted
+        opener: function opening ``archive_file`` for reading decompressed data
+    """
+    tar = which("tar", required=True)
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def decompress():
+        # Closing the pipe, also on errors, signals the end of the input to tar
+        try:
+            with os.fdopen(write_fd, "wb") as dst, opener(archive_file) as src:
+                shutil.copyfileobj(src, dst, 2**20)
+        except BrokenPipeError:
+            # tar exited early, its own error is reported
+            pass
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=decompress, daemon=True)
+    thread.start()
+    try:
+        with os.fdopen(read_fd, "rb") as stdin:
+            tar("-oxf", "-", input=stdin)
+    finally:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+
 def _bunzip2(archive_file):
     """Returns path to decompressed file.
     Uses Python's bz2 module to decompress bz2 compressed archives
@@ -221,7 +308,8 @@ def _win_compressed_tarball_handler(decompressor):
     This method uses a decompression method in conjunction with
     the tar utility to perform decompression and extraction in
     a two step process first using decompressor to decompress,
-    and tar to extract.
+    and tar to extract. Where Python can decompress the archive,
+    both steps overlap and no intermediate file is written.
 
     The motivation for this method is Windows tar utility's lack
     of access to the xz tool (unsupported natively on Windows) but
@@ -229,6 +317,11 @@ def _win_compressed_tarball_handler(decompressor):
     """
 
     def unarchive(archive_file):
+        opener = _py_opener(_tar_compression(archive_file))
+        if opener:
+            _stream_untar(archive_file, opener)
+            return os.path.basename(strip_extension(archive_file))
+
         # perform intermediate extraction step
         # record name of new archive so we can extract
         # and later clean up
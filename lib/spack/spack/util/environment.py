@@ -5,8 +5,9 @@
 """Set, unset or modify environment variables."""
 import collections
 import contextlib
-import inspect
+import hashlib
 import json
+import linecache
 import os
 import os.path
 import pickle
@@ -19,6 +20,7 @@
 
 from llnl.util import tty
 from llnl.util.lang import dedupe
+from llnl.util.lock import LockError
 
 import spack.platforms
 import spack.spec
@@ -60,6 +62,28 @@
 
 TRACING_ENABLED = False
 
+#: Variables whose changes are not attributed to sourcing a file
+_VARIABLES_UNRELATED_TO_SOURCING = [
+    # Bash internals
+    "SHLVL",
+    "_",
+    "PWD",
+    "OLDPWD",
+    "PS1",
+    "PS2",
+    "ENV",
+    # Environment modules v4
+    "LOADEDMODULES",
+    "_LMFILES_",
+    "BASH_FUNC_module()",
+    "MODULEPATH",
+    "MODULES_(.*)",
+    r"(\w*)_mod(quar|share)",
+    # Lmod configuration
+    r"LMOD_(.*)",
+    "MODULERCFILE",
+]
+
 Path = str
 ModificationList = List[Union["NameModifier", "NameValueModifier"]]
 
@@ -274,14 +298,25 @@ def set_env(**kwargs):
 
 
 class Trace:
-    """Trace information on a function call"""
+    """Trace information on a function call.
+
+    The source line of the call is read lazily, since traces are recorded for every
+    modification but only looked at when something suspicious is reported.
+    """
 
-    __slots__ = ("filename", "lineno", "context")
+    __slots__ = ("filename", "lineno", "_context")
 
-    def __init__(self, *, filename: str, lineno: int, context: str):
+    def __init__(self, *, filename: str, lineno: int, context: Optional[str] = None):
         self.filename = filename
         self.lineno = lineno
-        self.context = context
+        self._context = context
+
+    @property
+    def context(self) -> str:
+        if self._context is None:
+            line = linecache.getline(self.filename, self.lineno) if self.lineno > 0 else ""
+            self._context = line.strip() or "unknown context"
+        return self._context
 
     def __str__(self):
         return f"{self.context} at {self.filename}:{self.lineno}"
@@ -477,17 +512,16 @@ def _trace(self) -> Optional[Trace]:
         if not self.traced:
             return None
 
-        stack = inspect.stack()
-        try:
-            _, filename, lineno, _, context, index = stack[2]
-            assert index is not None, "index must be an integer"
-            current_context = context[index].strip() if context is not None else "unknown context"
-        except Exception:
-            filename = "unknown file"
-            lineno = -1
-            current_context = "unknown context"
+        # Record the first caller outside of this module, skipping the method recording
+        # the modification and the decorators wrapping it. Only the code location is
+        # stored here, since building full frame records is expensive.
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
 
-        return Trace(filename=filename, lineno=lineno, context=current_context)
+        if frame is None:
+            return Trace(filename="unknown file", lineno=-1, context="unknown context")
+        return Trace(filename=frame.f_code.co_filename, lineno=frame.f_lineno)
 
     @system_env_normalize
     def set(self, name: str, value: str, *, force: bool = False):
@@ -709,6 +743,32 @@ def shell_modifications(
                     cmds += cmd
         return cmds
 
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Returns the modifications, without their traces, as plain data that can be
+        stored as JSON and read back with ``from_dicts``.
+        """
+        result = []
+        for item in self.env_modifications:
+            data = {slot: getattr(item, slot) for slot in _modifier_slots(type(item))}
+            data["kind"] = type(item).__name__
+            result.append(data)
+        return result
+
+    @staticmethod
+    def from_dicts(data: List[Dict[str, Any]]) -> "EnvironmentModifications":
+        """Constructs the environment modifications stored by ``to_dicts``."""
+        env = EnvironmentModifications()
+        for item in data:
+            cls = globals()[item["kind"]]
+            if not (isinstance(cls, type) and issubclass(cls, (NameModifier, NameValueModifier))):
+                raise ValueError(f"unknown environment modification: {item['kind']}")
+            modifier = cls.__new__(cls)
+            for slot in _modifier_slots(cls):
+                setattr(modifier, slot, item[slot])
+            modifier.trace = None
+            env.env_modifications.append(modifier)
+        return env
+
     @staticmethod
     def from_sourcing_file(
         filename: Path, *arguments: str, **kwargs: Any
@@ -734,6 +794,9 @@ def from_sourcing_file(
                 variables (default: []). Supersedes any excluded variables.
             clean (bool): in addition to removing empty entries,
                 also remove duplicate entries (default: False).
+            cache (bool): reuse the modifications computed earlier for the same file,
+                arguments and input environment, if the file did not change since
+                (default: True)
         """
         tty.debug(f"EnvironmentModifications.from_sourcing_file: {filename}")
         # Check if the file actually exists
@@ -742,33 +805,21 @@ def from_sourcing_file(
             raise RuntimeError(msg)
 
         # Prepare include and exclude lists of environment variable names
-        exclude = kwargs.get("exclude", [])
+        exclude = list(kwargs.get("exclude", []))
         include = kwargs.get("include", [])
         clean = kwargs.get("clean", False)
 
         # Other variables unrelated to sourcing a file
-        exclude.extend(
-            [
-                # Bash internals
-                "SHLVL",
-                "_",
-                "PWD",
-                "OLDPWD",
-                "PS1",
-                "PS2",
-                "ENV",
-                # Environment modules v4
-                "LOADEDMODULES",
-                "_LMFILES_",
-                "BASH_FUNC_module()",
-                "MODULEPATH",
-                "MODULES_(.*)",
-                r"(\w*)_mod(quar|share)",
-                # Lmod configuration
-                r"LMOD_(.*)",
-                "MODULERCFILE",
-            ]
-        )
+        exclude.extend(_VARIABLES_UNRELATED_TO_SOURCING)
+
+        # Scripts like Intel's setvars.sh take seconds to source, so the modifications
+        # are cached for as long as the file and its input environment don't change
+        cache_key = None
+        if kwargs.get("cache", True):
+            cache_key = _sourced_file_cache_key(filename, arguments, kwargs)
+            cached = _read_sourced_file_cache(cache_key)
+            if cached is not None:
+                return cached
 
         # Compute the environments before and after sourcing
         before = sanitize(
@@ -784,7 +835,10 @@ def from_sourcing_file(
         )
 
         # Delegate to the other factory
-        return EnvironmentModifications.from_environment_diff(before, after, clean)
+        env = EnvironmentModifications.from_environment_diff(before, after, clean)
+        if cache_key is not None:
+            _write_sourced_file_cache(cache_key, env)
+        return env
 
     @staticmethod
     def from_environment_diff(
@@ -895,6 +949,72 @@ def return_separator_if_any(*args):
         return env
 
 
+def _modifier_slots(cls: type) -> List[str]:
+    """Attributes that define a modifier, except its trace."""
+    return [s for c in cls.__mro__ for s in getattr(c, "__slots__", ()) if s != "trace"]
+
+
+def _sourced_file_cache_key(filename: Path, arguments: Tuple[str, ...], kwargs: Any) -> str:
+    """Key of the misc cache entry for the modifications of a sourced file."""
+    stat = os.stat(filename)
+    input_environment = sanitize(
+        kwargs.get("env", os.environ), exclude=_VARIABLES_UNRELATED_TO_SOURCING, include=[]
+    )
+    options = (
+        "shell",
+        "shell_options",
+        "source_command",
+        "suppress_output",
+        "concatenate_on_success",
+    )
+    content = [
+        os.path.realpath(filename),
+        list(arguments),
+        [stat.st_mtime_ns, stat.st_size],
+        {option: kwargs.get(option) for option in options},
+        [kwargs.get("exclude", []), kwargs.get("include", []), kwargs.get("clean", False)],
+        sorted(input_environment.items()),
+    ]
+    digest = hashlib.sha256(json.dumps(content).encode("utf-8")).hexdigest()
+    return os.path.join("sourced_files", digest + ".json")
+
+
+def _read_sourced_file_cache(key: str) -> Optional[EnvironmentModifications]:
+    import spack.caches  # avoid circular imports
+    import spack.util.file_cache
+
+    try:
+        if not spack.caches.misc_cache.init_entry(key):
+            return None
+        with spack.caches.misc_cache.read_transaction(key) as f:
+            env = EnvironmentModifications.from_dicts(json.load(f))
+    except (
+        spack.util.file_cache.CacheError,
+        LockError,
+        OSError,
+        KeyError,
+        TypeError,
+        ValueError,
+    ) as e:
+        tty.debug(f"cannot read the cached modifications of a sourced file: {e}")
+        return None
+
+    tty.debug(f"using cached modifications from {spack.caches.misc_cache.cache_path(key)}")
+    return env
+
+
+def _write_sourced_file_cache(key: str, env: EnvironmentModifications):
+    import spack.caches  # avoid circular imports
+    import spack.util.file_cache
+
+    try:
+        spack.caches.misc_cache.init_entry(key)
+        with spack.caches.misc_cache.write_transaction(key) as (_, new):
+            json.dump(env.to_dicts(), new)
+    except (spack.util.file_cache.CacheError, LockError, OSError, TypeError) as e:
+        tty.debug(f"cannot cache the modifications of a sourced file: {e}")
+
+
 def _set_or_unset_not_first(
     variable: str, changes: ModificationList, errstream: Callable[[str], None]
 ):
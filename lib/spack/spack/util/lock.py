@@ -4,11 +4,18 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 """Wrapper for ``llnl.util.lock`` allows locking to be enabled/disabled."""
+import atexit
+import functools
+import glob
+import multiprocessing.util
 import os
+import socket
 import stat
 import sys
 
 import llnl.util.lock
+import llnl.util.tty as tty
+from llnl.util.filesystem import mkdirp
 
 # import some llnl.util.lock names as though they're part of spack.util.lock
 from llnl.util.lock import LockError  # noqa: F401
@@ -20,6 +27,11 @@
 import spack.config
 import spack.error
 import spack.paths
+import spack.util.spack_json as sjson
+
+#: Environment variable naming a directory where every spack process writes
+#: the profile of the locks it took (see ``profile_locks()``)
+lock_profile_env_var = "SPACK_LOCK_PROFILE"
 
 
 class Lock(llnl.util.lock.Lock):
@@ -84,3 +96,55 @@ def check_lock_safety(path):
                 "restrict permissions on {0} or enable locks."
             ).format(path)
             raise spack.error.SpackError(msg, long_msg)
+
+
+def profile_locks(directory):
+    """Profile the locks taken by this process, and write the profile as
+    JSON to a file in ``directory`` when the process exits.
+
+    Concurrent processes write to separate files, which ``read_lock_profiles()``
+    combines into a single profile.
+    """
+    profiler = llnl.util.lock.enable_profiling()
+    atexit.register(_write_lock_profile, profiler, directory)
+
+    # Processes started by multiprocessing, like build processes, exit without
+    # running atexit handlers, so they write their profile when they finish
+    multiprocessing.util.register_after_fork(
+        profiler, functools.partial(_profile_child, directory)
+    )
+
+
+def _profile_child(directory, profiler):
+    multiprocessing.util.Finalize(
+        profiler, _write_lock_profile, args=(profiler, directory), exitpriority=0
+    )
+
+
+def _write_lock_profile(profiler, directory):
+    # Forked children start with an empty profile, see llnl.util.lock, and
+    # write their own file
+    if not profiler.locks:
+        return
+
+    pid = os.getpid()
+    path = os.path.join(directory, "{0}-{1}.json".format(socket.gethostname(), pid))
+    try:
+        mkdirp(directory)
+        with open(path, "w") as f:
+            sjson.dump(profiler.to_dict(), f)
+    except OSError as e:
+        tty.warn("Could not write the lock profile to {0}: {1}".format(path, str(e)))
+
+
+def read_lock_profiles(directory):
+    """Combine all lock profiles written to ``directory`` into one."""
+    profiles = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path) as f:
+                profiles.append(sjson.load(f))
+        except (OSError, ValueError) as e:
+            tty.warn("Skipping unreadable lock profile {0}: {1}".format(path, str(e)))
+
+    return llnl.util.lock.LockProfiler.merge(profiles)
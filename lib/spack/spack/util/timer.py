@@ -42,6 +42,9 @@ def duration(self, name=global_timer_name):
     def measure(self, name):
         yield
 
+    def record(self, name, seconds):
+        pass
+
     @property
     def phases(self):
         return []
@@ -127,6 +130,18 @@ def measure(self, name):
         yield
         self._timers[name] = Interval(begin, self._now())
 
+    def record(self, name, seconds):
+        """
+        Record a named timer that took the given time, e.g. time measured
+        before the timer was created.
+
+        Arguments:
+            name (str): Name of the timer
+            seconds (float): Duration of the timer
+        """
+        end = self._now()
+        self._timers[name] = Interval(end - seconds, end)
+
     @property
     def phases(self):
         """Get all named timers (excluding the global/total timer)"""
@@ -6,7 +6,9 @@
 from __future__ import print_function
 
 import codecs
+import collections
 import errno
+import http.client
 import multiprocessing.pool
 import os
 import os.path
@@ -14,11 +16,12 @@
 import shutil
 import ssl
 import sys
+import threading
 import traceback
 import urllib.parse
 from html.parser import HTMLParser
 from urllib.error import URLError
-from urllib.request import HTTPSHandler, Request, build_opener
+from urllib.request import HTTPHandler, HTTPSHandler, Request, build_opener
 
 import llnl.util.lang
 import llnl.util.tty as tty
@@ -39,15 +42,175 @@
 from spack.util.path import convert_to_posix_path
 
 
+class _PooledHTTPResponse(http.client.HTTPResponse):
+    """Response that records whether it was closed before the end of its body,
+    which then leaves unread bytes on the connection."""
+
+    unread = False
+
+    def close(self):
+        if not self.isclosed() and (self.chunked or self.length != 0):
+            self.unread = True
+        super(_PooledHTTPResponse, self).close()
+
+
+def _is_idle(response):
+    """Whether the connection of ``response`` can send another request"""
+    return response.isclosed() and not response.length and not getattr(response, "unread", False)
+
+
+class ConnectionPool(object):
+    """Keep-alive HTTP connections, to be reused by subsequent requests to the
+    same host.
+
+    Connections are given back to the pool together with their last response,
+    and can be reused only once that response has been read completely. At
+    most ``maxsize`` connections are kept per host. A forked process starts
+    with an empty pool, since its parent keeps using the connections it had.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._connections = collections.defaultdict(collections.deque)
+
+    def _check_pid(self):
+        # Connections of the parent are forgotten, not closed: the parent owns them
+        if self._pid != os.getpid():
+            self._reset()
+
+    def get(self, key):
+        """Return an idle connection for ``key``, or None if there is none."""
+        self._check_pid()
+        with self._lock:
+            entries = self._connections[key]
+            for _ in range(len(entries)):
+                connection, response = entries.popleft()
+                if response is not None and response.length == 0 and not response.chunked:
+                    # Nothing left to read, e.g. responses to HEAD requests
+                    response.close()
+                if response is None or _is_idle(response):
+                    return connection
+                if response.isclosed():
+                    # The response was not read completely, drop its connection
+                    connection.close()
+                    continue
+                entries.append((connection, response))
+        return None
+
+    def put(self, key, connection, response):
+        """Give back a connection, which is idle as soon as ``response`` is closed."""
+        if response.will_close:
+            return
+        self._check_pid()
+        with self._lock:
+            entries = self._connections[key]
+            entries.append((connection, response))
+            while len(entries) > self.maxsize:
+                # Connections still in use are closed with their response
+                old_connection, old_response = entries.popleft()
+                if old_response.isclosed():
+                    old_connection.close()
+
+    def clear(self):
+        self._check_pid()
+        with self._lock:
+            for entries in self._connections.values():
+                for connection, response in entries:
+                    if response.isclosed():
+                        connection.close()
+            self._connections.clear()
+
+
+def _pooled_open(handler, pool, http_class, req, **http_conn_args):
+    """Like ``AbstractHTTPHandler.do_open``, but reuses keep-alive connections"""
+    if req.has_proxy() or getattr(req, "_tunnel_host", None):
+        return handler.do_open(http_class, req, **http_conn_args)
+
+    headers = dict(req.unredirected_hdrs)
+    headers.update({k: v for k, v in req.headers.items() if k not in headers})
+    headers = {name.title(): val for name, val in headers.items()}
+
+    # The host includes the port, if any. The scheme tells plain from TLS connections.
+    key = (req.type, req.host)
+    while True:
+        connection = pool.get(key)
+        reused = connection is not None
+        if not reused:
+            connection = http_class(req.host, timeout=req.timeout, **http_conn_args)
+            connection.response_class = _PooledHTTPResponse
+        elif connection.sock is not None and isinstance(req.timeout, (int, float)):
+            connection.sock.settimeout(req.timeout)
+
+        try:
+            connection.request(
+                req.get_method(),
+                req.selector,
+                req.data,
+                headers,
+                encode_chunked=req.has_header("Transfer-encoding"),
+            )
+            response = connection.getresponse()
+        except (OSError, http.client.HTTPException) as err:
+            connection.close()
+            # The server may have closed an idle connection, try a new one
+            if reused and req.get_method() in ("GET", "HEAD"):
+                continue
+            raise URLError(err)
+        break
+
+    pool.put(key, connection, response)
+    response.url = req.get_full_url()
+    response.msg = response.reason
+    return response
+
+
+class PooledHTTPHandler(HTTPHandler):
+    """HTTP handler reusing keep-alive connections from a pool"""
+
+    def __init__(self, pool, **kwargs):
+        super(PooledHTTPHandler, self).__init__(**kwargs)
+        self.pool = pool
+
+    def http_open(self, req):
+        return _pooled_open(self, self.pool, http.client.HTTPConnection, req)
+
+
+class PooledHTTPSHandler(HTTPSHandler):
+    """HTTPS handler reusing keep-alive connections from a pool"""
+
+    def __init__(self, pool, context=None, **kwargs):
+        super(PooledHTTPSHandler, self).__init__(context=context, **kwargs)
+        self.pool = pool
+        self.ssl_context = context
+
+    def https_open(self, req):
+        return _pooled_open(
+            self, self.pool, http.client.HTTPSConnection, req, context=self.ssl_context
+        )
+
+
+def _https_handlers(context):
+    pool_size = spack.config.get("config:url_pool_size", 8)
+    if not pool_size:
+        return [HTTPSHandler(context=context)]
+    pool = ConnectionPool(pool_size)
+    return [PooledHTTPHandler(pool), PooledHTTPSHandler(pool, context=context)]
+
+
 def _urlopen():
     s3 = spack.s3_handler.UrllibS3Handler()
     gcs = spack.gcs_handler.GCSHandler()
 
     # One opener with HTTPS ssl enabled
-    with_ssl = build_opener(s3, gcs, HTTPSHandler(context=ssl.create_default_context()))
+    with_ssl = build_opener(s3, gcs, *_https_handlers(ssl.create_default_context()))
 
     # One opener with HTTPS ssl disabled
-    without_ssl = build_opener(s3, gcs, HTTPSHandler(context=ssl._create_unverified_context()))
+    without_ssl = build_opener(s3, gcs, *_https_handlers(ssl._create_unverified_context()))
 
     # And dynamically dispatch based on the config:verify_ssl.
     def dispatch_open(fullurl, data=None, timeout=None):
@@ -100,17 +263,29 @@ def handle_starttag(self, tag, attrs):
                     self.links.append(val)
 
 
-def read_from_url(url, accept_content_type=None):
+def read_from_url(url, accept_content_type=None, offset=0, if_range=None):
+    """Open a URL and return its final url, headers and the response.
+
+    If ``offset`` is given, only the content starting at that byte is requested.
+    Servers may ignore this and send the whole content, see ``is_partial_content``.
+    They also send the whole content if ``if_range``, an ETag or a Last-Modified
+    date, does not match the current version of the resource.
+    """
     if isinstance(url, str):
         url = urllib.parse.urlparse(url)
 
     # Timeout in seconds for web requests
-    request = Request(url.geturl(), headers={"User-Agent": SPACK_USER_AGENT})
+    headers = {"User-Agent": SPACK_USER_AGENT}
+    if offset:
+        headers["Range"] = "bytes={0}-".format(offset)
+        if if_range:
+            headers["If-Range"] = if_range
+    request = Request(url.geturl(), headers=headers)
 
     try:
         response = urlopen(request)
     except URLError as err:
-        raise SpackWebError("Download failed: {}".format(str(err)))
+        raise SpackWebError("Download failed: {}".format(str(err))) from err
 
     if accept_content_type:
         try:
@@ -130,6 +305,21 @@ def read_from_url(url, accept_content_type=None):
     return response.geturl(), response.headers, response
 
 
+def is_partial_content(response, offset):
+    """Whether ``response`` holds the content of a resource starting at byte
+    ``offset``, as requested by ``read_from_url(url, offset=offset)``."""
+    if getattr(response, "status", None) != 206:
+        return False
+    content_range = response.headers.get("Content-Range", "")
+    return bool(re.match(r"bytes\s+{0}-".format(offset), content_range))
+
+
+def is_range_not_satisfiable(error):
+    """Whether ``error``, raised by ``read_from_url(url, offset=offset)``, means
+    that the server has no content starting at byte ``offset``."""
+    return getattr(error.__cause__, "code", None) == 416
+
+
 def push_to_url(local_file_path, remote_path, keep_original=True, extra_args=None):
     remote_url = urllib.parse.urlparse(remote_path)
     if remote_url.scheme == "file":
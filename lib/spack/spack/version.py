@@ -23,6 +23,7 @@
 from llnl.util.filesystem import mkdirp, working_dir
 
 import spack.caches
+import spack.config
 import spack.error
 import spack.paths
 import spack.util.executable
@@ -106,6 +107,24 @@ def __ge__(self, other):
         return self > other or self == other
 
 
+def version_key(version: tuple) -> tuple:
+    """Flat tuple that sorts like the given version components.
+
+    Every component becomes a ``(kind, value)`` pair: string components get kind 0, numbers
+    kind 1 and infinity versions kind 2, so that ``a < 1 < develop``. Keys only contain ints
+    and strings, which makes comparisons and hashing of versions plain tuple operations.
+    Negative kinds are reserved for ranges and git versions, see ``ClosedOpenRange.key``.
+    """
+    key: tuple = ()
+    for component in version:
+        if isinstance(component, VersionStrComponent):
+            data = component.data
+            key += (2, data) if isinstance(data, int) else (0, data)
+        else:
+            key += (1, component)
+    return key
+
+
 def parse_string_components(string: str) -> Tuple[tuple, tuple]:
     string = string.strip()
 
@@ -118,74 +137,100 @@ def parse_string_components(string: str) -> Tuple[tuple, tuple]:
     return version, separators
 
 
+#: Versions and ranges parsed from strings, by string. Package directives, the install
+#: database and the solver parse the same version strings over and over. Versions are
+#: immutable, so equal versions can share one object, with its key and hash computed once.
+_interned_versions: Dict[str, "StandardVersion"] = {}
+_interned_ranges: Dict[str, "ClosedOpenRange"] = {}
+
+#: Maximum number of versions and of ranges to keep interned
+_max_interned_versions = 16384
+
+
+def _intern(table: dict, string: str, value):
+    if len(table) >= _max_interned_versions:
+        # Another thread may evict the same entry, or empty the table
+        table.pop(next(iter(table), None), None)
+    table[string] = value
+    return value
+
+
 class ConcreteVersion:
     pass
 
 
 class StandardVersion(ConcreteVersion):
-    """Class to represent versions"""
+    """Class to represent versions. Instances are immutable and may be shared."""
 
-    __slots__ = ["version", "string", "separators"]
+    __slots__ = ["version", "string", "separators", "key", "_hash"]
 
     def __init__(self, string: Optional[str], version: tuple, separators: tuple):
         self.string = string
         self.version = version
         self.separators = separators
+        self.key = version_key(version)
+        self._hash = hash(self.key)
+
+    def __reduce__(self):
+        # String hashes differ between processes, so recompute the key and hash on unpickling
+        return StandardVersion, (self.string, self.version, self.separators)
 
     @staticmethod
     def from_string(string: str):
-        return StandardVersion(string, *parse_string_components(string))
+        version = _interned_versions.get(string)
+        if version is None:
+            version = StandardVersion(string, *parse_string_components(string))
+            _intern(_interned_versions, string, version)
+        return version
 
     @staticmethod
     def typemin():
-        return StandardVersion("", (), ())
+        return _typemin
 
     @staticmethod
     def typemax():
-        return StandardVersion("infinity", (VersionStrComponent(len(infinity_versions)),), ())
+        return _typemax
 
     def __bool__(self):
         return True
 
     def __eq__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version == other.version
+            return self.key == other.key
         return False
 
     def __ne__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version != other.version
+            return self.key != other.key
         return True
 
+    # Keys of ranges make Version(x) < ClosedOpenRange(Version(x), ...), see ClosedOpenRange.key
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version < other.version
+            return self.key < other.key
         if isinstance(other, ClosedOpenRange):
-            # Use <= here so that Version(x) < ClosedOpenRange(Version(x), ...).
-            return self <= other.lo
+            return self.key < other.key
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version <= other.version
+            return self.key <= other.key
         if isinstance(other, ClosedOpenRange):
-            # Versions are never equal to ranges, so follow < logic.
-            return self <= other.lo
+            return self.key <= other.key
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version >= other.version
+            return self.key >= other.key
         if isinstance(other, ClosedOpenRange):
-            # Versions are never equal to ranges, so follow > logic.
-            return self > other.lo
+            return self.key >= other.key
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version > other.version
+            return self.key > other.key
         if isinstance(other, ClosedOpenRange):
-            return self > other.lo
+            return self.key > other.key
         return NotImplemented
 
     def __iter__(self):
@@ -230,7 +275,7 @@ def __repr__(self) -> str:
         return f'Version("{str(self)}")'
 
     def __hash__(self):
-        return hash(self.version)
+        return self._hash
 
     def __contains__(rhs, lhs):
         # We should probably get rid of `x in y` for versions, since
@@ -367,6 +412,10 @@ def up_to(self, index):
         return self[:index]
 
 
+_typemin = StandardVersion("", (), ())
+_typemax = StandardVersion("infinity", (VersionStrComponent(len(infinity_versions)),), ())
+
+
 class GitVersion(ConcreteVersion):
     """Class to represent versions interpreted from git refs.
 
@@ -420,9 +469,7 @@ def __init__(self, string: str):
         if "=" in normalized_string:
             # Store the git reference, and parse the user provided version.
             self.ref, spack_version = normalized_string.split("=")
-            self._ref_version = StandardVersion(
-                spack_version, *parse_string_components(spack_version)
-            )
+            self._ref_version = StandardVersion.from_string(spack_version)
         else:
             # The ref_version is lazily attached after parsing, since we don't know what
             # package it applies to here.
@@ -450,11 +497,15 @@ def ref_version(self) -> StandardVersion:
         # Add a -git.<distance> suffix when we're not exactly on a tag
         if distance > 0:
             version_string += f"-git.{distance}"
-        self._ref_version = StandardVersion(
-            version_string, *parse_string_components(version_string)
-        )
+        self._ref_version = StandardVersion.from_string(version_string)
         return self._ref_version
 
+    @property
+    def key(self) -> tuple:
+        """Sort key, which puts git versions right after the standard version of their ref
+        version, and before the ranges starting there."""
+        return self.ref_version.key + (-2, self.ref)
+
     def intersects(self, other):
         # For concrete things intersects = satisfies = equality
         if isinstance(other, GitVersion):
@@ -620,12 +671,24 @@ def up_to(self, index) -> StandardVersion:
 
 
 class ClosedOpenRange:
+    """Range of versions. Instances are immutable and may be shared."""
+
+    __slots__ = ["lo", "hi", "key", "_hash"]
+
     def __init__(self, lo: StandardVersion, hi: StandardVersion):
-        if hi < lo:
+        if hi.key < lo.key:
             raise ValueError(f"{lo}:{hi} is an empty range")
         self.lo: StandardVersion = lo
         self.hi: StandardVersion = hi
 
+        # Sorts by (lo, hi), after versions x <= lo and before versions x > lo: the -1 kind
+        # is smaller than any component kind of a version that continues after lo.
+        self.key: tuple = lo.key + (-1,) + hi.key
+        self._hash = hash(self.key)
+
+    def __reduce__(self):
+        return ClosedOpenRange, (self.lo, self.hi)
+
     @classmethod
     def from_version_range(cls, lo: StandardVersion, hi: StandardVersion):
         """Construct ClosedOpenRange from lo:hi range."""
@@ -645,49 +708,44 @@ def __repr__(self):
         return str(self)
 
     def __hash__(self):
-        # prev_version for backward compat.
-        return hash((self.lo, prev_version(self.hi)))
+        return self._hash
 
     def __eq__(self, other):
-        if isinstance(other, StandardVersion):
-            return False
-        if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) == (other.lo, other.hi)
+        if isinstance(other, (StandardVersion, ClosedOpenRange)):
+            return self.key == other.key
         return NotImplemented
 
     def __ne__(self, other):
-        if isinstance(other, StandardVersion):
-            return True
-        if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) != (other.lo, other.hi)
+        if isinstance(other, (StandardVersion, ClosedOpenRange)):
+            return self.key != other.key
         return NotImplemented
 
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
-            return other > self
+            return self.key < other.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) < (other.lo, other.hi)
+            return self.key < other.key
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
-            return other >= self
+            return self.key <= other.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) <= (other.lo, other.hi)
+            return self.key <= other.key
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
-            return other <= self
+            return self.key >= other.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) >= (other.lo, other.hi)
+            return self.key >= other.key
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
-            return other < self
+            return self.key > other.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) > (other.lo, other.hi)
+            return self.key > other.key
         return NotImplemented
 
     def __contains__(rhs, lhs):
@@ -697,11 +755,11 @@ def __contains__(rhs, lhs):
 
     def intersects(self, other: Union[ConcreteVersion, "ClosedOpenRange", "VersionList"]):
         if isinstance(other, StandardVersion):
-            return self.lo <= other < self.hi
+            return self.lo.key <= other.key < self.hi.key
         if isinstance(other, GitVersion):
-            return self.lo <= other.ref_version < self.hi
+            return self.lo.key <= other.ref_version.key < self.hi.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo < other.hi) and (other.lo < self.hi)
+            return self.lo.key < other.hi.key and other.lo.key < self.hi.key
         if isinstance(other, VersionList):
             return any(self.intersects(rhs) for rhs in other)
         raise ValueError(f"Unexpected type {type(other)}")
@@ -710,7 +768,7 @@ def satisfies(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionLis
         if isinstance(other, ConcreteVersion):
             return False
         if isinstance(other, ClosedOpenRange):
-            return not (self.lo < other.lo or other.hi < self.hi)
+            return other.lo.key <= self.lo.key and self.hi.key <= other.hi.key
         if isinstance(other, VersionList):
             return any(self.satisfies(rhs) for rhs in other)
         raise ValueError(other)
@@ -719,16 +777,15 @@ def overlaps(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList
         return self.intersects(other)
 
     def union(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList"]):
-        if isinstance(other, StandardVersion):
-            return self if self.lo <= other < self.hi else VersionList([self, other])
-
-        if isinstance(other, GitVersion):
-            return self if self.lo <= other.ref_version < self.hi else VersionList([self, other])
+        if isinstance(other, ConcreteVersion):
+            return self if self.intersects(other) else VersionList([self, other])
 
         if isinstance(other, ClosedOpenRange):
             # Notice <= cause we want union(1:2, 3:4) = 1:4.
-            if self.lo <= other.hi and other.lo <= self.hi:
-                return ClosedOpenRange(min(self.lo, other.lo), max(self.hi, other.hi))
+            if self.lo.key <= other.hi.key and other.lo.key <= self.hi.key:
+                lo = self.lo if self.lo.key <= other.lo.key else other.lo
+                hi = self.hi if self.hi.key >= other.hi.key else other.hi
+                return ClosedOpenRange(lo, hi)
 
             return VersionList([self, other])
 
@@ -745,9 +802,9 @@ def intersection(self, other: Union["ClosedOpenRange", ConcreteVersion]):
             return other if self.intersects(other) else VersionList()
 
         # range - range -> range or nothing.
-        max_lo = max(self.lo, other.lo)
-        min_hi = min(self.hi, other.hi)
-        return ClosedOpenRange(max_lo, min_hi) if max_lo < min_hi else VersionList()
+        max_lo = self.lo if self.lo.key >= other.lo.key else other.lo
+        min_hi = self.hi if self.hi.key <= other.hi.key else other.hi
+        return ClosedOpenRange(max_lo, min_hi) if max_lo.key < min_hi.key else VersionList()
 
 
 class VersionList:
@@ -768,7 +825,7 @@ def __init__(self, vlist=None):
 
     def add(self, item):
         if isinstance(item, ConcreteVersion):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
             # Only insert when prev and next are not intersected.
             if (i == 0 or not item.intersects(self[i - 1])) and (
                 i == len(self) or not item.intersects(self[i])
@@ -776,7 +833,7 @@ def add(self, item):
                 self.versions.insert(i, item)
 
         elif isinstance(item, ClosedOpenRange):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
 
             # Note: can span multiple concrete versions to the left,
             # For instance insert 1.2: into [1.2, hash=1.2, 1.3]
@@ -817,7 +874,10 @@ def concrete_range_as_version(self) -> Optional[ConcreteVersion]:
         return None
 
     def copy(self):
-        return VersionList(self)
+        # The elements are already sorted and non-redundant
+        clone = VersionList()
+        clone.versions = self.versions[:]
+        return clone
 
     def lowest(self) -> Optional[StandardVersion]:
         """Get the lowest version in the list."""
@@ -836,11 +896,29 @@ def preferred(self) -> Optional[StandardVersion]:
         """Get the preferred (latest) version in the list."""
         return self.highest_numeric() or self.highest()
 
+    def _keys(self) -> List[tuple]:
+        """Sort keys of the elements, for lists long enough to bisect"""
+        return [v.key for v in self.versions] if len(self.versions) > 2 else []
+
+    def _neighbors(self, item, keys: Optional[List[tuple]] = None) -> list:
+        """Elements of the list that can intersect or contain ``item``.
+
+        The elements are sorted and disjoint, so only the elements right before and at the
+        position of ``item`` can overlap with it. Git versions may need a commit lookup for
+        their key, so they are compared with all elements, like items of short lists."""
+        if len(self.versions) <= 2 or isinstance(item, GitVersion):
+            return self.versions
+        i = bisect_left(self._keys() if keys is None else keys, item.key)
+        return self.versions[max(i - 1, 0) : i + 1]
+
     def satisfies(self, other) -> bool:
         # This exploits the fact that version lists are "reduced" and normalized, so we can
         # never have a list like [1:3, 2:4] since that would be normalized to [1:4]
         if isinstance(other, VersionList):
-            return all(any(lhs.satisfies(rhs) for rhs in other) for lhs in self)
+            keys = other._keys()
+            return all(
+                any(lhs.satisfies(rhs) for rhs in other._neighbors(lhs, keys)) for lhs in self
+            )
 
         if isinstance(other, (ConcreteVersion, ClosedOpenRange)):
             return all(lhs.satisfies(other) for lhs in self)
@@ -849,18 +927,12 @@ def satisfies(self, other) -> bool:
 
     def intersects(self, other):
         if isinstance(other, VersionList):
-            s = o = 0
-            while s < len(self) and o < len(other):
-                if self[s].intersects(other[o]):
-                    return True
-                elif self[s] < other[o]:
-                    s += 1
-                else:
-                    o += 1
-            return False
+            small, large = (self, other) if len(self) <= len(other) else (other, self)
+            keys = large._keys()
+            return any(x.intersects(y) for x in small for y in large._neighbors(x, keys))
 
         if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            return any(v.intersects(other) for v in self)
+            return any(v.intersects(other) for v in self._neighbors(other))
 
         raise ValueError(f"Unsupported type {type(other)}")
 
@@ -893,13 +965,24 @@ def union(self, other: "VersionList"):
 
     def intersection(self, other: "VersionList") -> "VersionList":
         result = VersionList()
+        if not self or not other:
+            return result
+
+        # Elements of both lists are disjoint, so the intersections of two pairs of elements
+        # are either disjoint or the same, and every overlapping pair is found by bisecting
+        # at least one of its elements into the other list.
+        pieces = []
         for lhs, rhs in ((self, other), (other, self)):
+            keys = rhs._keys()
             for x in lhs:
-                i = bisect_left(rhs.versions, x)
-                if i > 0:
-                    result.add(rhs[i - 1].intersection(x))
-                if i < len(rhs):
-                    result.add(rhs[i].intersection(x))
+                for y in rhs._neighbors(x, keys):
+                    piece = y.intersection(x)
+                    if not isinstance(piece, VersionList):
+                        pieces.append(piece)
+
+        if len(pieces) > 1:
+            pieces.sort(key=lambda v: v.key)
+        result.versions = [v for i, v in enumerate(pieces) if i == 0 or pieces[i - 1].key != v.key]
         return result
 
     def intersect(self, other) -> bool:
@@ -914,7 +997,7 @@ def intersect(self, other) -> bool:
 
     def __contains__(self, other):
         if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            i = bisect_left(self, other)
+            i = bisect_left(self.versions, other)
             return (i > 0 and other in self[i - 1]) or (i < len(self) and other in self[i])
 
         if isinstance(other, VersionList):
@@ -1101,6 +1184,10 @@ def from_string(string) -> Union[VersionList, ClosedOpenRange, StandardVersion,
     """Converts a string to a version object. This is private. Client code should use ver()."""
     string = string.replace(" ", "")
 
+    interned = _interned_ranges.get(string)
+    if interned is not None:
+        return interned
+
     # VersionList
     if "," in string:
         return VersionList(list(map(from_string, string.split(","))))
@@ -1110,7 +1197,7 @@ def from_string(string) -> Union[VersionList, ClosedOpenRange, StandardVersion,
         s, e = string.split(":")
         lo = StandardVersion.typemin() if s == "" else StandardVersion.from_string(s)
         hi = StandardVersion.typemax() if e == "" else StandardVersion.from_string(e)
-        return VersionRange(lo, hi)
+        return _intern(_interned_ranges, string, VersionRange(lo, hi))
 
     # StandardVersion
     elif string.startswith("="):
@@ -1123,7 +1210,7 @@ def from_string(string) -> Union[VersionList, ClosedOpenRange, StandardVersion,
     else:
         # @1.2.3 is short for 1.2.3:1.2.3
         v = StandardVersion.from_string(string)
-        return VersionRange(v, v)
+        return _intern(_interned_ranges, string, VersionRange(v, v))
 
 
 def ver(obj) -> Union[VersionList, ClosedOpenRange, StandardVersion, GitVersion]:
@@ -1256,14 +1343,9 @@ def get(self, ref) -> Tuple[Optional[str], int]:
 
         return self.data[ref]
 
-    def lookup_ref(self, ref) -> Tuple[Optional[str], int]:
-        """Lookup the previous version and distance for a given commit.
-
-        We use git to compare the known versions from package to the git tags,
-        as well as any git tags that are SEMVER versions, and find the latest
-        known version prior to the commit, as well as the distance from that version
-        to the commit in the git repo. Those values are used to compare Version objects.
-        """
+    def _package_repository(self):
+        """Clone the repository of the package in the user repos cache, or
+        fetch its new tags, and return its path."""
         dest = os.path.join(spack.paths.user_repos_cache_path, self.repository_uri)
         if dest.endswith(".git"):
             dest = dest[:-4]
@@ -1277,14 +1359,30 @@ def lookup_ref(self, ref) -> Tuple[Optional[str], int]:
         if not os.path.exists(dest):
             self.fetcher.clone(dest, bare=True)
 
-        # Lookup commit info
         with working_dir(dest):
             # TODO: we need to update the local tags if they changed on the
             # remote instance, simply adding '-f' may not be sufficient
             # (if commits are deleted on the remote, this command alone
             # won't properly update the local rev-list)
             self.fetcher.git("fetch", "--tags", output=os.devnull, error=os.devnull)
+        return dest
+
+    def lookup_ref(self, ref) -> Tuple[Optional[str], int]:
+        """Lookup the previous version and distance for a given commit.
+
+        We use git to compare the known versions from package to the git tags,
+        as well as any git tags that are SEMVER versions, and find the latest
+        known version prior to the commit, as well as the distance from that version
+        to the commit in the git repo. Those values are used to compare Version objects.
+        """
+        if spack.config.get("config:git_repo_cache", False) and self.fetcher.repo_cache_path:
+            # The repository cache is shared with the fetchers of the package
+            dest = self.fetcher.update_repo_cache()
+        else:
+            dest = self._package_repository()
 
+        # Lookup commit info
+        with working_dir(dest):
             # Ensure ref is a commit object known to git
             # Note the brackets are literals, the ref replaces the format string
             try:
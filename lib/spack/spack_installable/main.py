@@ -32,6 +32,18 @@ def main(argv=None):
     if "ruamel" in sys.modules:
         del sys.modules["ruamel"]
 
+    # Hand the command to a warm `spack daemon` if the user opted in to it. This
+    # happens before importing spack.main, which is most of the startup time.
+    daemon_socket = os.environ.get("SPACK_DAEMON_SOCKET")
+    if daemon_socket:
+        import spack.daemon
+
+        returncode = spack.daemon.forward(
+            sys.argv[1:] if argv is None else argv, daemon_socket, spack_prefix
+        )
+        if returncode is not None:
+            sys.exit(returncode)
+
     import spack.main  # noqa: E402
 
     sys.exit(spack.main.main(argv))